@@ -0,0 +1,272 @@
+"""Headless rendering benchmark.
+
+Renders synthetic states to an offscreen surface under the SDL dummy video
+driver and reports frames per second and per-layer timings::
+
+    python -m game.bench --map 256x256 --units 2000 --cities 100 --frames 200
+    python -m game.bench --png frames/ --png-every 10
+
+Every frame pans the camera by one tile so the layers do the work of a
+scrolling view rather than hitting their caches.
+
+With ``--ai-budget MS`` the AI search is timed instead: the opening position
+of each of ``--ai-positions`` seeds is searched for that long with and
+without the transposition table, and the depth reached is reported::
+
+    python -m game.bench --ai-budget 500 --ai-positions 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from random import Random
+from typing import Callable, Sequence
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from . import config
+from .core import mapgen, rules
+from .core.models import City, Player, State, Unit
+from .core.search import Searcher, TranspositionTable
+from .ui.camera import Camera
+from .ui.hud import HUD
+from .ui.minimap import Minimap
+from .ui.renderer import (
+    MapRenderer,
+    draw,
+    draw_entities,
+    draw_markers,
+    reset_font,
+)
+
+LAYERS = ("frame", "idle", "terrain", "fog", "entities", "draw", "hud", "minimap")
+
+
+def synthetic_state(
+    width: int,
+    height: int,
+    units: int,
+    cities: int,
+    players: int = 2,
+    seed: int = 0,
+    revealed: float = 1.0,
+) -> State:
+    """Return a generated map populated with random units and cities.
+
+    Cities claim the land around them; each player has the ``revealed``
+    share of tiles uncovered.
+    """
+
+    rng = Random(seed)
+    tiles, _ = mapgen.generate_map(width, height, seed=seed)
+    state = State(width, height, tiles, {}, {}, {p: Player(p) for p in range(players)})
+    land = [(t.x, t.y) for t in tiles if t.kind != "water"] or [(0, 0)]
+    for tile in tiles:
+        for player in range(players):
+            if rng.random() < revealed:
+                tile.reveal(player)
+    for cid in range(1, cities + 1):
+        x, y = rng.choice(land)
+        claimed = {
+            (x + dx, y + dy)
+            for dx in (-1, 0, 1)
+            for dy in (-1, 0, 1)
+            if 0 <= x + dx < width and 0 <= y + dy < height
+        }
+        state.cities[cid] = City(cid, cid % players, (x, y), 1 + cid % 5, claimed)
+    kinds = list(config.UNIT_STATS)
+    for uid in range(1, units + 1):
+        kind = kinds[uid % len(kinds)]
+        moves = config.UNIT_STATS[kind]["moves"]
+        state.units[uid] = Unit(uid, uid % players, kind, rng.choice(land), moves)
+    state.next_unit_id = units + 1
+    state.next_city_id = cities + 1
+    return state
+
+
+def _size(text: str) -> tuple[int, int]:
+    w, _, h = text.lower().partition("x")
+    return int(w), int(h or w)
+
+
+def _stats(name: str, samples: Sequence[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    mean = statistics.fmean(ms)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    fps = 1000 / mean if mean else float("inf")
+    return f"{name:<10} {mean:9.3f} {p95:9.3f} {ms[-1]:9.3f} {fps:10.1f}"
+
+
+def run(args: argparse.Namespace) -> list[str]:
+    """Run the benchmark described by ``args`` and return the report lines."""
+    width, height = _size(args.map)
+    window = _size(args.window)
+    pygame.init()
+    pygame.display.set_mode(window)
+    config.set_tile_size(args.tile_size)
+    state = synthetic_state(
+        width, height, args.units, args.cities, args.players, args.seed, args.revealed
+    )
+    surface = pygame.Surface(window)
+    view = pygame.Rect(0, 0, window[0], window[1] - config.UI_BAR_H)
+    camera = Camera((width, height), view)
+    camera.center_on((width // 2, height // 2))
+    renderer = MapRenderer(state, camera)
+    hud = HUD(pygame.Rect(0, view.bottom, window[0], config.UI_BAR_H))
+    minimap = Minimap(state, renderer.index, camera, hud.minimap_box)
+    renderer.render(surface)
+    lod = config.TILE_SIZE < config.LOD_TILE_SIZE
+
+    def visible() -> set:
+        area = camera.visible_tiles()
+        return {
+            (x, y)
+            for x in range(area.left, area.right)
+            for y in range(area.top, area.bottom)
+        }
+
+    def entities() -> None:
+        if lod:
+            draw_markers(
+                state, surface, renderer.index, camera.visible_tiles(), camera.offset
+            )
+        else:
+            draw_entities(
+                state,
+                surface,
+                only=visible(),
+                offset=camera.offset,
+                index=renderer.index,
+                borders=renderer.borders,
+            )
+
+    def hud_frame() -> None:
+        hud.update(1 / 30, state)
+        hud.draw(surface)
+
+    def minimap_frame() -> None:
+        minimap.update()
+        minimap.draw(surface)
+
+    layers: dict[str, Callable[[], object]] = {
+        "frame": lambda: renderer.render(surface),
+        "idle": lambda: renderer.render(surface),
+        "terrain": lambda: (renderer.overview if lod else renderer.terrain).blit(
+            surface, camera.visible_tiles(), camera.offset
+        ),
+        "fog": lambda: renderer.fog_mask().blit(
+            surface, camera.visible_tiles(), camera.offset
+        ),
+        "entities": entities,
+        "draw": lambda: draw(state, surface),
+        "hud": hud_frame,
+        "minimap": minimap_frame,
+    }
+    selected = [name for name in args.layers.split(",") if name]
+    unknown = set(selected) - set(layers)
+    if unknown:
+        raise SystemExit(f"unknown layers: {', '.join(sorted(unknown))}")
+    samples: dict[str, list[float]] = {name: [] for name in selected}
+    png_dir = Path(args.png) if args.png else None
+    if png_dir is not None:
+        png_dir.mkdir(parents=True, exist_ok=True)
+    step = config.TILE_SIZE
+    for frame in range(args.frames):
+        step = -step if frame % 20 == 0 else step
+        camera.pan(step, 0)
+        for name in selected:
+            if name == "idle":
+                renderer.render(surface)
+            start = time.perf_counter()
+            layers[name]()
+            samples[name].append(time.perf_counter() - start)
+        if png_dir is not None and frame % args.png_every == 0:
+            renderer.invalidate()
+            renderer.render(surface)
+            hud.draw(surface)
+            minimap.draw(surface)
+            pygame.image.save(surface, str(png_dir / f"frame_{frame:05d}.png"))
+    minimap.close()
+    renderer.close()
+    reset_font()
+    pygame.quit()
+    lines = [
+        f"map {width}x{height}  units {len(state.units)}  cities "
+        f"{len(state.cities)}  window {window[0]}x{window[1]}  tile "
+        f"{config.TILE_SIZE}px  frames {args.frames}",
+        f"{'layer':<10} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9} {'fps':>10}",
+    ]
+    lines += [_stats(name, samples[name]) for name in selected]
+    return lines
+
+
+def search_position(seed: int, players: int = 2) -> State:
+    """Return the opening position of a 16x12 game for ``seed``."""
+    tiles, spawns = mapgen.generate_map(16, 12, seed=seed, players=players)
+    units = {u.id: u for u in mapgen.initial_units(spawns)}
+    state = State(16, 12, tiles, units, {}, {p: Player(p) for p in range(players)})
+    state.next_unit_id = max(units) + 1
+    for unit in units.values():
+        rules.reveal(state, unit)
+    return state
+
+
+def run_search(args: argparse.Namespace) -> list[str]:
+    """Time the AI search on benchmark positions and return the report lines."""
+    budget = args.ai_budget / 1000
+    lines = [
+        f"search budget {args.ai_budget:g} ms  positions {args.ai_positions}",
+        f"{'seed':<6} {'depth':>6} {'nodes':>8} {'tt depth':>9} {'tt nodes':>9} "
+        f"{'hit rate':>9}",
+    ]
+    for seed in range(args.seed, args.seed + args.ai_positions):
+        plain = Searcher(None).search(search_position(seed, args.players), budget)
+        table = TranspositionTable()
+        cached = Searcher(table).search(search_position(seed, args.players), budget)
+        lookups = table.hits + table.misses
+        rate = table.hits / lookups if lookups else 0.0
+        lines.append(
+            f"{seed:<6} {plain.depth:>6} {plain.nodes:>8} {cached.depth:>9} "
+            f"{cached.nodes:>9} {rate:>9.1%}"
+        )
+    return lines
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m game.bench", description=__doc__)
+    parser.add_argument("--map", default="128x128", help="map size, WxH")
+    parser.add_argument("--window", default="1280x960", help="surface size, WxH")
+    parser.add_argument("--units", type=int, default=500)
+    parser.add_argument("--cities", type=int, default=50)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--revealed", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tile-size", type=int, default=config.TILE_SIZE)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument(
+        "--layers", default=",".join(LAYERS), help="comma-separated layers to time"
+    )
+    parser.add_argument("--png", help="directory to dump PNG frames into")
+    parser.add_argument("--png-every", type=int, default=10)
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument(
+        "--ai-budget", type=float, help="time the AI search for MS per position"
+    )
+    parser.add_argument("--ai-positions", type=int, default=5)
+    args = parser.parse_args(argv)
+    lines = run_search(args) if args.ai_budget else run(args)
+    report = "\n".join(lines) + "\n"
+    sys.stdout.write(report)
+    if args.output:
+        Path(args.output).write_text(report)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -50,6 +50,62 @@ INFRASTRUCTURE = {
 }
 REVEAL_RADIUS = 3
 START_SIZE = (20, 12)
+# Players in a new game.  Player ``HUMAN_PLAYER`` is controlled by the user
+# and every other player by the AI.  Reveal state is a 16-bit mask per tile,
+# which caps the number of players.
+PLAYERS = 2
+MAX_PLAYERS = 16
+HUMAN_PLAYER = 0
+# Maps that would need tiles smaller than this to fit the window scroll
+# instead; the camera pans with the arrow keys, middle-drag or screen edges.
+MIN_TILE_SIZE = 24
+SCROLL_SPEED = 900  # pixels per second
+EDGE_SCROLL_PX = 8
+# Tile sizes the mouse wheel steps through.  Below ``LOD_TILE_SIZE`` the map
+# is drawn from a scaled one-pixel-per-tile overview with aggregated unit
+# markers instead of per-tile detail.
+ZOOM_LEVELS = (1, 2, 4, 8, 12, 16, 24, 32, 48, 64)
+LOD_TILE_SIZE = 12
+# Size in pixels of the aggregated unit markers in the overview.
+LOD_MARKER_PX = 6
+# Pixel memory, in bytes, of the pre-rendered terrain chunks kept over all
+# tile sizes; one chunk at the largest zoom level takes 16 MiB.
+LAYER_CACHE_BYTES = 128 * 1024 * 1024
+# Width of the minimap box in the HUD; it is as tall as the HUD allows.
+MINIMAP_W = 120
+# Optional ``<name>.png`` sprites that replace the generated ones.
+SPRITE_DIR = "assets/sprites"
+
+# Autosaves are written at the end of every turn as deltas against a full base
+# save; the delta log is folded into a new base every N turns.  The base uses
+# the binary layout, so compacting a memory-mapped game never builds its tiles.
+SAVE_DIR = "saves"
+AUTOSAVE_NAME = "autosave.sav"
+AUTOSAVE_COMPACT_EVERY = 10
+# Seconds to wait before retrying a failed autosave as a full save.
+AUTOSAVE_RETRY_S = 5.0
+
+# Generated maps are cached on disk; the next few seeds are generated in the
+# background while the menu is open.
+MAP_CACHE_DIR = "cache/maps"
+MAP_PREWARM = 3
+
+# Scenes tick at ``ACTIVE_FPS`` while something animates (scrolling, AI
+# turns, pending saves) and otherwise block on input, waking at least every
+# ``IDLE_WAIT_MS`` for timers such as HUD messages.
+ACTIVE_FPS = 60
+IDLE_WAIT_MS = 250
+# A window resize is applied once no further resize event has arrived for
+# this long, so dragging the window edge relays out only when it settles.
+RESIZE_DEBOUNCE_MS = 150
+
+# Look-ahead AI: time per action in milliseconds (0 keeps the simple random
+# AI) and the memory cap of its transposition table.
+AI_SEARCH_MS = 0
+AI_TT_BYTES = 16 * 1024 * 1024
+
+# Frames of timings kept for the F3 performance overlay.
+PERF_HISTORY = 120
 
 # Window size limits
 # The game targets a minimum resolution of 1280x960 so that HUD elements have
@@ -81,6 +137,34 @@ def compute_tile_size(window: tuple[int, int], map_size: tuple[int, int]) -> int
     return max(1, min(size_w, size_h))
 
 
+def layout_map(
+    window: tuple[int, int], map_size: tuple[int, int]
+) -> tuple[int, tuple[int, int]]:
+    """Return ``(tile_size, window_size)`` for showing ``map_size``.
+
+    Maps that fit the window with tiles of at least ``MIN_TILE_SIZE`` are
+    scaled to fill it and the window shrinks to the map.  Larger maps keep
+    ``MIN_TILE_SIZE`` tiles and the requested window, and are scrolled.
+    """
+
+    tile = max(MIN_TILE_SIZE, compute_tile_size(window, map_size))
+    width = min(window[0], tile * map_size[0])
+    height = min(window[1], tile * map_size[1] + UI_BAR_H)
+    return tile, (width, height)
+
+
+def zoom_tile_size(size: int, steps: int) -> int:
+    """Return the tile size ``steps`` zoom levels away from ``size``.
+
+    ``size`` itself counts as a level so zooming back returns to a
+    fit-to-window size that is not in ``ZOOM_LEVELS``.
+    """
+
+    levels = sorted(set(ZOOM_LEVELS) | {size})
+    idx = levels.index(size) + steps
+    return levels[max(0, min(idx, len(levels) - 1))]
+
+
 def set_tile_size(size: int) -> None:
     """Update ``TILE_SIZE`` to ``size`` ensuring it stays positive."""
 
@@ -2,17 +2,37 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from random import Random
-from typing import List
+from threading import Event
+from typing import Callable, List, Optional
 
 from .models import Coord, State
 from .rules import RuleError, end_turn, found_city, move_unit
 
 DIRS: List[Coord] = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+SEED_RANGE = 2**32
 
 
-def ai_turn(state: State, rng: Random) -> None:
-    """Perform a simple AI turn."""
+@dataclass(frozen=True, slots=True)
+class Command:
+    """One AI action: ``move`` a unit, ``found_city`` with it or ``end_turn``.
+
+    ``found_city`` carries the seed of its random tile claim, so replaying
+    the command on another copy of the state claims the same tile.
+    """
+
+    kind: str
+    unit_id: Optional[int] = None
+    dest: Optional[Coord] = None
+    seed: Optional[int] = None
+
+
+END_TURN = Command("end_turn")
+
+
+def next_action(state: State, rng: Random) -> Optional[Command]:
+    """Perform and return the next AI action, or ``None`` when none is left."""
     for unit in list(state.units.values()):
         if unit.owner != state.current_player:
             continue
@@ -21,15 +41,84 @@ def ai_turn(state: State, rng: Random) -> None:
             dest = (unit.pos[0] + dx, unit.pos[1] + dy)
             try:
                 move_unit(state, unit.id, dest)
-                return
+                return Command("move", unit.id, dest)
             except RuleError:
                 continue
+        seed = rng.randrange(SEED_RANGE)
         try:
-            found_city(state, unit.id, rng)
-            return
+            found_city(state, unit.id, Random(seed))
+            return Command("found_city", unit.id, seed=seed)
         except RuleError:
             continue
-    end_turn(state)
+    return None
+
+
+def ai_turn(state: State, rng: Random) -> None:
+    """Perform a simple AI turn."""
+    if next_action(state, rng) is None:
+        end_turn(state)
+
+
+def plan_turn(
+    state: State,
+    rng: Random,
+    cancel: Event | None = None,
+    progress: Callable[[float], None] | None = None,
+) -> List[Command]:
+    """Play the current player's whole turn on ``state`` and return its commands.
+
+    ``state`` is modified, so callers pass a copy.  Planning stops early,
+    without ending the turn, once ``cancel`` is set; ``progress`` is called
+    with the share of the turn's unit moves used so far.
+    """
+
+    player = state.current_player
+    moves = {u.id: u.moves_left for u in state.units.values() if u.owner == player}
+    total = 1 + sum(moves.values())
+    used = 0
+    commands: List[Command] = []
+    while cancel is None or not cancel.is_set():
+        command = next_action(state, rng)
+        if command is None:
+            end_turn(state)
+            commands.append(END_TURN)
+            if progress is not None:
+                progress(1.0)
+            break
+        commands.append(command)
+        unit = state.units.get(command.unit_id)
+        left = unit.moves_left if unit is not None else 0
+        used += moves.get(command.unit_id, left) - left
+        moves[command.unit_id] = left
+        if progress is not None:
+            progress(min(1.0, used / total))
+    return commands
+
+
+def apply_command(state: State, command: Command, rng: Random) -> bool:
+    """Carry out ``command`` on ``state``; return ``False`` if it is illegal now."""
+    try:
+        if command.kind == "move":
+            move_unit(state, command.unit_id, command.dest)
+        elif command.kind == "found_city":
+            if command.seed is not None:
+                rng = Random(command.seed)
+            found_city(state, command.unit_id, rng)
+        elif command.kind == "end_turn":
+            end_turn(state)
+        else:
+            raise ValueError(f"unknown command {command.kind!r}")
+    except (RuleError, KeyError):
+        return False
+    return True
 
 
-__all__ = ["ai_turn"]
+__all__ = [
+    "END_TURN",
+    "SEED_RANGE",
+    "Command",
+    "ai_turn",
+    "apply_command",
+    "next_action",
+    "plan_turn",
+]
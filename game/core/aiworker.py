@@ -0,0 +1,90 @@
+"""Background AI turns.
+
+The current state is captured on the main thread with :meth:`State.clone`,
+which shares tiles copy-on-write; the AI then plays its turn on that copy on
+a worker thread and hands back the list of commands it used, which the
+frame loop applies one at a time.  Commands carry the seeds of their random
+outcomes, so applying them to the game gives the result the AI planned.
+The main thread never waits on the AI.
+With ``config.AI_SEARCH_MS`` set the turn is planned by :mod:`.search`
+instead, reusing one transposition table across turns.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from random import Random
+from threading import Event
+from typing import List
+
+from .. import config
+from . import search
+from .ai import Command, plan_turn
+from .models import State
+
+
+class AIWorker:
+    def __init__(self) -> None:
+        self.progress = 0.0
+        self.last_error: BaseException | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai")
+        self._future: Future[List[Command]] | None = None
+        self._cancel = Event()
+        self.table = search.TranspositionTable()
+
+    @property
+    def busy(self) -> bool:
+        return self._future is not None
+
+    def start(self, state: State, seed: int) -> bool:
+        """Start planning the current player's turn; ``False`` if already busy."""
+        if self.busy:
+            return False
+        copy = state.clone()
+        self.progress = 0.0
+        self._cancel = Event()
+        cancel = self._cancel
+
+        def job() -> List[Command]:
+            if config.AI_SEARCH_MS > 0:
+                return search.plan_turn(
+                    copy,
+                    Random(seed),
+                    cancel,
+                    self._report,
+                    budget=config.AI_SEARCH_MS / 1000,
+                    table=self.table,
+                )
+            return plan_turn(copy, Random(seed), cancel, self._report)
+
+        self._future = self._executor.submit(job)
+        return True
+
+    def _report(self, fraction: float) -> None:
+        self.progress = fraction
+
+    def poll(self) -> List[Command] | None:
+        """Return the planned commands once the worker has finished."""
+        future = self._future
+        if future is None or not future.done():
+            return None
+        self._future = None
+        self.last_error = future.exception()
+        if self.last_error is not None or future.cancelled():
+            return []
+        return future.result()
+
+    def cancel(self) -> None:
+        """Abandon the turn being planned."""
+        self._cancel.set()
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def close(self) -> None:
+        """Cancel any planning and stop the worker without waiting for it."""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = ["AIWorker"]
@@ -0,0 +1,73 @@
+"""Background autosave service.
+
+Saving is split in two: a cheap capture of the state on the main thread and
+the expensive encoding, compression and write on a single worker thread.  At
+most one save is in flight; requests made while the worker is busy are
+remembered and captured on a later :meth:`AutosaveService.poll`, so the frame
+loop never waits on the disk.  A failed save is kept in ``last_error`` and
+retried after ``retry_delay`` seconds; the saver makes the retry a full save.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .. import config
+from .models import State
+from .saveio import DeltaAutosaver
+
+
+class AutosaveService:
+    def __init__(
+        self, saver: DeltaAutosaver, retry_delay: float = config.AUTOSAVE_RETRY_S
+    ) -> None:
+        self.saver = saver
+        self.retry_delay = retry_delay
+        self.pending = False
+        self.last_error: BaseException | None = None
+        self._retry_at: float | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save")
+        self._future: Future[None] | None = None
+
+    @property
+    def busy(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def request(self, state: State) -> bool:
+        """Ask for ``state`` to be saved; return ``True`` if a job started."""
+        self.pending = True
+        return self.poll(state)
+
+    def poll(self, state: State) -> bool:
+        """Collect a finished job and start the pending one if the worker is idle."""
+        if self.busy:
+            return False
+        if self._future is not None:
+            self._collect(self._future)
+        if self._retry_at is not None and time.monotonic() >= self._retry_at:
+            self.pending = True
+        if not self.pending:
+            return False
+        self.pending = False
+        self._retry_at = None
+        job = self.saver.prepare(state)
+        if job is None:
+            return False
+        self._future = self._executor.submit(job)
+        return True
+
+    def _collect(self, future: Future[None]) -> None:
+        self.last_error = future.exception()
+        self._future = None
+        if self.last_error is not None:
+            self._retry_at = time.monotonic() + self.retry_delay
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the worker, by default letting an in-flight save finish."""
+        self._executor.shutdown(wait=wait)
+        if wait and self._future is not None:
+            self._collect(self._future)
+
+
+__all__ = ["AutosaveService"]
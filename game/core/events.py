@@ -0,0 +1,96 @@
+"""Typed events published by rules mutations on ``State.bus``.
+
+Events describe what happened rather than which ids changed, so consumers
+can react to exactly the changes they care about; the dirty sets kept by
+:class:`~game.core.models.Changes` are still recorded alongside them.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+from .models import Coord
+
+
+@dataclass(frozen=True)
+class UnitMoved:
+    unit_id: int
+    owner: int
+    src: Coord
+    dest: Coord
+
+
+@dataclass(frozen=True)
+class UnitCreated:
+    unit_id: int
+    owner: int
+    kind: str
+    pos: Coord
+
+
+@dataclass(frozen=True)
+class UnitRemoved:
+    unit_id: int
+    owner: int
+    pos: Coord
+
+
+@dataclass(frozen=True)
+class TilesRevealed:
+    player: int
+    coords: Tuple[Coord, ...]
+
+
+@dataclass(frozen=True)
+class CityFounded:
+    city_id: int
+    owner: int
+    pos: Coord
+
+
+@dataclass(frozen=True)
+class CityGrew:
+    city_id: int
+    size: int
+
+
+@dataclass(frozen=True)
+class CityCaptured:
+    city_id: int
+    old_owner: int
+    new_owner: int
+
+
+@dataclass(frozen=True)
+class ImprovementBuilt:
+    coord: Coord
+    kind: str
+
+
+@dataclass(frozen=True)
+class TurnEnded:
+    player: int
+    next_player: int
+    turn: int
+
+
+@dataclass(frozen=True)
+class ResourcesChanged:
+    player: int
+    food: int
+    prod: int
+
+
+__all__ = [
+    "CityCaptured",
+    "CityFounded",
+    "CityGrew",
+    "ImprovementBuilt",
+    "ResourcesChanged",
+    "TilesRevealed",
+    "TurnEnded",
+    "UnitCreated",
+    "UnitMoved",
+    "UnitRemoved",
+]
@@ -0,0 +1,140 @@
+"""On-disk cache of generated maps with background pre-warming.
+
+Maps are keyed by ``(GENERATOR_VERSION, width, height, seed, players)`` and
+stored as one terrain byte per tile plus the spawn points, which is much
+faster to read back than running the generator again.  :class:`MapPool` hands
+out maps for consecutive seeds and generates the next few on a worker thread
+so starting a game does not wait for map generation.
+"""
+
+from __future__ import annotations
+
+import struct
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .. import config
+from .mapgen import GENERATOR_VERSION, generate_map
+from .models import Coord, Tile
+from .saveio import TERRAIN_KINDS, write_atomic
+
+CACHE_MAGIC = b"4XMC"
+# magic, generator version, width, height, spawn count
+CACHE_HEADER = struct.Struct("<4sHIIH")
+SPAWN = struct.Struct("<II")
+
+GeneratedMap = Tuple[List[Tile], List[Coord]]
+
+
+def cache_path(
+    cache_dir: str | Path, w: int, h: int, seed: int, players: int = config.PLAYERS
+) -> Path:
+    name = f"map-v{GENERATOR_VERSION}-{w}x{h}-{seed}-p{players}.bin"
+    return Path(cache_dir) / name
+
+
+def encode_map(w: int, h: int, tiles: List[Tile], spawns: List[Coord]) -> bytes:
+    kinds = {kind: i for i, kind in enumerate(TERRAIN_KINDS)}
+    header = CACHE_HEADER.pack(CACHE_MAGIC, GENERATOR_VERSION, w, h, len(spawns))
+    spawn_data = b"".join(SPAWN.pack(*pos) for pos in spawns)
+    return header + spawn_data + bytes(kinds[t.kind] for t in tiles)
+
+
+def decode_map(data: bytes) -> GeneratedMap:
+    magic, version, w, h, count = CACHE_HEADER.unpack_from(data)
+    if magic != CACHE_MAGIC or version != GENERATOR_VERSION:
+        raise ValueError("stale map cache entry")
+    offset = CACHE_HEADER.size
+    spawns = [SPAWN.unpack_from(data, offset + i * SPAWN.size) for i in range(count)]
+    offset += count * SPAWN.size
+    terrain = data[offset : offset + w * h]
+    if len(terrain) != w * h:
+        raise ValueError("truncated map cache entry")
+    tiles = [
+        Tile(x=i % w, y=i // w, kind=TERRAIN_KINDS[k]) for i, k in enumerate(terrain)
+    ]
+    return tiles, [tuple(pos) for pos in spawns]
+
+
+def load_or_generate(
+    w: int,
+    h: int,
+    seed: int,
+    cache_dir: str | Path,
+    players: int = config.PLAYERS,
+) -> GeneratedMap:
+    """Return the map for ``seed``, generating and caching it on a miss."""
+    path = cache_path(cache_dir, w, h, seed, players)
+    try:
+        tiles, spawns = decode_map(path.read_bytes())
+        if len(spawns) == players:
+            return tiles, spawns
+    except (OSError, ValueError, struct.error):
+        pass
+    tiles, spawns = generate_map(w, h, seed=seed, players=players)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, encode_map(w, h, tiles, spawns))
+    except OSError:
+        # The cache is only an optimisation; a read-only disk is fine.
+        pass
+    return tiles, spawns
+
+
+def warm(
+    w: int, h: int, seed: int, cache_dir: str | Path, players: int = config.PLAYERS
+) -> None:
+    """Make sure the map for ``seed`` is in the cache without decoding it."""
+    if not cache_path(cache_dir, w, h, seed, players).exists():
+        load_or_generate(w, h, seed, cache_dir, players)
+
+
+class MapPool:
+    """Hand out maps for consecutive seeds, pre-warming the next ``ahead``."""
+
+    def __init__(
+        self,
+        size: Tuple[int, int],
+        cache_dir: str | Path,
+        first_seed: int = 1,
+        ahead: int = 3,
+        players: int = config.PLAYERS,
+    ) -> None:
+        self.size = size
+        self.players = players
+        self.cache_dir = Path(cache_dir)
+        self.next_seed = first_seed
+        self.ahead = ahead
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="maps")
+        self._warming: Dict[int, Future[None]] = {}
+        self.prewarm()
+
+    def prewarm(self) -> None:
+        """Queue generation of the next ``ahead`` seeds on the worker."""
+        for seed in range(self.next_seed, self.next_seed + self.ahead):
+            if seed not in self._warming:
+                self._warming[seed] = self._executor.submit(
+                    warm, *self.size, seed, self.cache_dir, self.players
+                )
+
+    def take(self) -> Tuple[int, List[Tile], List[Coord]]:
+        """Return ``(seed, tiles, spawns)`` for the next seed."""
+        seed = self.next_seed
+        self.next_seed += 1
+        future = self._warming.pop(seed, None)
+        if future is not None:
+            # Usually finished long ago; otherwise wait rather than generate
+            # the same map twice.
+            future.result()
+        tiles, spawns = load_or_generate(*self.size, seed, self.cache_dir, self.players)
+        self.prewarm()
+        return seed, tiles, spawns
+
+    def close(self) -> None:
+        for future in self._warming.values():
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+
+__all__ = ["MapPool", "cache_path", "decode_map", "encode_map", "load_or_generate"]
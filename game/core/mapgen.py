@@ -8,8 +8,45 @@ from typing import List, Tuple
 from .. import config
 from .models import Tile, Unit
 
+# Bump whenever the output of ``generate_map`` changes for a given seed so
+# cached maps from older versions are regenerated.
+GENERATOR_VERSION = 2
 
-def generate_map(w: int, h: int, seed: int) -> Tuple[List[Tile], List[Tuple[int, int]]]:
+
+def place_spawns(w: int, h: int, count: int) -> List[Tuple[int, int]]:
+    """Pick ``count`` spawn points spread as far apart as possible.
+
+    Spawns stay off the map edge.  The first one is the top-left corner and
+    each next one is the tile farthest from all spawns chosen so far, with
+    ties going to the first tile in row order; two players therefore start
+    in opposite corners.  Spawns may coincide if the map is too small.
+    """
+
+    xs = range(1, w - 1) if w > 2 else range(w)
+    ys = range(1, h - 1) if h > 2 else range(h)
+    candidates = [(x, y) for y in ys for x in xs]
+    spawns = [candidates[0]]
+    # Distance from each candidate to its nearest spawn, updated per pick so
+    # placing N spawns costs N passes over the map.
+    nearest = [w + h] * len(candidates)
+    while len(spawns) < count:
+        sx, sy = spawns[-1]
+        best = 0
+        for i, (x, y) in enumerate(candidates):
+            d = abs(x - sx) + abs(y - sy)
+            if d < nearest[i]:
+                nearest[i] = d
+            if nearest[i] > nearest[best]:
+                best = i
+        spawns.append(candidates[best])
+    return spawns
+
+
+def generate_map(
+    w: int, h: int, seed: int, players: int = config.PLAYERS
+) -> Tuple[List[Tile], List[Tuple[int, int]]]:
+    if not 1 <= players <= config.MAX_PLAYERS:
+        raise ValueError(f"players must be between 1 and {config.MAX_PLAYERS}")
     rng = Random(seed)
     tiles: List[Tile] = []
     for y in range(h):
@@ -23,8 +60,7 @@ def generate_map(w: int, h: int, seed: int) -> Tuple[List[Tile], List[Tuple[int,
             else:
                 kind = "plains"
             tiles.append(Tile(x=x, y=y, kind=kind))
-    # spawn points at opposite corners on land
-    spawns = [(1, 1), (w - 2, h - 2)]
+    spawns = place_spawns(w, h, players)
     for sx, sy in spawns:
         idx = sy * w + sx
         tiles[idx].kind = "plains"
@@ -58,4 +94,4 @@ def initial_units(spawns: List[Tuple[int, int]]) -> List[Unit]:
     return units
 
 
-__all__ = ["generate_map", "initial_units"]
+__all__ = ["GENERATOR_VERSION", "generate_map", "initial_units", "place_spawns"]
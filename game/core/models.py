@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from . import zobrist
 
 Coord = Tuple[int, int]
 
@@ -13,14 +16,25 @@ class Tile:
     x: int
     y: int
     kind: str  # 'plains' | 'forest' | 'hill' | 'water'
-    revealed_by: Set[int] = field(default_factory=set)
+    revealed: int = 0  # bit ``1 << player`` is set once the player saw it
     improvements: Set[str] = field(default_factory=set)
 
+    def is_revealed(self, player: int) -> bool:
+        return bool(self.revealed >> player & 1)
+
+    def reveal(self, player: int) -> bool:
+        """Reveal the tile to ``player``; return ``False`` if already seen."""
+        bit = 1 << player
+        if self.revealed & bit:
+            return False
+        self.revealed |= bit
+        return True
+
 
 @dataclass
 class Unit:
     id: int
-    owner: int  # 0 human, 1 ai
+    owner: int  # player id; see ``config.HUMAN_PLAYER``
     kind: str  # 'scout' | 'soldier' | 'settler'
     pos: Coord
     moves_left: int
@@ -48,6 +62,109 @@ class Player:
     prod: int = 0
 
 
+@dataclass
+class Census:
+    """What a player owns, kept up to date by the rules."""
+
+    cities: int = 0
+    units: int = 0
+    settlers: int = 0
+
+
+class TileOverlay(Sequence[Tile]):
+    """Tiles read through to ``base`` except those replaced in the overlay.
+
+    Copying an overlay copies only the replaced tiles, so each clone in a
+    chain of look-ahead clones costs what it changed.  ``base`` must not be
+    changed while overlays over it are in use.
+    """
+
+    def __init__(
+        self, base: Sequence[Tile], changed: Optional[Dict[int, Tile]] = None
+    ) -> None:
+        self._base = base
+        self._changed = {} if changed is None else changed
+
+    @property
+    def base(self) -> Sequence[Tile]:
+        return self._base
+
+    @property
+    def changed(self) -> Dict[int, Tile]:
+        """The replaced tiles by index; do not modify."""
+        return self._changed
+
+    def __len__(self) -> int:
+        return len(self._base)
+
+    def __getitem__(self, idx):  # type: ignore[override]
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        tile = self._changed.get(idx)
+        return self._base[idx] if tile is None else tile
+
+    def __setitem__(self, idx: int, tile: Tile) -> None:
+        self._changed[idx % len(self)] = tile
+
+    def __iter__(self) -> Iterator[Tile]:
+        changed = self._changed
+        for idx, tile in enumerate(self._base):
+            yield changed.get(idx, tile)
+
+    def copy(self) -> TileOverlay:
+        return TileOverlay(self._base, dict(self._changed))
+
+
+@dataclass(eq=False)
+class Changes:
+    """Identifiers of entities mutated since the tracker was last cleared.
+
+    Unit and city ids are kept even when the entity has been deleted so that
+    consumers can notice removals by checking the id against the state.
+    """
+
+    tiles: Set[Coord] = field(default_factory=set)
+    units: Set[int] = field(default_factory=set)
+    cities: Set[int] = field(default_factory=set)
+    players: Set[int] = field(default_factory=set)
+
+    def clear(self) -> None:
+        self.tiles.clear()
+        self.units.clear()
+        self.cities.clear()
+        self.players.clear()
+
+    def __bool__(self) -> bool:
+        return bool(self.tiles or self.units or self.cities or self.players)
+
+
+class EventBus:
+    """Synchronous publish/subscribe keyed by event class.
+
+    Handlers run immediately inside :meth:`publish`; with no subscribers a
+    publish costs one dictionary lookup.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: Dict[type, List[Callable[[Any], None]]] = {}
+
+    def subscribe(self, event_type: type, handler: Callable[[Any], None]) -> None:
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type: type, handler: Callable[[Any], None]) -> None:
+        handlers = self._handlers.get(event_type, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def publish(self, event: Any) -> None:
+        handlers = self._handlers.get(type(event))
+        if handlers:
+            for handler in tuple(handlers):
+                handler(event)
+
+
 @dataclass
 class State:
     width: int
@@ -60,11 +177,218 @@ class State:
     turn: int = 1
     next_unit_id: int = 1
     next_city_id: int = 1
+    trackers: List[Changes] = field(default_factory=list, repr=False, compare=False)
+    bus: EventBus = field(default_factory=EventBus, repr=False, compare=False)
+    _census: Optional[Dict[int, Census]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _zobrist: Optional[zobrist.ZobristHash] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _reveals: Optional[Dict[int, int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # After :meth:`clone` tile objects are shared; this holds the indices of
+    # tiles that have since been copied and may be changed in place.
+    _own_tiles: Optional[Set[int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def track(self) -> Changes:
+        """Return a new :class:`Changes` that records every later mutation."""
+        changes = Changes()
+        self.trackers.append(changes)
+        return changes
+
+    def untrack(self, changes: Changes) -> None:
+        if changes in self.trackers:
+            self.trackers.remove(changes)
+
+    def mark_tile(self, coord: Coord) -> None:
+        for changes in self.trackers:
+            changes.tiles.add(coord)
+
+    def mark_unit(self, unit_id: int) -> None:
+        for changes in self.trackers:
+            changes.units.add(unit_id)
+
+    def mark_city(self, city_id: int) -> None:
+        for changes in self.trackers:
+            changes.cities.add(city_id)
+
+    def mark_player(self, player_id: int) -> None:
+        for changes in self.trackers:
+            changes.players.add(player_id)
+
+    def census(self) -> Dict[int, Census]:
+        """Return each player's :class:`Census`, counting on first use.
+
+        Afterwards the counts are adjusted by :meth:`count_unit` and
+        :meth:`count_city` as the rules change ownership, so reading them
+        costs nothing per unit or city.
+        """
+        if self._census is None:
+            census = {pid: Census() for pid in self.players}
+            for unit in self.units.values():
+                entry = census.setdefault(unit.owner, Census())
+                entry.units += 1
+                entry.settlers += unit.kind == "settler"
+            for city in self.cities.values():
+                census.setdefault(city.owner, Census()).cities += 1
+            self._census = census
+        return self._census
+
+    def recount(self) -> None:
+        """Forget the counts and hash after entities were replaced directly."""
+        self._census = None
+        self._zobrist = None
+        self._reveals = None
+
+    def reveal_counts(self) -> Dict[int, int]:
+        """Return how many tiles each player has revealed, counting once.
+
+        Afterwards :meth:`count_reveal` keeps the counts current.  Tile
+        sequences with a ``reveal_counts`` method, such as a mapped save,
+        count from their packed grid instead of from ``Tile`` objects.
+        """
+        if self._reveals is None:
+            counter = getattr(self.tiles, "reveal_counts", None)
+            if counter is not None:
+                self._reveals = counter()
+            else:
+                counts: Dict[int, int] = {}
+                for tile in self.tiles:
+                    mask = tile.revealed
+                    while mask:
+                        low = mask & -mask
+                        player = low.bit_length() - 1
+                        counts[player] = counts.get(player, 0) + 1
+                        mask ^= low
+                self._reveals = counts
+        return self._reveals
+
+    def count_reveal(self, player: int) -> None:
+        """Record one more tile revealed to ``player``."""
+        if self._reveals is None:
+            return
+        old = self._reveals.get(player, 0)
+        self._reveals[player] = old + 1
+        if self._zobrist is not None:
+            if old:
+                self._zobrist.toggle(zobrist.reveal_key(player, old))
+            self._zobrist.toggle(zobrist.reveal_key(player, old + 1))
+
+    def count_unit(self, unit: Unit, delta: int) -> None:
+        """Record ``unit`` being added (``delta=1``) or removed (``-1``)."""
+        if self._census is not None:
+            entry = self._census.setdefault(unit.owner, Census())
+            entry.units += delta
+            if unit.kind == "settler":
+                entry.settlers += delta
+
+    def count_city(self, owner: int, delta: int) -> None:
+        if self._census is not None:
+            self._census.setdefault(owner, Census()).cities += delta
+
+    def clone(self, overlay: bool = False) -> State:
+        """Return an independent copy for look-ahead, such as AI search.
+
+        The copy has no trackers or subscribers; the counts and hash are
+        carried over rather than recomputed.  Tiles are shared until either
+        side changes one through :meth:`tile_for_update`, but the tile
+        sequence itself is copied.  With ``overlay`` the copy gets a
+        :class:`TileOverlay` over that sequence, and clones of the copy then
+        only copy the tiles it changed.
+        """
+        tiles = self.tiles.copy()
+        if overlay and not isinstance(tiles, TileOverlay):
+            tiles = TileOverlay(tiles)
+        state = State(
+            self.width,
+            self.height,
+            tiles,
+            {
+                uid: Unit(u.id, u.owner, u.kind, u.pos, u.moves_left)
+                for uid, u in self.units.items()
+            },
+            {
+                cid: City(
+                    c.id,
+                    c.owner,
+                    c.pos,
+                    c.size,
+                    set(c.claimed),
+                    c.focus,
+                    c.last_grow_turn,
+                )
+                for cid, c in self.cities.items()
+            },
+            {pid: Player(p.id, p.food, p.prod) for pid, p in self.players.items()},
+            self.current_player,
+            self.turn,
+            self.next_unit_id,
+            self.next_city_id,
+        )
+        if self._census is not None:
+            state._census = {
+                pid: Census(c.cities, c.units, c.settlers)
+                for pid, c in self._census.items()
+            }
+        if self._zobrist is not None:
+            state._zobrist = self._zobrist.copy()
+        if self._reveals is not None:
+            state._reveals = dict(self._reveals)
+        self._own_tiles = set()
+        state._own_tiles = set()
+        return state
+
+    def zobrist(self) -> int:
+        """Return the 64-bit Zobrist hash, computing it on first use.
+
+        The rules keep it current through the ``hash_*`` methods below, each
+        of which XORs one feature in or out and does nothing until the hash
+        has been asked for.  See :mod:`game.core.zobrist`.
+        """
+        if self._zobrist is None:
+            self._zobrist = zobrist.ZobristHash(self)
+        return self._zobrist.value
+
+    def hash_unit(self, unit: Unit) -> None:
+        if self._zobrist is not None:
+            self._zobrist.toggle(zobrist.unit_key(unit))
+
+    def hash_city(self, city: City) -> None:
+        if self._zobrist is not None:
+            self._zobrist.toggle(zobrist.city_key(city))
+
+    def hash_improvement(self, coord: Coord, kind: str) -> None:
+        if self._zobrist is not None:
+            self._zobrist.toggle(zobrist.improvement_key(coord, kind))
+
+    def hash_turn(self) -> None:
+        if self._zobrist is not None:
+            self._zobrist.toggle(zobrist.turn_key(self.current_player, self.turn))
+
+    def hash_resources(self, player: Player) -> None:
+        if self._zobrist is not None:
+            self._zobrist.update_resources(player)
 
     def tile_at(self, coord: Coord) -> Tile:
         x, y = coord
         return self.tiles[y * self.width + x]
 
+    def tile_for_update(self, coord: Coord) -> Tile:
+        """Return the tile at ``coord`` for changing, unsharing it if cloned."""
+        idx = coord[1] * self.width + coord[0]
+        tile = self.tiles[idx]
+        if self._own_tiles is not None and idx not in self._own_tiles:
+            tile = Tile(
+                tile.x, tile.y, tile.kind, tile.revealed, set(tile.improvements)
+            )
+            self.tiles[idx] = tile
+            self._own_tiles.add(idx)
+        return tile
+
     def units_at(self, coord: Coord) -> List[Unit]:
         return [u for u in self.units.values() if u.pos == coord]
 
@@ -76,10 +400,14 @@ class State:
 
 
 __all__ = [
+    "Census",
+    "Changes",
     "City",
+    "EventBus",
     "Coord",
     "Player",
     "State",
     "Tile",
+    "TileOverlay",
     "Unit",
 ]
@@ -5,7 +5,8 @@ from __future__ import annotations
 from random import Random
 
 from .. import config
-from .models import City, Coord, State, Unit
+from . import events
+from .models import City, Coord, Player, State, Unit
 
 
 class RuleError(Exception):
@@ -21,11 +22,26 @@ def distance(a: Coord, b: Coord) -> int:
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
 
+def _resources_changed(state: State, player: Player) -> None:
+    state.hash_resources(player)
+    state.mark_player(player.id)
+    state.bus.publish(events.ResourcesChanged(player.id, player.food, player.prod))
+
+
 def reveal(state: State, unit: Unit) -> None:
-    for x in range(state.width):
-        for y in range(state.height):
-            if distance((x, y), unit.pos) <= config.REVEAL_RADIUS:
-                state.tile_at((x, y)).revealed_by.add(unit.owner)
+    r = config.REVEAL_RADIUS
+    ux, uy = unit.pos
+    revealed = []
+    for x in range(max(0, ux - r), min(state.width, ux + r + 1)):
+        for y in range(max(0, uy - r), min(state.height, uy + r + 1)):
+            if distance((x, y), unit.pos) <= r:
+                if not state.tile_at((x, y)).is_revealed(unit.owner):
+                    state.tile_for_update((x, y)).reveal(unit.owner)
+                    state.count_reveal(unit.owner)
+                    state.mark_tile((x, y))
+                    revealed.append((x, y))
+    if revealed:
+        state.bus.publish(events.TilesRevealed(unit.owner, tuple(revealed)))
 
 
 def tile_yield(state: State, coord: Coord) -> tuple[int, int]:
@@ -66,11 +82,25 @@ def grow_city(state: State, city: City, rng: Random) -> bool:
         return False
 
     player.food -= cost
+    state.hash_city(city)
     city.size += 1
+    state.hash_city(city)
     city.last_grow_turn = state.turn
+    _resources_changed(state, player)
+    state.mark_city(city.id)
+    state.bus.publish(events.CityGrew(city.id, city.size))
     return True
 
 
+def move_cost(state: State, dest: Coord) -> int:
+    """Moves needed to enter ``dest``; roads halve the terrain cost."""
+    tile = state.tile_at(dest)
+    cost = config.MOVE_COST[tile.kind]
+    if "road" in tile.improvements:
+        cost = max(1, cost // 2)
+    return cost
+
+
 def move_unit(state: State, unit_id: int, dest: Coord) -> None:
     unit = state.units[unit_id]
     if unit.owner != state.current_player:
@@ -81,23 +111,42 @@ def move_unit(state: State, unit_id: int, dest: Coord) -> None:
     dy = abs(dest[1] - unit.pos[1])
     if max(dx, dy) != 1:
         raise RuleError("must move to adjacent tile")
-    tile = state.tile_at(dest)
-    cost = config.MOVE_COST[tile.kind]
-    if "road" in tile.improvements:
-        cost = max(1, cost // 2)
+    cost = move_cost(state, dest)
     if cost > unit.moves_left:
         raise RuleError("not enough moves")
+    src = unit.pos
+    state.hash_unit(unit)
     unit.pos = dest
     unit.moves_left -= cost
+    state.hash_unit(unit)
+    state.mark_unit(unit.id)
+    state.bus.publish(events.UnitMoved(unit.id, unit.owner, src, dest))
     reveal(state, unit)
     for other in list(state.units.values()):
         if other is unit:
             continue
         if other.pos == dest and other.owner != unit.owner:
-            del state.units[other.id]
+            remove_unit(state, other.id)
     city = state.city_at(dest)
     if city and city.owner != unit.owner and unit.kind == "soldier":
+        old_owner = city.owner
+        state.hash_city(city)
         city.owner = unit.owner
+        state.hash_city(city)
+        state.count_city(old_owner, -1)
+        state.count_city(city.owner, 1)
+        state.mark_city(city.id)
+        state.bus.publish(events.CityCaptured(city.id, old_owner, unit.owner))
+
+
+def remove_unit(state: State, unit_id: int) -> Unit:
+    """Delete a unit, keeping the census and change tracking up to date."""
+    unit = state.units.pop(unit_id)
+    state.count_unit(unit, -1)
+    state.hash_unit(unit)
+    state.mark_unit(unit.id)
+    state.bus.publish(events.UnitRemoved(unit.id, unit.owner, unit.pos))
+    return unit
 
 
 def build_infrastructure(state: State, coord: Coord, kind: str) -> None:
@@ -124,24 +173,41 @@ def build_infrastructure(state: State, coord: Coord, kind: str) -> None:
     if player.prod < cost:
         raise RuleError("not enough production")
     player.prod -= cost
-    tile.improvements.add(kind)
+    state.tile_for_update(coord).improvements.add(kind)
+    state.hash_improvement(coord, kind)
+    _resources_changed(state, player)
+    state.mark_tile(coord)
+    state.bus.publish(events.ImprovementBuilt(coord, kind))
+
+
+def ring(state: State, center: Coord, radius: int) -> list[Coord]:
+    """Return in-bounds tiles at exactly ``radius`` steps from ``center``."""
+    cx, cy = center
+    coords = []
+    for dx in range(-radius, radius + 1):
+        dy = radius - abs(dx)
+        for y in {cy - dy, cy + dy}:
+            if in_bounds(state, (cx + dx, y)):
+                coords.append((cx + dx, y))
+    return coords
 
 
 def claim_best_tile(state: State, city: City, rng: Random) -> bool:
     claimed_tiles = {coord for c in state.cities.values() for coord in c.claimed}
-    unclaimed = [
-        (x, y)
-        for x in range(state.width)
-        for y in range(state.height)
-        if (x, y) not in claimed_tiles
-        and city.owner in state.tile_at((x, y)).revealed_by
-    ]
-    if not unclaimed:
+    # Search outwards ring by ring so only tiles up to the nearest free one
+    # are inspected rather than the whole map.
+    nearest: list[Coord] = []
+    for radius in range(state.width + state.height):
+        nearest = [
+            c
+            for c in ring(state, city.pos, radius)
+            if c not in claimed_tiles and state.tile_at(c).is_revealed(city.owner)
+        ]
+        if nearest:
+            break
+    if not nearest:
         return False
 
-    min_dist = min(distance(city.pos, c) for c in unclaimed)
-    nearest = [c for c in unclaimed if distance(city.pos, c) == min_dist]
-
     def neighbour_count(coord: Coord) -> int:
         x, y = coord
         neighbours = [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]
@@ -150,6 +216,7 @@ def claim_best_tile(state: State, city: City, rng: Random) -> bool:
     max_neigh = max(neighbour_count(c) for c in nearest)
     candidates = [c for c in nearest if neighbour_count(c) == max_neigh]
     city.claimed.add(rng.choice(sorted(candidates)))
+    state.mark_city(city.id)
     return True
 
 
@@ -157,9 +224,11 @@ def end_turn(state: State, rng: Random | None = None) -> None:
     rng = rng or Random()
     # discard unused production from the player whose turn just ended
     state.players[state.current_player].prod = 0
+    paid = {state.current_player}
     for city in state.cities.values():
         if not city.claimed:
             city.claimed.add(city.pos)
+            state.mark_city(city.id)
         grow_city(state, city, rng)
         tiles = list(city.claimed)
         focus_idx = 0 if city.focus == "food" else 1
@@ -178,12 +247,22 @@ def end_turn(state: State, rng: Random | None = None) -> None:
         player = state.players[city.owner]
         player.food += total_food
         player.prod += total_prod
+        paid.add(player.id)
+    for player_id in sorted(paid):
+        _resources_changed(state, state.players[player_id])
 
-    state.current_player = 1 - state.current_player
+    ended = state.current_player
+    state.hash_turn()
+    state.current_player = next_player(state)
     state.turn += 1
+    state.hash_turn()
     for unit in state.units.values():
         if unit.owner == state.current_player:
+            state.hash_unit(unit)
             unit.moves_left = config.UNIT_STATS[unit.kind]["moves"]
+            state.hash_unit(unit)
+            state.mark_unit(unit.id)
+    state.bus.publish(events.TurnEnded(ended, state.current_player, state.turn))
 
 
 def found_city(state: State, unit_id: int, rng: Random | None = None) -> City:
@@ -210,10 +289,14 @@ def found_city(state: State, unit_id: int, rng: Random | None = None) -> City:
     city.claimed.add(city.pos)
 
     state.cities[city.id] = city
+    state.count_city(city.owner, 1)
+    state.hash_city(city)
     state.next_city_id += 1
-    del state.units[unit.id]
+    state.mark_city(city.id)
+    remove_unit(state, unit.id)
 
     claim_best_tile(state, city, rng)
+    state.bus.publish(events.CityFounded(city.id, city.owner, city.pos))
     return city
 
 
@@ -237,7 +320,9 @@ def buy_unit(state: State, city_id: int, kind: str) -> Unit:
     player.food -= cost_food
     player.prod -= cost_prod
     if kind == "settler":
+        state.hash_city(city)
         city.size -= 1
+        state.hash_city(city)
     unit = Unit(
         id=state.next_unit_id,
         owner=city.owner,
@@ -246,30 +331,61 @@ def buy_unit(state: State, city_id: int, kind: str) -> Unit:
         moves_left=config.UNIT_STATS[kind]["moves"],
     )
     state.units[unit.id] = unit
+    state.count_unit(unit, 1)
+    state.hash_unit(unit)
     state.next_unit_id += 1
+    _resources_changed(state, player)
+    state.mark_city(city.id)
+    state.mark_unit(unit.id)
+    state.bus.publish(events.UnitCreated(unit.id, unit.owner, kind, unit.pos))
     reveal(state, unit)
     return unit
 
 
-def check_win(state: State) -> int | None:
-    """Return winning player if a side has no cities *and* no settlers."""
-    city_owners = {city.owner for city in state.cities.values()}
-    settler_owners = {
-        unit.owner for unit in state.units.values() if unit.kind == "settler"
+def alive_players(state: State) -> set[int]:
+    """Return the players that still own a city or a settler."""
+    return {
+        pid
+        for pid, counts in state.census().items()
+        if (counts.cities or counts.settlers) and pid in state.players
     }
-    for player_id in state.players:
-        if player_id not in city_owners and player_id not in settler_owners:
-            return 1 - player_id
+
+
+def next_player(state: State) -> int:
+    """Return who plays after the current player.
+
+    Players take turns in id order; players without cities or settlers are
+    skipped.
+    """
+    order = sorted(state.players)
+    alive = alive_players(state)
+    start = order.index(state.current_player) if state.current_player in order else -1
+    for step in range(1, len(order) + 1):
+        candidate = order[(start + step) % len(order)]
+        if candidate in alive:
+            return candidate
+    return order[(start + 1) % len(order)]
+
+
+def check_win(state: State) -> int | None:
+    """Return the last player left once every other has no cities or settlers."""
+    alive = alive_players(state)
+    if len(alive) == 1 and len(state.players) > 1:
+        return next(iter(alive))
     return None
 
 
 __all__ = [
     "RuleError",
     "move_unit",
+    "move_cost",
     "end_turn",
     "found_city",
     "buy_unit",
     "check_win",
+    "alive_players",
+    "remove_unit",
+    "next_player",
     "grow_city",
     "build_infrastructure",
     "tile_yield",
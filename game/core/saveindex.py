@@ -0,0 +1,139 @@
+"""Save summaries and the per-directory save index.
+
+Every save gets a small JSON sidecar (``<save>.meta``) describing the game
+at a glance together with a thumbnail-size minimap, and the directory keeps
+an ``index.json`` of all sidecars.  Listing saves only reads the index, so a
+browser can show hundreds of saves without loading any of them.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .models import State
+
+META_SUFFIX = ".meta"
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+THUMB_SIZE = 32
+# One character per minimap cell; cities are drawn as their owner's digit.
+THUMB_CHARS = {"plains": ".", "forest": "f", "hill": "h", "water": "~"}
+SAVE_SUFFIXES = (".sav", ".json", ".json.gz")
+
+
+def meta_path(path: str | Path) -> Path:
+    return Path(str(path) + META_SUFFIX)
+
+
+def is_save_file(name: str) -> bool:
+    return name != INDEX_NAME and name.endswith(SAVE_SUFFIXES)
+
+
+def thumbnail(state: State, size: int = THUMB_SIZE) -> List[str]:
+    """Return a minimap of at most ``size`` x ``size`` cells.
+
+    Each cell samples a single tile, so building it touches only a handful
+    of tiles even on huge maps.  Tiles of a mapped binary save are read
+    from the terrain grid without being materialized.
+    """
+
+    step = max(1, -(-max(state.width, state.height) // size))
+    cols = range(0, state.width, step)
+    rows = range(0, state.height, step)
+    tiles = state.tiles
+    kind_at = getattr(tiles, "kind_at", None) or (lambda idx: tiles[idx].kind)
+    width = state.width
+    grid = [[THUMB_CHARS.get(kind_at(y * width + x), "?") for x in cols] for y in rows]
+    for city in state.cities.values():
+        gx, gy = city.pos[0] // step, city.pos[1] // step
+        grid[gy][gx] = str(city.owner % 10)
+    return ["".join(row) for row in grid]
+
+
+def summarize(state: State) -> Dict[str, Any]:
+    """Return the metadata shown when browsing saves.
+
+    City and unit counts come from :meth:`State.census`, the counts the
+    rules keep for win checks.
+    """
+    census = state.census()
+    # Keys are strings so summaries look the same before and after JSON.
+    cities = {str(pid): counts.cities for pid, counts in census.items()}
+    units = {str(pid): counts.units for pid, counts in census.items()}
+    return {
+        "turn": state.turn,
+        "current_player": state.current_player,
+        "players": sorted(state.players),
+        "width": state.width,
+        "height": state.height,
+        "cities": cities,
+        "units": units,
+        "minimap": thumbnail(state),
+    }
+
+
+def _write_json(path: Path, data: Any) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+
+
+def read_index(directory: str | Path) -> Dict[str, Dict[str, Any]]:
+    path = Path(directory) / INDEX_NAME
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != INDEX_VERSION:
+        return {}
+    return data["saves"]
+
+
+def record_save(path: str | Path, summary: Dict[str, Any]) -> None:
+    """Write the sidecar for the save at ``path`` and update its index."""
+    path = Path(path)
+    entry = dict(summary, saved_at=time.time())
+    _write_json(meta_path(path), entry)
+    saves = read_index(path.parent)
+    saves[path.name] = entry
+    _write_json(path.parent / INDEX_NAME, {"version": INDEX_VERSION, "saves": saves})
+
+
+def list_saves(directory: str | Path) -> List[Dict[str, Any]]:
+    """Return summaries of the saves in ``directory``, newest first.
+
+    Only the index and the directory listing are read.  Saves missing from
+    the index fall back to their sidecar; saves without one are skipped.
+    """
+
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    saves = read_index(directory)
+    entries = []
+    for item in os.scandir(directory):
+        if not is_save_file(item.name):
+            continue
+        entry = saves.get(item.name)
+        if entry is None:
+            try:
+                entry = json.loads(meta_path(item.path).read_text())
+            except (OSError, ValueError):
+                continue
+        entries.append(dict(entry, name=item.name, path=item.path))
+    entries.sort(key=lambda e: e.get("saved_at", 0), reverse=True)
+    return entries
+
+
+__all__ = [
+    "list_saves",
+    "meta_path",
+    "read_index",
+    "record_save",
+    "summarize",
+    "thumbnail",
+]
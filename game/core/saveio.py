@@ -1,54 +1,127 @@
-"""JSON save/load for game state."""
+"""JSON and binary save/load for game state.
+
+Saves ending in ``.sav`` use a binary layout: a small JSON header with the
+units, cities and players followed by fixed-size terrain, reveal and
+improvement grids.  Loading such a file memory-maps the grids and only builds
+``Tile`` objects when they are accessed.  The mapping is closed by
+:func:`close_state`, or before any save is written over its file.  Every
+other path is stored as JSON, gzip compressed when the name ends in ``.gz``.
+"""
 
 from __future__ import annotations
 
+import copy
+import gzip
 import json
+import mmap
+import os
+import struct
+import threading
+import uuid
+import weakref
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Tuple
 
-from .models import City, Player, State, Tile, Unit
+from .. import config
+from . import saveindex
+from .models import Changes, City, Player, State, Tile, TileOverlay, Unit
 
+DELTA_SUFFIX = ".delta"
+# Key naming the full save a delta log line was recorded against.
+BASE_ID_KEY = "base_id"
+GZIP_MAGIC = b"\x1f\x8b"
 
-def state_to_dict(state: State) -> Dict[str, Any]:
+BINARY_SUFFIX = ".sav"
+BINARY_MAGIC = b"4XSV"
+BINARY_VERSION = 1
+# magic, version, header length
+BINARY_PREFIX = struct.Struct("<4sHI")
+REVEAL_CELL = struct.Struct("<H")
+TERRAIN_KINDS = tuple(config.MOVE_COST)
+IMPROVEMENT_BITS = {kind: 1 << i for i, kind in enumerate(config.INFRASTRUCTURE)}
+
+TileRow = Tuple[str, int, Tuple[str, ...]]
+
+
+def tile_to_dict(tile: Tile) -> Dict[str, Any]:
+    return {
+        "x": tile.x,
+        "y": tile.y,
+        "kind": tile.kind,
+        "revealed": tile.revealed,
+        "improvements": sorted(tile.improvements),
+    }
+
+
+def unit_to_dict(unit: Unit) -> Dict[str, Any]:
+    return {
+        "id": unit.id,
+        "owner": unit.owner,
+        "kind": unit.kind,
+        "pos": list(unit.pos),
+        "moves_left": unit.moves_left,
+    }
+
+
+def city_to_dict(city: City) -> Dict[str, Any]:
+    return {
+        "id": city.id,
+        "owner": city.owner,
+        "pos": list(city.pos),
+        "size": city.size,
+        "claimed": [list(s) for s in sorted(city.claimed)],
+        "focus": city.focus,
+        "last_grow_turn": city.last_grow_turn,
+    }
+
+
+def player_to_dict(player: Player) -> Dict[str, Any]:
+    return {"id": player.id, "food": player.food, "prod": player.prod}
+
+
+def dict_to_tile(t: Dict[str, Any]) -> Tile:
+    return Tile(
+        x=t["x"],
+        y=t["y"],
+        kind=t["kind"],
+        # Saves from before reveal masks list the player ids instead.
+        revealed=t["revealed"] if "revealed" in t else _reveal_mask(t["revealed_by"]),
+        improvements=set(t.get("improvements", [])),
+    )
+
+
+def dict_to_unit(u: Dict[str, Any]) -> Unit:
+    return Unit(
+        id=u["id"],
+        owner=u["owner"],
+        kind=u["kind"],
+        pos=tuple(u["pos"]),
+        moves_left=u["moves_left"],
+    )
+
+
+def dict_to_city(c: Dict[str, Any]) -> City:
+    return City(
+        id=c["id"],
+        owner=c["owner"],
+        pos=tuple(c["pos"]),
+        size=c.get("size", 1),
+        claimed={tuple(s) for s in c.get("claimed", [])},
+        focus=c.get("focus", "food"),
+        last_grow_turn=c.get("last_grow_turn", -1),
+    )
+
+
+def state_header(state: State) -> Dict[str, Any]:
+    """Return everything from :func:`state_to_dict` except the tiles."""
     return {
         "width": state.width,
         "height": state.height,
-        "tiles": [
-            {
-                "x": t.x,
-                "y": t.y,
-                "kind": t.kind,
-                "revealed_by": list(t.revealed_by),
-                "improvements": list(t.improvements),
-            }
-            for t in state.tiles
-        ],
-        "units": {
-            uid: {
-                "id": u.id,
-                "owner": u.owner,
-                "kind": u.kind,
-                "pos": list(u.pos),
-                "moves_left": u.moves_left,
-            }
-            for uid, u in state.units.items()
-        },
-        "cities": {
-            cid: {
-                "id": c.id,
-                "owner": c.owner,
-                "pos": list(c.pos),
-                "size": c.size,
-                "claimed": [list(s) for s in sorted(c.claimed)],
-                "focus": c.focus,
-                "last_grow_turn": c.last_grow_turn,
-            }
-            for cid, c in state.cities.items()
-        },
-        "players": {
-            pid: {"id": p.id, "food": p.food, "prod": p.prod}
-            for pid, p in state.players.items()
-        },
+        "units": {uid: unit_to_dict(u) for uid, u in state.units.items()},
+        "cities": {cid: city_to_dict(c) for cid, c in state.cities.items()},
+        "players": {pid: player_to_dict(p) for pid, p in state.players.items()},
         "current_player": state.current_player,
         "turn": state.turn,
         "next_unit_id": state.next_unit_id,
@@ -56,39 +129,16 @@ def state_to_dict(state: State) -> Dict[str, Any]:
     }
 
 
+def state_to_dict(state: State) -> Dict[str, Any]:
+    data = state_header(state)
+    data["tiles"] = [tile_to_dict(t) for t in state.tiles]
+    return data
+
+
 def dict_to_state(data: Dict[str, Any]) -> State:
-    tiles = [
-        Tile(
-            x=t["x"],
-            y=t["y"],
-            kind=t["kind"],
-            revealed_by=set(t["revealed_by"]),
-            improvements=set(t.get("improvements", [])),
-        )
-        for t in data["tiles"]
-    ]
-    units = {
-        int(uid): Unit(
-            id=u["id"],
-            owner=u["owner"],
-            kind=u["kind"],
-            pos=tuple(u["pos"]),
-            moves_left=u["moves_left"],
-        )
-        for uid, u in data["units"].items()
-    }
-    cities = {
-        int(cid): City(
-            id=c["id"],
-            owner=c["owner"],
-            pos=tuple(c["pos"]),
-            size=c.get("size", 1),
-            claimed={tuple(s) for s in c.get("claimed", [])},
-            focus=c.get("focus", "food"),
-            last_grow_turn=c.get("last_grow_turn", -1),
-        )
-        for cid, c in data["cities"].items()
-    }
+    tiles = [dict_to_tile(t) for t in data["tiles"]]
+    units = {int(uid): dict_to_unit(u) for uid, u in data["units"].items()}
+    cities = {int(cid): dict_to_city(c) for cid, c in data["cities"].items()}
     players = {int(pid): Player(**p) for pid, p in data["players"].items()}
     return State(
         width=data["width"],
@@ -104,13 +154,600 @@ def dict_to_state(data: Dict[str, Any]) -> State:
     )
 
 
+def snapshot_state(state: State) -> Dict[str, Any]:
+    """Return a consistent copy of ``state`` that is cheap to take.
+
+    Tiles are copied as plain tuples rather than dictionaries; the snapshot
+    shares no mutable objects with ``state`` so it can be encoded on another
+    thread with :func:`snapshot_to_dict` while the game keeps running.
+    """
+
+    tiles: List[TileRow] = [
+        (t.kind, t.revealed, tuple(sorted(t.improvements))) for t in state.tiles
+    ]
+    data = state_header(state)
+    data["tiles"] = tiles
+    return data
+
+
+def snapshot_to_dict(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand a :func:`snapshot_state` result into the save file format."""
+    width = snapshot["width"]
+    data = dict(snapshot)
+    data["tiles"] = [
+        {
+            "x": i % width,
+            "y": i // width,
+            "kind": kind,
+            "revealed": revealed,
+            "improvements": sorted(improvements),
+        }
+        for i, (kind, revealed, improvements) in enumerate(snapshot["tiles"])
+    ]
+    return data
+
+
+def changes_to_dict(state: State, changes: Changes) -> Dict[str, Any]:
+    """Serialize only the entities listed in ``changes``.
+
+    Deleted units and cities are recorded as ``None`` so that
+    :func:`apply_delta` can remove them again.
+    """
+
+    units = {}
+    for uid in sorted(changes.units):
+        unit = state.units.get(uid)
+        units[uid] = unit_to_dict(unit) if unit is not None else None
+    cities = {}
+    for cid in sorted(changes.cities):
+        city = state.cities.get(cid)
+        cities[cid] = city_to_dict(city) if city is not None else None
+    return {
+        "tiles": [tile_to_dict(state.tile_at(c)) for c in sorted(changes.tiles)],
+        "units": units,
+        "cities": cities,
+        "players": {
+            pid: player_to_dict(state.players[pid])
+            for pid in sorted(changes.players)
+            if pid in state.players
+        },
+        "current_player": state.current_player,
+        "turn": state.turn,
+        "next_unit_id": state.next_unit_id,
+        "next_city_id": state.next_city_id,
+    }
+
+
+def apply_delta(state: State, delta: Dict[str, Any]) -> None:
+    """Apply a record produced by :func:`changes_to_dict` to ``state``."""
+
+    for t in delta["tiles"]:
+        state.tiles[t["y"] * state.width + t["x"]] = dict_to_tile(t)
+    for uid, u in delta["units"].items():
+        if u is None:
+            state.units.pop(int(uid), None)
+        else:
+            state.units[int(uid)] = dict_to_unit(u)
+    for cid, c in delta["cities"].items():
+        if c is None:
+            state.cities.pop(int(cid), None)
+        else:
+            state.cities[int(cid)] = dict_to_city(c)
+    for pid, p in delta["players"].items():
+        state.players[int(pid)] = Player(**p)
+    state.recount()
+    state.current_player = delta["current_player"]
+    state.turn = delta["turn"]
+    state.next_unit_id = delta["next_unit_id"]
+    state.next_city_id = delta["next_city_id"]
+
+
+def delta_path(path: str | Path) -> Path:
+    """Return the path of the delta log that belongs to the save at ``path``."""
+    return Path(str(path) + DELTA_SUFFIX)
+
+
+class _Mapping:
+    """The mapped grids of one binary save, shared by copies of its tiles."""
+
+    def __init__(self, path: Path, buf: mmap.mmap, offset: int, n: int) -> None:
+        self.path = path
+        self._buf: mmap.mmap | None = buf
+        self._lock = threading.Lock()
+        view = memoryview(buf)
+        self.terrain = view[offset : offset + n]
+        self.reveal = view[offset + n : offset + 3 * n]
+        self.improvements = view[offset + 3 * n : offset + 4 * n]
+        _MAPPINGS.add(self)
+
+    @property
+    def closed(self) -> bool:
+        return self._buf is None
+
+    def close(self) -> None:
+        """Copy the grids into memory and unmap the file."""
+        with self._lock:
+            buf, self._buf = self._buf, None
+            if buf is None:
+                return
+            self.terrain, self.reveal, self.improvements = (
+                memoryview(grid.tobytes())
+                for grid in (self.terrain, self.reveal, self.improvements)
+            )
+        _MAPPINGS.discard(self)
+        try:
+            buf.close()
+        except BufferError:
+            # Another thread is reading through a slice of the old grids; the
+            # map is closed when that slice and ``buf`` are dropped.
+            pass
+
+
+# Open mappings, so that a save can unmap the file it is about to replace.
+_MAPPINGS: weakref.WeakSet[_Mapping] = weakref.WeakSet()
+
+
+def unmap(path: str | Path) -> None:
+    """Close every mapping of the save at ``path``."""
+    path = Path(path).resolve()
+    for mapping in list(_MAPPINGS):
+        if mapping.path == path:
+            mapping.close()
+
+
+class MappedTiles(Sequence[Tile]):
+    """Tile sequence backed by memory-mapped grids of a binary save.
+
+    ``Tile`` objects are created on first access and cached, so only the
+    pages holding tiles that are actually looked at are read from disk.
+    Copies share the mapping; :meth:`close` copies the grids into memory and
+    releases the file for all of them.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        buf: mmap.mmap,
+        offset: int,
+        width: int,
+        height: int,
+        kinds: List[str],
+    ) -> None:
+        self.width = width
+        self.height = height
+        self._kinds = kinds
+        self._grids = _Mapping(Path(path).resolve(), buf, offset, width * height)
+        self._tiles: Dict[int, Tile] = {}
+
+    @property
+    def path(self) -> Path:
+        """The save the grids were mapped from."""
+        return self._grids.path
+
+    @property
+    def closed(self) -> bool:
+        return self._grids.closed
+
+    def close(self) -> None:
+        self._grids.close()
+
+    def __len__(self) -> int:
+        return self.width * self.height
+
+    def __getitem__(self, idx):  # type: ignore[override]
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        tile = self._tiles.get(idx)
+        if tile is None:
+            if not 0 <= idx < len(self):
+                raise IndexError(idx)
+            grids = self._grids
+            (mask,) = REVEAL_CELL.unpack_from(grids.reveal, idx * 2)
+            bits = grids.improvements[idx]
+            tile = Tile(
+                x=idx % self.width,
+                y=idx // self.width,
+                kind=self._kinds[grids.terrain[idx]],
+                revealed=mask,
+                improvements={k for k, b in IMPROVEMENT_BITS.items() if bits & b},
+            )
+            self._tiles[idx] = tile
+        return tile
+
+    def __setitem__(self, idx: int, tile: Tile) -> None:
+        self._tiles[idx % len(self)] = tile
+
+    def __iter__(self) -> Iterator[Tile]:
+        return (self[i] for i in range(len(self)))
+
+    def copy(self) -> MappedTiles:
+        """Return a sequence over the same grids with its own tile cache."""
+        clone = copy.copy(self)
+        clone._tiles = dict(self._tiles)
+        return clone
+
+    def kind_at(self, idx: int) -> str:
+        """Return the terrain of tile ``idx`` without materializing it."""
+        tile = self._tiles.get(idx)
+        if tile is not None:
+            return tile.kind
+        return self._kinds[self._grids.terrain[idx]]
+
+    def terrain_grid(self) -> bytearray:
+        """Return :func:`terrain_grid` without materializing any tile."""
+        order = {kind: i for i, kind in enumerate(TERRAIN_KINDS)}
+        table = bytes(order[kind] for kind in self._kinds).ljust(256, b"\0")
+        grid = bytearray(self._grids.terrain.tobytes().translate(table))
+        for idx, tile in self._tiles.items():
+            grid[idx] = order[tile.kind]
+        return grid
+
+    def reveal_grid(self, player: int) -> bytearray:
+        """Return :func:`reveal_grid` without materializing any tile."""
+        byte, bit = divmod(player, 8)
+        table = bytes(v >> bit & 1 for v in range(256))
+        # Cells are little-endian, so every other byte holds the same bits.
+        grid = bytearray(self._grids.reveal[byte::2].tobytes().translate(table))
+        for idx, tile in self._tiles.items():
+            grid[idx] = tile.revealed >> player & 1
+        return grid
+
+    def reveal_counts(self) -> Dict[int, int]:
+        """Return how many tiles each player has revealed."""
+        counts = {}
+        for player in range(8 * REVEAL_CELL.size):
+            count = sum(self.reveal_grid(player))
+            if count:
+                counts[player] = count
+        return counts
+
+    @property
+    def materialized(self) -> int:
+        """Number of tiles that have been turned into ``Tile`` objects."""
+        return len(self._tiles)
+
+    def grids(self) -> Tuple[bytearray, bytearray, bytearray]:
+        """Return copies of the grids with materialized tiles folded in."""
+        grids = self._grids
+        terrain = bytearray(grids.terrain)
+        reveal = bytearray(grids.reveal)
+        improvements = bytearray(grids.improvements)
+        _patch_grids(terrain, reveal, improvements, self._tiles.items())
+        return terrain, reveal, improvements
+
+
+def _patch_grids(
+    terrain: bytearray,
+    reveal: bytearray,
+    improvements: bytearray,
+    tiles: Any,
+) -> None:
+    kinds = {kind: i for i, kind in enumerate(TERRAIN_KINDS)}
+    for idx, tile in tiles:
+        terrain[idx] = kinds[tile.kind]
+        REVEAL_CELL.pack_into(reveal, idx * 2, tile.revealed)
+        bits = 0
+        for imp in tile.improvements:
+            bits |= IMPROVEMENT_BITS[imp]
+        improvements[idx] = bits
+
+
+def _reveal_mask(players: Any) -> int:
+    mask = 0
+    for p in players:
+        mask |= 1 << p
+    return mask
+
+
+def pack_grids(state: State) -> Tuple[bytearray, bytearray, bytearray]:
+    """Return the terrain, reveal and improvement grids of ``state``.
+
+    Mapped tiles, also under a :class:`TileOverlay`, are copied from their
+    grids; only tiles that exist as ``Tile`` objects are packed one by one.
+    """
+    return _pack_tiles(state.tiles)
+
+
+def _pack_tiles(tiles: Sequence[Tile]) -> Tuple[bytearray, bytearray, bytearray]:
+    if isinstance(tiles, MappedTiles):
+        return tiles.grids()
+    if isinstance(tiles, TileOverlay):
+        grids = _pack_tiles(tiles.base)
+        _patch_grids(*grids, tiles.changed.items())
+        return grids
+    n = len(tiles)
+    terrain = bytearray(n)
+    reveal = bytearray(2 * n)
+    improvements = bytearray(n)
+    _patch_grids(terrain, reveal, improvements, enumerate(tiles))
+    return terrain, reveal, improvements
+
+
+def terrain_grid(state: State) -> bytes | bytearray:
+    """Return one byte per tile: the index of its kind in ``TERRAIN_KINDS``."""
+    if isinstance(state.tiles, MappedTiles):
+        return state.tiles.terrain_grid()
+    order = {kind: i for i, kind in enumerate(TERRAIN_KINDS)}
+    return bytes(order[t.kind] for t in state.tiles)
+
+
+def reveal_grid(state: State, player: int) -> bytes | bytearray:
+    """Return one byte per tile, 1 where ``player`` has revealed it."""
+    if isinstance(state.tiles, MappedTiles):
+        return state.tiles.reveal_grid(player)
+    return bytes(t.revealed >> player & 1 for t in state.tiles)
+
+
+def binary_snapshot(state: State) -> Dict[str, Any]:
+    """Return a snapshot for :func:`encode_binary`.
+
+    The grids are copied as flat byte arrays, which is much cheaper than
+    copying every tile.
+    """
+
+    data = state_header(state)
+    data["grids"] = pack_grids(state)
+    return data
+
+
+def encode_binary(snapshot: Dict[str, Any]) -> bytes:
+    """Encode a :func:`binary_snapshot` in the ``.sav`` layout."""
+    header = {k: v for k, v in snapshot.items() if k != "grids"}
+    header["terrain_kinds"] = list(TERRAIN_KINDS)
+    raw = json.dumps(header).encode()
+    # Pad so the grids start on an 8-byte boundary.
+    raw += b" " * (-(BINARY_PREFIX.size + len(raw)) % 8)
+    prefix = BINARY_PREFIX.pack(BINARY_MAGIC, BINARY_VERSION, len(raw))
+    return b"".join([prefix, raw, *snapshot["grids"]])
+
+
+def load_binary(path: str | Path) -> State:
+    """Load a ``.sav`` file, mapping its grids instead of parsing them."""
+    return _load_binary(path)[0]
+
+
+def _load_binary(path: str | Path) -> Tuple[State, Dict[str, Any]]:
+    with open(path, "rb") as fh:
+        buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, header_len = BINARY_PREFIX.unpack_from(buf)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError(f"unsupported save format: {magic!r} v{version}")
+    offset = BINARY_PREFIX.size
+    data = json.loads(buf[offset : offset + header_len])
+    tiles = MappedTiles(
+        path,
+        buf,
+        offset + header_len,
+        data["width"],
+        data["height"],
+        data["terrain_kinds"],
+    )
+    data["tiles"] = []
+    state = dict_to_state(data)
+    state.tiles = tiles
+    return state, data
+
+
+def write_atomic(path: str | Path, data: bytes) -> None:
+    """Write ``data`` to a temporary file and rename it over ``path``.
+
+    A game mapped from ``path`` is moved into memory first; a mapped file
+    cannot be replaced on Windows.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    unmap(path)
+    os.replace(tmp, path)
+
+
+def encode_save(data: Dict[str, Any], path: str | Path) -> bytes:
+    """Encode save ``data``; paths ending in ``.gz`` are gzip compressed."""
+    raw = json.dumps(data).encode()
+    if str(path).endswith(".gz"):
+        return gzip.compress(raw, compresslevel=6)
+    return raw
+
+
+def write_save(data: Dict[str, Any], path: str | Path) -> None:
+    """Atomically write encoded save ``data`` and drop its stale delta log."""
+    write_atomic(path, encode_save(data, path))
+    # A full save supersedes any deltas recorded against the previous base.
+    delta_path(path).unlink(missing_ok=True)
+
+
+def is_binary_path(path: str | Path) -> bool:
+    return str(path).endswith(BINARY_SUFFIX)
+
+
 def save_game(state: State, path: str | Path) -> None:
-    Path(path).write_text(json.dumps(state_to_dict(state)))
+    if is_binary_path(path):
+        write_atomic(path, encode_binary(binary_snapshot(state)))
+        delta_path(path).unlink(missing_ok=True)
+    else:
+        write_save(state_to_dict(state), path)
+    saveindex.record_save(path, saveindex.summarize(state))
+
+
+def close_state(state: State) -> None:
+    """Release the save file ``state`` was mapped from, if any."""
+    if isinstance(state.tiles, MappedTiles):
+        state.tiles.close()
 
 
 def load_game(path: str | Path) -> State:
-    data = json.loads(Path(path).read_text())
-    return dict_to_state(data)
+    with open(path, "rb") as fh:
+        magic = fh.read(len(BINARY_MAGIC))
+    if magic == BINARY_MAGIC:
+        state, data = _load_binary(path)
+    else:
+        raw = Path(path).read_bytes()
+        if raw.startswith(GZIP_MAGIC):
+            raw = gzip.decompress(raw)
+        data = json.loads(raw)
+        state = dict_to_state(data)
+    apply_delta_log(state, delta_path(path), data.get(BASE_ID_KEY))
+    return state
+
+
+def apply_delta_log(state: State, path: Path, base_id: str | None) -> None:
+    """Apply the lines of the delta log at ``path`` recorded against ``base_id``.
+
+    Lines left over from an earlier base, which a crash between writing a new
+    base and removing the old log leaves behind, are skipped.  Reading stops
+    at a line that is not valid JSON: only the last append can be torn, and
+    nothing after it could be applied without it.
+    """
+
+    try:
+        fh = path.open()
+    except FileNotFoundError:
+        return
+    with fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if record.get(BASE_ID_KEY) == base_id:
+                apply_delta(state, record)
+
+
+class DeltaAutosaver:
+    """Autosave ``State`` as a full base save followed by appended deltas.
+
+    The first call to :meth:`save` writes a full save and starts tracking
+    changes.  Later calls append one JSON line holding only the tiles, units,
+    cities and players touched since the previous call.  Every
+    ``compact_every`` deltas the log is folded back into a fresh full save.
+
+    Each full save gets a new base id that its delta lines repeat, so lines
+    recorded against an older base are never applied to it.  Change tracking
+    restarts as soon as a job is prepared; if the job then fails, the changes
+    it carried are lost, so the next save is a full one.
+    """
+
+    def __init__(self, path: str | Path, compact_every: int = 10) -> None:
+        self.path = Path(path)
+        self.compact_every = max(1, compact_every)
+        self.deltas_written = 0
+        self.base_id: str | None = None
+        self._state: State | None = None
+        self._changes: Changes | None = None
+        # Set by a job that failed; read when the next job is prepared.
+        self._failed = False
+
+    def save(self, state: State) -> None:
+        job = self.prepare(state)
+        if job is not None:
+            job()
+
+    def prepare(self, state: State) -> Callable[[], None] | None:
+        """Capture what needs saving and return a job that writes it.
+
+        Capturing happens on the calling thread and resets change tracking;
+        the returned job only touches the captured data, so it may run on a
+        worker thread.  Returns ``None`` when nothing changed.
+        """
+
+        if (
+            self._state is not state
+            or self._changes is None
+            or self._failed
+            or self.deltas_written >= self.compact_every
+        ):
+            return self.prepare_compact(state)
+        if not self._changes:
+            return None
+        record = changes_to_dict(state, self._changes)
+        record[BASE_ID_KEY] = self.base_id
+        summary = saveindex.summarize(state)
+        self._changes.clear()
+        self.deltas_written += 1
+        path = self.path
+
+        def append() -> None:
+            with self._record_failure():
+                with delta_path(path).open("a") as fh:
+                    fh.write(json.dumps(record) + "\n")
+                saveindex.record_save(path, summary)
+
+        return append
+
+    def compact(self, state: State) -> None:
+        """Write a full save of ``state`` and restart the delta log."""
+        self.prepare_compact(state)()
+
+    def prepare_compact(self, state: State) -> Callable[[], None]:
+        if self._state is not None and self._changes is not None:
+            self._state.untrack(self._changes)
+        binary = is_binary_path(self.path)
+        # Tiles are shared copy-on-write, so capturing costs one list copy
+        # and the worker does the encoding.  Only a binary base keeps a
+        # mapped game lazy: JSON would build every one of its tiles.
+        capture = state.clone()
+        base_id = self.base_id = uuid.uuid4().hex
+        summary = saveindex.summarize(state)
+        self._state = state
+        self._changes = state.track()
+        self._failed = False
+        self.deltas_written = 0
+        path = self.path
+
+        def write() -> None:
+            with self._record_failure():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                if binary:
+                    snapshot = binary_snapshot(capture)
+                    snapshot[BASE_ID_KEY] = base_id
+                    write_atomic(path, encode_binary(snapshot))
+                    delta_path(path).unlink(missing_ok=True)
+                else:
+                    data = state_to_dict(capture)
+                    data[BASE_ID_KEY] = base_id
+                    write_save(data, path)
+                saveindex.record_save(path, summary)
+
+        return write
+
+    @contextmanager
+    def _record_failure(self) -> Iterator[None]:
+        try:
+            yield
+        except BaseException:
+            self._failed = True
+            raise
 
 
-__all__ = ["save_game", "load_game", "state_to_dict", "dict_to_state"]
+__all__ = [
+    "DeltaAutosaver",
+    "MappedTiles",
+    "binary_snapshot",
+    "encode_binary",
+    "load_binary",
+    "pack_grids",
+    "reveal_grid",
+    "terrain_grid",
+    "apply_delta",
+    "apply_delta_log",
+    "changes_to_dict",
+    "close_state",
+    "delta_path",
+    "dict_to_state",
+    "load_game",
+    "save_game",
+    "snapshot_state",
+    "state_header",
+    "snapshot_to_dict",
+    "state_to_dict",
+    "unmap",
+    "write_atomic",
+    "write_save",
+]
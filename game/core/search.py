@@ -0,0 +1,342 @@
+"""Look-ahead AI with a transposition table.
+
+The current player's turn is searched as a sequence of its own actions
+(moves and city founding) by iterative deepening until a time or node budget
+runs out; stopping early is always an option, so a position scores the best
+:func:`evaluate` result reachable from it within the depth.  Positions are
+keyed by :meth:`State.zobrist`, so a position reached again through another
+move order is looked up in the :class:`TranspositionTable` instead of being
+searched again.  Only the number of tiles each player has revealed is
+hashed, which merges transpositions that saw as much on different tiles.
+
+Children are searched on clones whose tiles are a :class:`TileOverlay` over
+the planning state's, so neither cloning nor :func:`evaluate` costs time in
+proportion to the map.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from random import Random
+from threading import Event
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .. import config
+from .ai import END_TURN, SEED_RANGE, Command, apply_command
+from .models import Census, State
+from .rules import end_turn, in_bounds, move_cost
+
+NEIGHBOURS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+MAX_DEPTH = 32
+# How many nodes are searched between looks at the clock.
+CLOCK_EVERY = 64
+
+CITY_VALUE = 40.0
+CITY_SIZE_VALUE = 10.0
+SETTLER_VALUE = 25.0
+UNIT_VALUE = 8.0
+RESOURCE_VALUE = 0.5
+EXPLORE_VALUE = 0.2
+
+
+@dataclass(slots=True)
+class Entry:
+    depth: int
+    score: float
+    action: Optional[Command]
+    age: int
+
+
+def entry_bytes() -> int:
+    """Measure the memory one table entry takes in this interpreter.
+
+    That is the :class:`Entry` with its score, a move :class:`Command` and
+    its destination, the 64-bit key and the table's cost per key.
+    """
+    key = (1 << 64) - 1
+    action = Command("move", 1, (0, 0))
+    entry = Entry(1, 0.5, action, 0)
+    sample = 1 << 12
+    slots = OrderedDict.fromkeys(range(key - sample, key))
+    per_slot = (sys.getsizeof(slots) - sys.getsizeof(OrderedDict())) // sample
+    return (
+        sys.getsizeof(entry)
+        + sys.getsizeof(entry.score)
+        + sys.getsizeof(action)
+        + sys.getsizeof(action.dest)
+        + sys.getsizeof(key)
+        + per_slot
+    )
+
+
+ENTRY_BYTES = entry_bytes()
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    action: Command
+    score: float
+    depth: int
+    nodes: int
+
+
+class TranspositionTable:
+    """Scores and best actions of searched positions, bounded by memory.
+
+    At most ``max_bytes // ENTRY_BYTES`` entries are kept.  Every search
+    starts a new age; entries are kept in the order they were last stored or
+    hit, so the ones untouched for the most searches are replaced first.
+    Within the current search a shallower result does not replace a deeper
+    one.
+    """
+
+    def __init__(self, max_bytes: int = config.AI_TT_BYTES) -> None:
+        self.capacity = max(1, max_bytes // ENTRY_BYTES)
+        self.age = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.rejected = 0
+        self._entries: OrderedDict[int, Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def new_search(self) -> None:
+        self.age += 1
+
+    def probe(self, key: int) -> Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if entry.age != self.age:
+            entry.age = self.age
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(
+        self, key: int, depth: int, score: float, action: Optional[Command]
+    ) -> None:
+        entries = self._entries
+        old = entries.get(key)
+        if old is not None:
+            if old.age == self.age and old.depth > depth:
+                return
+            entries.move_to_end(key)
+        elif len(entries) >= self.capacity:
+            victim_key, victim = next(iter(entries.items()))
+            if victim.age == self.age and victim.depth > depth:
+                self.rejected += 1
+                return
+            del entries[victim_key]
+            self.evictions += 1
+        entries[key] = Entry(depth, score, action, self.age)
+        self.stores += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "rejected": self.rejected,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def evaluate(state: State, player: int) -> float:
+    """Score ``state`` from ``player``'s point of view; higher is better.
+
+    Cities, settlers and units count for their owner and against everyone
+    else (split between the opponents), plus the player's city sizes,
+    resources and explored tiles.
+    """
+
+    census = state.census()
+    opponents = max(1, len(census) - 1)
+    score = 0.0
+    for pid, counts in census.items():
+        value = (
+            CITY_VALUE * counts.cities
+            + SETTLER_VALUE * counts.settlers
+            + UNIT_VALUE * counts.units
+        )
+        score += value if pid == player else -value / opponents
+    own = census.get(player, Census())
+    if own.cities:
+        sizes = sum(c.size for c in state.cities.values() if c.owner == player)
+        score += CITY_SIZE_VALUE * sizes
+    stats = state.players.get(player)
+    if stats is not None:
+        score += RESOURCE_VALUE * (stats.food + stats.prod)
+    score += EXPLORE_VALUE * state.reveal_counts().get(player, 0)
+    return score
+
+
+def actions(state: State) -> List[Command]:
+    """Candidate actions of the current player, without ending the turn."""
+    player = state.current_player
+    found = []
+    moves = []
+    for unit in state.units.values():
+        if unit.owner != player or unit.moves_left <= 0:
+            continue
+        if unit.kind == "settler":
+            found.append(Command("found_city", unit.id))
+        x, y = unit.pos
+        for dx, dy in NEIGHBOURS:
+            dest = (x + dx, y + dy)
+            if in_bounds(state, dest) and move_cost(state, dest) <= unit.moves_left:
+                moves.append(Command("move", unit.id, dest))
+    return found + moves
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+class Searcher:
+    """Depth-first search of one player's turn, cached in ``table``.
+
+    Pass ``table=None`` to search without a transposition table.
+    """
+
+    def __init__(
+        self,
+        table: TranspositionTable | None = None,
+        rng: Random | None = None,
+        cancel: Event | None = None,
+    ) -> None:
+        self.table = table
+        self.rng = rng or Random(0)
+        self.cancel = cancel
+        self.nodes = 0
+        self._player = 0
+        self._deadline = 0.0
+        self._max_nodes: int | None = None
+
+    def search(
+        self,
+        state: State,
+        budget: float,
+        max_nodes: int | None = None,
+        max_depth: int = MAX_DEPTH,
+    ) -> SearchResult:
+        """Deepen one ply at a time for ``budget`` seconds or ``max_nodes``.
+
+        Returns the result of the deepest completed iteration; the action is
+        :data:`ai.END_TURN` when doing nothing scores best.  Setting
+        ``cancel`` ends the search as if the budget had run out.
+        """
+        self.nodes = 0
+        self._player = state.current_player
+        self._deadline = perf_counter() + budget
+        self._max_nodes = max_nodes
+        if self.table is not None:
+            self.table.new_search()
+        state.zobrist()
+        root = state.clone(overlay=True)
+        result = SearchResult(END_TURN, evaluate(root, self._player), 0, 0)
+        for depth in range(1, max_depth + 1):
+            try:
+                score, action = self._search(root, depth)
+            except _OutOfBudget:
+                break
+            result = SearchResult(action or END_TURN, score, depth, self.nodes)
+        return result
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if self._max_nodes is not None and self.nodes > self._max_nodes:
+            raise _OutOfBudget
+        if self.nodes % CLOCK_EVERY == 0 and (
+            perf_counter() > self._deadline
+            or (self.cancel is not None and self.cancel.is_set())
+        ):
+            raise _OutOfBudget
+
+    def _search(self, state: State, depth: int) -> Tuple[float, Optional[Command]]:
+        self._tick()
+        key = state.zobrist()
+        hint = None
+        if self.table is not None:
+            entry = self.table.probe(key)
+            if entry is not None:
+                if entry.depth >= depth:
+                    return entry.score, entry.action
+                hint = entry.action
+        best_score = evaluate(state, self._player)
+        best_action: Optional[Command] = None
+        if depth > 0:
+            candidates = actions(state)
+            if hint is not None and hint in candidates:
+                candidates.remove(hint)
+                candidates.insert(0, hint)
+            for action in candidates:
+                child = state.clone()
+                if not apply_command(child, action, self.rng):
+                    continue
+                score, _ = self._search(child, depth - 1)
+                if score > best_score:
+                    best_score, best_action = score, action
+        if self.table is not None:
+            self.table.store(key, depth, best_score, best_action)
+        return best_score, best_action
+
+
+def plan_turn(
+    state: State,
+    rng: Random,
+    cancel: Event | None = None,
+    progress: Callable[[float], None] | None = None,
+    budget: float = config.AI_SEARCH_MS / 1000,
+    table: TranspositionTable | None = None,
+) -> List[Command]:
+    """Like :func:`ai.plan_turn`, choosing each action by search.
+
+    Each action gets ``budget`` seconds.  ``table`` may be kept across turns;
+    its age-based replacement lets stale positions go first.
+    """
+    if table is None:
+        table = TranspositionTable()
+    searcher = Searcher(table, rng, cancel)
+    player = state.current_player
+    total = 1 + sum(u.moves_left for u in state.units.values() if u.owner == player)
+    commands: List[Command] = []
+    while cancel is None or not cancel.is_set():
+        action = searcher.search(state, budget).action
+        if action.kind == "found_city":
+            action = replace(action, seed=rng.randrange(SEED_RANGE))
+        if action == END_TURN or not apply_command(state, action, rng):
+            end_turn(state)
+            commands.append(END_TURN)
+            if progress is not None:
+                progress(1.0)
+            break
+        commands.append(action)
+        if progress is not None:
+            left = sum(u.moves_left for u in state.units.values() if u.owner == player)
+            progress(min(1.0, 1 - left / total))
+    return commands
+
+
+__all__ = [
+    "Entry",
+    "SearchResult",
+    "Searcher",
+    "TranspositionTable",
+    "actions",
+    "entry_bytes",
+    "evaluate",
+    "plan_turn",
+]
@@ -0,0 +1,98 @@
+"""Per-tile lookup of units, cities and claimed tiles."""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List
+
+from .models import Changes, City, Coord, State, Unit
+
+
+class SpatialIndex:
+    """Map tiles to the entities on them, kept current from ``Changes``.
+
+    ``State.units_at`` and ``State.city_at`` scan every entity; this index
+    answers the same questions for a batch of tiles in time proportional to
+    the number of tiles asked about.
+    """
+
+    def __init__(self, state: State) -> None:
+        self.state = state
+        self.units: Dict[Coord, List[int]] = {}
+        self.cities: Dict[Coord, int] = {}
+        self.claims: Dict[Coord, int] = {}
+        self._unit_pos: Dict[int, Coord] = {}
+        self._city_claims: Dict[int, frozenset[Coord]] = {}
+        self._city_pos: Dict[int, Coord] = {}
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        self.units.clear()
+        self.cities.clear()
+        self.claims.clear()
+        self._unit_pos.clear()
+        self._city_claims.clear()
+        self._city_pos.clear()
+        for unit in self.state.units.values():
+            self._add_unit(unit)
+        for city in self.state.cities.values():
+            self._add_city(city)
+
+    def _add_unit(self, unit: Unit) -> None:
+        self.units.setdefault(unit.pos, []).append(unit.id)
+        self._unit_pos[unit.id] = unit.pos
+
+    def _remove_unit(self, unit_id: int) -> None:
+        pos = self._unit_pos.pop(unit_id, None)
+        if pos is None:
+            return
+        ids = self.units[pos]
+        ids.remove(unit_id)
+        if not ids:
+            del self.units[pos]
+
+    def _add_city(self, city: City) -> None:
+        self.cities[city.pos] = city.id
+        self._city_pos[city.id] = city.pos
+        claims = frozenset(city.claimed)
+        self._city_claims[city.id] = claims
+        for coord in claims:
+            self.claims[coord] = city.id
+
+    def _remove_city(self, city_id: int) -> None:
+        pos = self._city_pos.pop(city_id, None)
+        if pos is not None and self.cities.get(pos) == city_id:
+            del self.cities[pos]
+        for coord in self._city_claims.pop(city_id, ()):
+            if self.claims.get(coord) == city_id:
+                del self.claims[coord]
+
+    def update(self, changes: Changes) -> None:
+        """Apply the unit and city changes recorded in ``changes``."""
+        for uid in changes.units:
+            self._remove_unit(uid)
+            unit = self.state.units.get(uid)
+            if unit is not None:
+                self._add_unit(unit)
+        for cid in changes.cities:
+            self._remove_city(cid)
+            city = self.state.cities.get(cid)
+            if city is not None:
+                self._add_city(city)
+
+    def unit_pos(self, unit_id: int) -> Coord | None:
+        """Return where ``unit_id`` was when the index was last updated."""
+        return self._unit_pos.get(unit_id)
+
+    def units_in(self, coords: Iterable[Coord]) -> List[Unit]:
+        units = self.state.units
+        return [units[uid] for c in coords for uid in self.units.get(c, ())]
+
+    def cities_in(self, coords: Iterable[Coord]) -> List[City]:
+        cities = self.state.cities
+        return [cities[self.cities[c]] for c in coords if c in self.cities]
+
+    def claims_in(self, coords: Iterable[Coord]) -> List[Coord]:
+        return [c for c in coords if c in self.claims]
+
+
+__all__ = ["SpatialIndex"]
@@ -0,0 +1,123 @@
+"""Zobrist hashing of game states.
+
+Every hashed feature of a state (a unit with its owner, kind, position and
+moves left, a city with its owner and size, an improvement on a tile, a
+player's food and production, how many tiles a player has revealed, the
+current player and the turn) maps to a fixed random 64-bit key.  The hash of
+a state is the XOR of the keys of all its features, so a rule that changes
+one feature updates the hash by XOR-ing the old key out and the new one in.
+
+Keys are derived from the feature itself with BLAKE2b rather than from
+Python's ``hash``, so the same state hashes the same in every process; the
+value can be compared against a recorded game to detect desyncs.
+
+Which tiles are revealed, city claims and city focus are not hashed.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from hashlib import blake2b
+from typing import TYPE_CHECKING, Dict, Hashable, Tuple
+
+if TYPE_CHECKING:
+    from .models import City, Coord, Player, State, Unit
+
+# Number of feature keys kept; resource values are unbounded so the cache is.
+KEY_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def key(*feature: Hashable) -> int:
+    """Return the 64-bit key of ``feature``, the same in every process."""
+    digest = blake2b(repr(feature).encode(), digest_size=8, person=b"4x-zobrist")
+    return int.from_bytes(digest.digest(), "little")
+
+
+def unit_key(unit: Unit) -> int:
+    return key("unit", unit.id, unit.owner, unit.kind, unit.pos, unit.moves_left)
+
+
+def city_key(city: City) -> int:
+    return key("city", city.id, city.owner, city.pos, city.size)
+
+
+def improvement_key(coord: Coord, kind: str) -> int:
+    return key("improvement", coord, kind)
+
+
+def resources_key(player_id: int, food: int, prod: int) -> int:
+    return key("resources", player_id, food, prod)
+
+
+def reveal_key(player_id: int, count: int) -> int:
+    return key("revealed", player_id, count)
+
+
+def turn_key(current_player: int, turn: int) -> int:
+    return key("turn", current_player, turn)
+
+
+def full_hash(state: State) -> int:
+    """Compute the hash of ``state`` from scratch."""
+    value = turn_key(state.current_player, state.turn)
+    for pid, player in state.players.items():
+        value ^= resources_key(pid, player.food, player.prod)
+    for pid, count in state.reveal_counts().items():
+        if count:
+            value ^= reveal_key(pid, count)
+    for unit in state.units.values():
+        value ^= unit_key(unit)
+    for city in state.cities.values():
+        value ^= city_key(city)
+    for tile in state.tiles:
+        for kind in tile.improvements:
+            value ^= improvement_key((tile.x, tile.y), kind)
+    return value
+
+
+class ZobristHash:
+    """The running hash of one state.
+
+    Player resources are mutated in place by the rules before they report
+    the change, so the values last folded into the hash are remembered to
+    XOR them out again.
+    """
+
+    def __init__(self, state: State) -> None:
+        self.value = full_hash(state)
+        self.resources: Dict[int, Tuple[int, int]] = {
+            pid: (p.food, p.prod) for pid, p in state.players.items()
+        }
+
+    def copy(self) -> ZobristHash:
+        clone = ZobristHash.__new__(ZobristHash)
+        clone.value = self.value
+        clone.resources = dict(self.resources)
+        return clone
+
+    def toggle(self, feature_key: int) -> None:
+        self.value ^= feature_key
+
+    def update_resources(self, player: Player) -> None:
+        new = (player.food, player.prod)
+        old = self.resources.get(player.id)
+        if old == new:
+            return
+        if old is not None:
+            self.value ^= resources_key(player.id, *old)
+        self.value ^= resources_key(player.id, *new)
+        self.resources[player.id] = new
+
+
+__all__ = [
+    "ZobristHash",
+    "city_key",
+    "full_hash",
+    "improvement_key",
+    "key",
+    "resources_key",
+    "reveal_key",
+    "turn_key",
+    "unit_key",
+]
@@ -2,73 +2,243 @@
 
 from __future__ import annotations
 
+from collections import deque
+from pathlib import Path
 from random import Random
 
 import pygame
 
 from .. import config
 from ..core import ai
+from ..core.aiworker import AIWorker
+from ..core.autosave import AutosaveService
 from ..core.models import State
-from ..core.rules import check_win
+from ..core.rules import alive_players, check_win
+from ..core.saveio import DeltaAutosaver, close_state
+from ..ui.camera import Camera
 from ..ui.hud import HUD
 from ..ui.input import InputHandler
-from ..ui.renderer import draw
+from ..ui.minimap import Minimap
+from ..ui.perf import FrameTimer, PerfOverlay, hit_rate
+from ..ui.renderer import TEXT_CACHE, MapRenderer
+from .loop import FramePacer
 
 
 class Gameplay:
     def __init__(self, state: State) -> None:
         self.state = state
-        self.screen = pygame.display.get_surface()
-        size = self.screen.get_size()
-        tile = config.compute_tile_size(size, (state.width, state.height))
-        config.set_tile_size(tile)
-        size = (
-            tile * state.width,
-            tile * state.height + config.UI_BAR_H,
+        size = self._layout(pygame.display.get_surface().get_size())
+        hud_rect = pygame.Rect(0, size[1] - config.UI_BAR_H, size[0], config.UI_BAR_H)
+        self.hud = HUD(hud_rect)
+        self.hud.watch(state)
+        self.camera = Camera((state.width, state.height), self._map_view(size))
+        units = [u for u in state.units.values() if u.owner == config.HUMAN_PLAYER]
+        if units:
+            self.camera.center_on(units[0].pos)
+        self.renderer = MapRenderer(state, self.camera)
+        self.minimap = Minimap(
+            state, self.renderer.index, self.camera, self.hud.minimap_box
+        )
+        self.input = InputHandler(self.hud, self.camera, self.minimap)
+        self.input.watch(state)
+        self._overlay: pygame.Rect | None = None
+        self._resize: tuple[tuple[int, int], int] | None = None
+        self.ai = AIWorker()
+        self.timer = FrameTimer(
+            ("events", "ai", "hud_update", "render", "hud_draw", "flip", "other")
+        )
+        self.perf = PerfOverlay()
+        self._ai_commands: deque[ai.Command] = deque()
+        self.autosave = AutosaveService(
+            DeltaAutosaver(
+                Path(config.SAVE_DIR) / config.AUTOSAVE_NAME,
+                config.AUTOSAVE_COMPACT_EVERY,
+            )
         )
+        self._autosave_error: BaseException | None = None
+        self.outcome: str | None = None
+
+    def _layout(self, requested: tuple[int, int]) -> tuple[int, int]:
+        """Pick the tile size for ``requested`` and resize the window."""
+        tile, size = config.layout_map(requested, (self.state.width, self.state.height))
+        config.set_tile_size(tile)
         pygame.display.set_mode(size, pygame.RESIZABLE)
         self.screen = pygame.display.get_surface()
-        hud_rect = pygame.Rect(0, size[1] - config.UI_BAR_H, size[0], config.UI_BAR_H)
-        self.hud = HUD(hud_rect)
-        self.input = InputHandler(self.hud)
+        return size
+
+    def _apply_resize(self, requested: tuple[int, int]) -> None:
+        """Relayout the window, HUD, camera and minimap for ``requested``."""
+        size = self._layout(requested)
+        self.hud.resize(size)
+        self.camera.resize(self._map_view(size))
+        self.minimap.resize(self.hud.minimap_box)
+        self.renderer.invalidate()
+
+    def _poll_resize(self, now: int) -> None:
+        """Apply a pending resize once the window has stopped changing."""
+        if self._resize is not None:
+            requested, since = self._resize
+            if now - since >= config.RESIZE_DEBOUNCE_MS:
+                self._resize = None
+                self._apply_resize(requested)
+
+    @staticmethod
+    def _map_view(size: tuple[int, int]) -> pygame.Rect:
+        return pygame.Rect(0, 0, size[0], size[1] - config.UI_BAR_H)
+
+    def _step_ai(self, rng: Random) -> None:
+        """Plan the AI turn on the worker, then apply one command per frame."""
+        if not self._ai_commands:
+            if not self.ai.busy:
+                self.ai.start(self.state, rng.randrange(2**32))
+            commands = self.ai.poll()
+            if commands is None:
+                self.hud.set_ai_progress(self.ai.progress)
+                return
+            # A failed or cancelled plan still has to hand the turn back.
+            if not commands or commands[-1] != ai.END_TURN:
+                commands.append(ai.END_TURN)
+            self._ai_commands.extend(commands)
+        self.hud.set_ai_progress(1.0)
+        command = self._ai_commands.popleft()
+        if not ai.apply_command(self.state, command, rng):
+            # The plan no longer matches the game; hand the turn back rather
+            # than play the rest of it.
+            command = ai.END_TURN
+            ai.apply_command(self.state, command, rng)
+        if command == ai.END_TURN:
+            self._ai_commands.clear()
+            self.hud.set_ai_progress(None)
+
+    def _check_outcome(self) -> None:
+        """Stop play once the human player has won or been eliminated."""
+        if self.outcome is not None:
+            return
+        state = self.state
+        human = config.HUMAN_PLAYER
+        winner = check_win(state)
+        if human in state.players and human not in alive_players(state):
+            self.outcome = "You lost"
+        elif winner == human:
+            self.outcome = "You won"
+        elif winner is not None:
+            self.outcome = f"Player {winner} won"
+        else:
+            return
+        self.ai.cancel()
+        self._ai_commands.clear()
+        self.hud.set_ai_progress(None)
+        self.hud.show_message(f"{self.outcome}. Press Q to quit.")
+
+    @property
+    def _playing(self) -> bool:
+        """Whether the human player is to move in an undecided game."""
+        return self.outcome is None and self.state.current_player == config.HUMAN_PLAYER
+
+    def _report_autosave(self) -> None:
+        """Tell the player about a new autosave failure; it is retried."""
+        error = self.autosave.last_error
+        if error is not None and error is not self._autosave_error:
+            self.hud.show_message(
+                f"Autosave failed, retrying: {error}", config.AUTOSAVE_RETRY_S
+            )
+        self._autosave_error = error
+
+    def _perf_counters(self) -> dict[str, str]:
+        state = self.state
+        terrain = self.renderer.terrain
+        return {
+            "turn": str(state.turn),
+            "units / cities": f"{len(state.units)} / {len(state.cities)}",
+            "text cache": hit_rate(TEXT_CACHE.hits, TEXT_CACHE.misses),
+            "terrain chunks": hit_rate(terrain.hits, terrain.misses),
+            "tooltips memo": str(self.input.memoized_tooltips),
+        }
 
     def run(self) -> None:
-        clock = pygame.time.Clock()
+        pacer = FramePacer()
         rng = Random()
         running = True
+        busy = True
+        last_turn = self.state.turn
         while running:
-            time_delta = clock.tick(30) / 1000.0
-            for event in pygame.event.get():
+            time_delta, events = pacer.next(busy)
+            timer = self.timer
+            timer.start()
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.VIDEORESIZE:
                     requested = config.clamp_window_size((event.w, event.h))
-                    tile = config.compute_tile_size(
-                        requested, (self.state.width, self.state.height)
-                    )
-                    config.set_tile_size(tile)
-                    new_size = (
-                        tile * self.state.width,
-                        tile * self.state.height + config.UI_BAR_H,
-                    )
-                    pygame.display.set_mode(new_size, pygame.RESIZABLE)
-                    self.screen = pygame.display.get_surface()
-                    self.hud.resize(new_size)
+                    self._resize = (requested, pygame.time.get_ticks())
                 elif event.type == pygame.KEYDOWN and event.key == pygame.K_q:
                     running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.perf.toggle()
+                    if not self.perf.visible:
+                        self.renderer.invalidate_rect(self.perf.rect)
+                elif not self._playing:
+                    self.input.handle_view_event(event)
                 else:
                     self.input.handle_event(event, self.state, rng)
-            if self.state.current_player == 1:
-                ai.ai_turn(self.state, rng)
-            self.hud.update(time_delta, self.state)
-            draw(
-                self.state,
+            if self._playing:
+                self.input.update_hover(self.state)
+            self._poll_resize(pygame.time.get_ticks())
+            timer.lap("events")
+            if self.outcome is None and not self._playing and running:
+                self._step_ai(rng)
+            self._check_outcome()
+            timer.lap("ai")
+            if self.state.turn != last_turn:
+                last_turn = self.state.turn
+                self.autosave.request(self.state)
+            else:
+                self.autosave.poll(self.state)
+            self._report_autosave()
+            # A long idle wait must not turn into one big scroll step.
+            scrolled = self.camera.update(min(time_delta, 1 / pacer.fps))
+            timer.lap("other")
+            hud_changed = self.hud.update(time_delta, self.state)
+            timer.lap("hud_update")
+            # Repaint the map under the buy-unit menu when it opens or closes.
+            overlay = self.hud.overlay_rect()
+            if overlay != self._overlay and self._overlay is not None:
+                self.renderer.invalidate_rect(self._overlay)
+            self._overlay = overlay
+            rects = self.renderer.render(
                 self.screen,
                 self.input.selected,
                 self.input.selected_city,
                 self.input.selected_tile,
             )
-            self.hud.draw(self.screen)
-            pygame.display.flip()
-            if check_win(self.state) is not None:
-                running = False
+            self.minimap.update()
+            timer.lap("render")
+            if events or rects or hud_changed:
+                self.hud.draw(self.screen)
+                self.minimap.draw(self.screen)
+                rects.append(self.hud.rect)
+                if overlay is not None:
+                    rects.append(overlay)
+                if self.perf.visible:
+                    rects.append(
+                        self.perf.draw(self.screen, timer, self._perf_counters())
+                    )
+                timer.lap("hud_draw")
+                pygame.display.update(rects)
+                timer.lap("flip")
+            busy = (
+                scrolled
+                or self._resize is not None
+                or (self.outcome is None and not self._playing)
+                or self.autosave.busy
+                or self.autosave.pending
+            )
+            timer.lap("other")
+            timer.end()
+        self.ai.close()
+        self.hud.unwatch()
+        self.input.unwatch()
+        self.autosave.close()
+        self.minimap.close()
+        self.renderer.close()
+        close_state(self.state)
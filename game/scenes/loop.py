@@ -0,0 +1,34 @@
+"""Frame pacing shared by the scenes."""
+
+from __future__ import annotations
+
+import pygame
+
+from .. import config
+
+
+class FramePacer:
+    """Hand out events at full frame rate while busy and block while idle.
+
+    When the caller reports ``busy`` the next call ticks at ``fps`` and
+    returns whatever events are queued.  Otherwise it sleeps in
+    ``pygame.event.wait`` until an event arrives or ``idle_ms`` pass, so an
+    idle scene costs next to no CPU.  The returned time delta is the real
+    time since the previous call.
+    """
+
+    def __init__(
+        self, fps: int = config.ACTIVE_FPS, idle_ms: int = config.IDLE_WAIT_MS
+    ) -> None:
+        self.fps = fps
+        self.idle_ms = idle_ms
+        self.clock = pygame.time.Clock()
+
+    def next(self, busy: bool) -> tuple[float, list[pygame.event.Event]]:
+        if busy:
+            time_delta = self.clock.tick(self.fps)
+            return time_delta / 1000.0, pygame.event.get()
+        event = pygame.event.wait(self.idle_ms)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events.extend(pygame.event.get())
+        return self.clock.tick() / 1000.0, events
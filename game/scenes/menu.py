@@ -6,9 +6,12 @@ import pygame
 import pygame_gui
 
 from .. import config
-from ..core import mapgen
+from ..core import mapgen, rules
+from ..core.mapcache import MapPool
 from ..core.models import Player, State
 from .gameplay import Gameplay
+from .loop import FramePacer
+from .savebrowser import SaveBrowser
 
 
 class Menu:
@@ -20,25 +23,35 @@ class Menu:
             text="New Game",
             manager=self.manager,
         )
+        self.load = pygame_gui.elements.UIButton(
+            relative_rect=pygame.Rect(0, 0, 100, 50),
+            text="Load Game",
+            manager=self.manager,
+        )
         self.quit = pygame_gui.elements.UIButton(
             relative_rect=pygame.Rect(0, 0, 100, 50),
             text="Quit",
             manager=self.manager,
         )
+        self.maps = MapPool(
+            config.START_SIZE, config.MAP_CACHE_DIR, ahead=config.MAP_PREWARM
+        )
         self._layout(size)
 
     def _layout(self, size: tuple[int, int]) -> None:
         center_x = size[0] // 2 - 50
         center_y = size[1] // 2
-        self.new.set_relative_position((center_x, center_y - 60))
-        self.quit.set_relative_position((center_x, center_y + 10))
+        self.new.set_relative_position((center_x, center_y - 95))
+        self.load.set_relative_position((center_x, center_y - 25))
+        self.quit.set_relative_position((center_x, center_y + 45))
 
     def run(self) -> None:
-        clock = pygame.time.Clock()
+        pacer = FramePacer()
         running = True
+        redraw = True
         while running:
-            time_delta = clock.tick(30) / 1000.0
-            for event in pygame.event.get():
+            time_delta, events = pacer.next(busy=False)
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.VIDEORESIZE:
@@ -51,9 +64,9 @@ class Menu:
                     and event.user_type == pygame_gui.UI_BUTTON_PRESSED
                 ):
                     if event.ui_element == self.new:
-                        tiles, spawns = mapgen.generate_map(*config.START_SIZE, seed=1)
+                        _, tiles, spawns = self.maps.take()
                         units = {u.id: u for u in mapgen.initial_units(spawns)}
-                        players = {0: Player(0), 1: Player(1)}
+                        players = {p: Player(p) for p in range(len(spawns))}
                         state = State(
                             width=config.START_SIZE[0],
                             height=config.START_SIZE[1],
@@ -65,21 +78,20 @@ class Menu:
                         state.next_unit_id = max(units) + 1
                         for unit in state.units.values():
                             unit.moves_left = config.UNIT_STATS[unit.kind]["moves"]
-                            for x in range(state.width):
-                                for y in range(state.height):
-                                    if (
-                                        abs(unit.pos[0] - x) + abs(unit.pos[1] - y)
-                                        <= config.REVEAL_RADIUS
-                                    ):
-                                        tile = state.tile_at((x, y))
-                                        tile.revealed_by.add(unit.owner)
+                            rules.reveal(state, unit)
                         game = Gameplay(state)
                         game.run()
+                    elif event.ui_element == self.load:
+                        SaveBrowser().run()
                     elif event.ui_element == self.quit:
                         running = False
                 self.manager.process_events(event)
             self.manager.update(time_delta)
+            if not (events or redraw):
+                continue
+            redraw = False
             surface = pygame.display.get_surface()
             surface.fill((0, 0, 0))
             self.manager.draw_ui(surface)
             pygame.display.flip()
+        self.maps.close()
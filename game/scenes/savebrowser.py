@@ -0,0 +1,116 @@
+"""Save browser scene."""
+
+from __future__ import annotations
+
+import pygame
+import pygame_gui
+
+from .. import config
+from ..core import saveindex
+from ..core.saveio import load_game
+from ..ui.renderer import COLORS
+from .gameplay import Gameplay
+from .loop import FramePacer
+
+THUMB_COLORS = {char: COLORS[kind] for kind, char in saveindex.THUMB_CHARS.items()}
+THUMB_PX = 6
+
+
+def thumbnail_surface(minimap: list[str]) -> pygame.Surface:
+    """Render a save's minimap rows into a small surface."""
+    height = max(1, len(minimap))
+    width = max(1, max((len(row) for row in minimap), default=1))
+    surface = pygame.Surface((width * THUMB_PX, height * THUMB_PX))
+    for y, row in enumerate(minimap):
+        for x, char in enumerate(row):
+            color = THUMB_COLORS.get(char, COLORS["city"])
+            rect = pygame.Rect(x * THUMB_PX, y * THUMB_PX, THUMB_PX, THUMB_PX)
+            surface.fill(color, rect)
+    return surface
+
+
+def describe(entry: dict) -> str:
+    cities = "/".join(str(entry["cities"].get(str(p), 0)) for p in entry["players"])
+    return (
+        f"{entry['name']}  turn {entry['turn']}  "
+        f"{entry['width']}x{entry['height']}  cities {cities}"
+    )
+
+
+class SaveBrowser:
+    def __init__(self, directory: str = config.SAVE_DIR) -> None:
+        size = pygame.display.get_surface().get_size()
+        self.manager = pygame_gui.UIManager(size)
+        self.entries = saveindex.list_saves(directory)
+        self.labels = [describe(e) for e in self.entries]
+        self.list = pygame_gui.elements.UISelectionList(
+            relative_rect=pygame.Rect(0, 0, 500, 400),
+            item_list=self.labels,
+            manager=self.manager,
+        )
+        self.load = pygame_gui.elements.UIButton(
+            relative_rect=pygame.Rect(0, 0, 100, 50),
+            text="Load",
+            manager=self.manager,
+        )
+        self.load.disable()
+        self.back = pygame_gui.elements.UIButton(
+            relative_rect=pygame.Rect(0, 0, 100, 50),
+            text="Back",
+            manager=self.manager,
+        )
+        self.selected: dict | None = None
+        self.preview: pygame.Surface | None = None
+        self._layout(size)
+
+    def _layout(self, size: tuple[int, int]) -> None:
+        self.origin = (size[0] // 2 - 400, size[1] // 2 - 220)
+        self.list.set_relative_position(self.origin)
+        self.load.set_relative_position((self.origin[0], self.origin[1] + 410))
+        self.back.set_relative_position((self.origin[0] + 110, self.origin[1] + 410))
+
+    def _select(self, label: str) -> None:
+        self.selected = self.entries[self.labels.index(label)]
+        self.preview = thumbnail_surface(self.selected["minimap"])
+        self.load.enable()
+
+    def run(self) -> None:
+        pacer = FramePacer()
+        running = True
+        redraw = True
+        while running:
+            time_delta, events = pacer.next(busy=False)
+            for event in events:
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.VIDEORESIZE:
+                    new_size = config.clamp_window_size((event.w, event.h))
+                    pygame.display.set_mode(new_size, pygame.RESIZABLE)
+                    self.manager.set_window_resolution(new_size)
+                    self._layout(new_size)
+                elif (
+                    event.type == pygame.USEREVENT
+                    and event.user_type == pygame_gui.UI_SELECTION_LIST_NEW_SELECTION
+                    and event.ui_element == self.list
+                ):
+                    self._select(event.text)
+                elif (
+                    event.type == pygame.USEREVENT
+                    and event.user_type == pygame_gui.UI_BUTTON_PRESSED
+                ):
+                    if event.ui_element == self.load and self.selected is not None:
+                        Gameplay(load_game(self.selected["path"])).run()
+                        running = False
+                    elif event.ui_element == self.back:
+                        running = False
+                self.manager.process_events(event)
+            self.manager.update(time_delta)
+            if not (events or redraw):
+                continue
+            redraw = False
+            surface = pygame.display.get_surface()
+            surface.fill((0, 0, 0))
+            if self.preview is not None:
+                surface.blit(self.preview, (self.origin[0] + 520, self.origin[1]))
+            self.manager.draw_ui(surface)
+            pygame.display.flip()
@@ -0,0 +1,118 @@
+"""Viewport onto the map with panning and coordinate transforms."""
+
+from __future__ import annotations
+
+import pygame
+
+from .. import config
+from ..core.models import Coord
+
+
+class Camera:
+    """Scrollable view of the map.
+
+    ``view`` is the screen area the map is drawn into and ``x``/``y`` is the
+    world-pixel position shown at its top-left corner.
+    """
+
+    def __init__(self, map_size: tuple[int, int], view: pygame.Rect) -> None:
+        self.map_w, self.map_h = map_size
+        self.view = pygame.Rect(view)
+        self.x = 0
+        self.y = 0
+
+    @property
+    def offset(self) -> tuple[int, int]:
+        """Value to subtract from world pixels to get screen pixels."""
+        return self.x - self.view.x, self.y - self.view.y
+
+    def resize(self, view: pygame.Rect) -> None:
+        self.view = pygame.Rect(view)
+        self.clamp()
+
+    def clamp(self) -> None:
+        ts = config.TILE_SIZE
+        self.x = max(0, min(self.x, self.map_w * ts - self.view.width))
+        self.y = max(0, min(self.y, self.map_h * ts - self.view.height))
+
+    def pan(self, dx: float, dy: float) -> bool:
+        """Scroll by ``dx``/``dy`` pixels; return ``True`` if the view moved."""
+        before = (self.x, self.y)
+        self.x += int(dx)
+        self.y += int(dy)
+        self.clamp()
+        return (self.x, self.y) != before
+
+    def center_on(self, coord: Coord) -> None:
+        ts = config.TILE_SIZE
+        self.x = coord[0] * ts + ts // 2 - self.view.width // 2
+        self.y = coord[1] * ts + ts // 2 - self.view.height // 2
+        self.clamp()
+
+    def zoom(self, steps: int, anchor: tuple[int, int] | None = None) -> bool:
+        """Change ``config.TILE_SIZE`` by ``steps`` zoom levels.
+
+        The map point under the screen position ``anchor`` (default: the view
+        centre) stays in place.  Returns ``True`` if the zoom changed.
+        """
+
+        old = config.TILE_SIZE
+        new = config.zoom_tile_size(old, steps)
+        if new == old:
+            return False
+        ax, ay = anchor if anchor is not None else self.view.center
+        ox, oy = self.offset
+        world_x = (ax + ox) / old
+        world_y = (ay + oy) / old
+        config.set_tile_size(new)
+        self.x = round(world_x * new) - (ax - self.view.x)
+        self.y = round(world_y * new) - (ay - self.view.y)
+        self.clamp()
+        return True
+
+    def screen_to_tile(self, pos: tuple[int, int]) -> Coord | None:
+        """Return the tile under screen ``pos`` or ``None`` if off the map."""
+        if not self.view.collidepoint(pos):
+            return None
+        ts = config.TILE_SIZE
+        ox, oy = self.offset
+        tx, ty = (pos[0] + ox) // ts, (pos[1] + oy) // ts
+        if 0 <= tx < self.map_w and 0 <= ty < self.map_h:
+            return tx, ty
+        return None
+
+    def tile_rect(self, coord: Coord) -> pygame.Rect:
+        """Return the screen rectangle covered by tile ``coord``."""
+        ts = config.TILE_SIZE
+        ox, oy = self.offset
+        return pygame.Rect(coord[0] * ts - ox, coord[1] * ts - oy, ts, ts)
+
+    def visible_tiles(self) -> pygame.Rect:
+        """Return the tiles overlapping the view, in tile units."""
+        ts = config.TILE_SIZE
+        x0, y0 = self.x // ts, self.y // ts
+        x1 = -(-(self.x + self.view.width) // ts)
+        y1 = -(-(self.y + self.view.height) // ts)
+        return pygame.Rect(x0, y0, x1 - x0, y1 - y0).clip(
+            pygame.Rect(0, 0, self.map_w, self.map_h)
+        )
+
+    def update(self, time_delta: float) -> bool:
+        """Scroll for held arrow keys or the mouse resting on a view edge."""
+        dx = dy = 0
+        keys = pygame.key.get_pressed()
+        dx += keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]
+        dy += keys[pygame.K_DOWN] - keys[pygame.K_UP]
+        if pygame.mouse.get_focused():
+            mx, my = pygame.mouse.get_pos()
+            edge = config.EDGE_SCROLL_PX
+            if self.view.collidepoint(mx, my):
+                dx += (mx >= self.view.right - edge) - (mx < self.view.left + edge)
+                dy += (my >= self.view.bottom - edge) - (my < self.view.top + edge)
+        if not dx and not dy:
+            return False
+        step = config.SCROLL_SPEED * time_delta
+        return self.pan(dx * step, dy * step)
+
+
+__all__ = ["Camera"]
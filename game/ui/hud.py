@@ -6,7 +6,18 @@ import pygame
 import pygame_gui
 
 from .. import config
-from ..core.models import State
+from ..core import events
+from ..core.models import Census, State
+
+# Events that change what the info label shows.
+INFO_EVENTS = (
+    events.ResourcesChanged,
+    events.TurnEnded,
+    events.UnitCreated,
+    events.UnitRemoved,
+    events.CityFounded,
+    events.CityCaptured,
+)
 
 
 class HUD:
@@ -101,57 +112,142 @@ class HUD:
         self.message.rebuild()
         self.message.hide()
         self._message_timer: float | None = None
+        self.ai_status = pygame_gui.elements.UILabel(
+            relative_rect=pygame.Rect(480, 5, 180, 30),
+            text="",
+            container=self.panel,
+            manager=self.manager,
+        )
+        self.ai_status.hide()
+        self._dirty = False
+        self._watched: State | None = None
+        self._info_stale = True
+        self.minimap_box = self._minimap_box()
+
+    def _minimap_box(self) -> pygame.Rect:
+        """Screen area reserved for the minimap, left of the info label."""
+        h = self.rect.height - 8
+        return pygame.Rect(
+            self.rect.right - 320 - config.MINIMAP_W,
+            self.rect.y + 4,
+            config.MINIMAP_W,
+            h,
+        )
 
     def resize(self, size: tuple[int, int]) -> None:
-        """Resize HUD elements to match the new window ``size``."""
+        """Resize HUD elements to match the new window ``size``.
+
+        Only the panel and the widgets anchored to its bottom or right edge
+        move; nothing is touched when the size is unchanged.
+        """
+        if (self.rect.width, self.rect.bottom) == size:
+            return
         self.rect.y = size[1] - self.rect.height
         self.rect.width = size[0]
         self.manager.set_window_resolution(size)
         self.panel.set_relative_position(self.rect.topleft)
         self.panel.set_dimensions((self.rect.width, self.rect.height))
-        self.buy_unit.set_relative_position((210, self.rect.y + 5))
-        self.focus.set_relative_position((370, 5))
+        self.buy_unit.set_relative_position((self.rect.x + 210, self.rect.y + 5))
         self.info.set_relative_position((self.rect.width - 310, 5))
-        self.info.set_dimensions((300, 30))
-        self.build_panel.set_relative_position((10, 35))
         self.hover_info.set_relative_position(
             (self.rect.width - 210, self.rect.height - 30)
         )
+        self.minimap_box = self._minimap_box()
+        self._dirty = True
 
     def process_event(self, event: pygame.event.Event) -> None:
         self.manager.process_events(event)
 
-    def update(self, time_delta: float, state: State) -> None:
-        player = state.players[state.current_player]
-        self.info.set_text(
-            f"Turn {state.turn} Player {state.current_player} "
-            f"F:{player.food} P:{player.prod}"
-        )
+    def watch(self, state: State) -> None:
+        """Refresh the info label only when ``state`` reports a relevant event.
+
+        Without a watched state the label is recomputed on every update.
+        """
+        self.unwatch()
+        self._watched = state
+        self._info_stale = True
+        for event_type in INFO_EVENTS:
+            state.bus.subscribe(event_type, self._on_info_event)
+
+    def unwatch(self) -> None:
+        if self._watched is not None:
+            for event_type in INFO_EVENTS:
+                self._watched.bus.unsubscribe(event_type, self._on_info_event)
+            self._watched = None
+
+    def _on_info_event(self, event: object) -> None:
+        self._info_stale = True
+
+    def update(self, time_delta: float, state: State) -> bool:
+        """Advance the HUD; return ``True`` if its text or messages changed."""
+        changed = self._dirty
+        self._dirty = False
+        if self._info_stale or state is not self._watched:
+            self._info_stale = False
+            player = state.players[state.current_player]
+            counts = state.census().get(state.current_player, Census())
+            text = (
+                f"Turn {state.turn} Player {state.current_player} "
+                f"F:{player.food} P:{player.prod} "
+                f"C:{counts.cities} U:{counts.units}"
+            )
+            if text != self.info.text:
+                self.info.set_text(text)
+                changed = True
         if self._message_timer is not None:
             self._message_timer -= time_delta
             if self._message_timer <= 0:
                 self.message.hide()
                 self._message_timer = None
+                changed = True
         self.manager.update(time_delta)
+        return changed
 
     def draw(self, surface: pygame.Surface) -> None:
         self.manager.draw_ui(surface)
 
     def set_hover_info(self, text: str) -> None:
-        self.hover_info.set_text(text)
-        self.hover_info.show()
+        if text != self.hover_info.text:
+            self.hover_info.set_text(text)
+            self._dirty = True
+        if not self.hover_info.visible:
+            self.hover_info.show()
+            self._dirty = True
 
     def clear_hover_info(self) -> None:
-        self.hover_info.hide()
+        if self.hover_info.visible:
+            self.hover_info.hide()
+            self._dirty = True
+
+    def set_ai_progress(self, fraction: float | None) -> None:
+        """Show how far the AI is through its turn, or hide the indicator."""
+        if fraction is None:
+            if self.ai_status.visible:
+                self.ai_status.hide()
+                self._dirty = True
+            return
+        text = f"AI thinking... {int(fraction * 100)}%"
+        if text != self.ai_status.text:
+            self.ai_status.set_text(text)
+            self._dirty = True
+        if not self.ai_status.visible:
+            self.ai_status.show()
+            self._dirty = True
 
     def show_message(self, text: str, timeout: float | None = None) -> None:
-        self.message.set_text(text)
-        self.message.show()
+        if text != self.message.text:
+            self.message.set_text(text)
+            self._dirty = True
+        if not self.message.visible:
+            self.message.show()
+            self._dirty = True
         self._message_timer = timeout
 
     def hide_message(self) -> None:
         """Hide any active message immediately."""
-        self.message.hide()
+        if self.message.visible:
+            self.message.hide()
+            self._dirty = True
         self._message_timer = None
 
     def reset_buy_unit(self) -> None:
@@ -163,7 +259,9 @@ class HUD:
 
     def set_focus_option(self, option: str) -> None:
         """Set the focus button text to ``option``."""
-        self.focus.set_text(option)
+        if option != self.focus.text:
+            self.focus.set_text(option)
+            self._dirty = True
 
     def show_build_options(self, state: State, coord: tuple[int, int]) -> None:
         tile = state.tile_at(coord)
@@ -176,14 +274,31 @@ class HUD:
                 and kind not in tile.improvements
                 and player.prod >= info["cost"]
             )
-            if allowed:
-                button.enable()
-            else:
-                button.disable()
-        self.build_panel.show()
+            if allowed != button.is_enabled:
+                if allowed:
+                    button.enable()
+                else:
+                    button.disable()
+                self._dirty = True
+        if not self.build_panel.visible:
+            self.build_panel.show()
+            self._dirty = True
 
     def hide_build_options(self) -> None:
-        self.build_panel.hide()
+        if self.build_panel.visible:
+            self.build_panel.hide()
+            self._dirty = True
+
+    def overlay_rect(self) -> pygame.Rect | None:
+        """Return the screen area of the expanded buy-unit menu, if open."""
+        menu = self.buy_unit.current_state
+        if menu is not self.buy_unit.menu_states["expanded"]:
+            return None
+        rect = self.buy_unit.rect.copy()
+        options_list = getattr(menu, "options_selection_list", None)
+        if options_list is not None:
+            rect.union_ip(options_list.rect)
+        return rect
 
     def contains_point(self, pos: tuple[int, int]) -> bool:
         """Return True if ``pos`` is over any HUD element.
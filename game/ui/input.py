@@ -8,14 +8,32 @@ import pygame
 import pygame_gui
 
 from .. import config
-from ..core import rules
-from ..core.models import State
+from ..core import events, rules
+from ..core.models import Coord, State
+from .camera import Camera
 from .hud import HUD
+from .minimap import Minimap
+
+# Events that may change a tooltip anywhere (city yields sum claimed tiles)
+# and events that only touch the tiles they name.
+TOOLTIP_RESET_EVENTS = (
+    events.CityFounded,
+    events.CityGrew,
+    events.CityCaptured,
+    events.ImprovementBuilt,
+    events.TurnEnded,
+)
+TOOLTIP_UNIT_EVENTS = (events.UnitMoved, events.UnitCreated, events.UnitRemoved)
 
 
 class InputHandler:
-    def __init__(self, hud: HUD) -> None:
+    def __init__(
+        self, hud: HUD, camera: Camera, minimap: Minimap | None = None
+    ) -> None:
         self.hud = hud
+        self.camera = camera
+        self.minimap = minimap
+        self.dragging = False
         self.selected: int | None = None
         self.selected_city: int | None = None
         self.selected_tile: tuple[int, int] | None = None
@@ -24,6 +42,126 @@ class InputHandler:
         self.hud.focus.disable()
         self.hud.hide_message()
         self.hud.hide_build_options()
+        self._hover_pos: tuple[int, int] | None = None
+        self._hover_coord: Coord | None = None
+        self._hover_stale = False
+        self._tooltips: dict[Coord, str] = {}
+        self._watched: State | None = None
+
+    def watch(self, state: State) -> None:
+        """Memoize tooltips for ``state``, dropping them on relevant events."""
+        self.unwatch()
+        self._watched = state
+        for event_type in TOOLTIP_RESET_EVENTS:
+            state.bus.subscribe(event_type, self._forget_all)
+        for event_type in TOOLTIP_UNIT_EVENTS:
+            state.bus.subscribe(event_type, self._forget_unit)
+
+    def unwatch(self) -> None:
+        if self._watched is not None:
+            for event_type in TOOLTIP_RESET_EVENTS:
+                self._watched.bus.unsubscribe(event_type, self._forget_all)
+            for event_type in TOOLTIP_UNIT_EVENTS:
+                self._watched.bus.unsubscribe(event_type, self._forget_unit)
+            self._watched = None
+        self._tooltips.clear()
+
+    def _forget_all(self, event: object) -> None:
+        self._tooltips.clear()
+        self._hover_stale = True
+
+    def _forget_unit(self, event: object) -> None:
+        for coord in (
+            getattr(event, "src", None),
+            getattr(event, "dest", None),
+            getattr(event, "pos", None),
+        ):
+            if coord is not None:
+                self._tooltips.pop(coord, None)
+                if coord == self._hover_coord:
+                    self._hover_stale = True
+
+    @property
+    def memoized_tooltips(self) -> int:
+        return len(self._tooltips)
+
+    def tooltip(self, state: State, coord: Coord) -> str:
+        """Return the hover text for ``coord``, memoized while watching."""
+        text = self._tooltips.get(coord) if state is self._watched else None
+        if text is not None:
+            return text
+        units = state.units_at(coord)
+        if units:
+            unit = units[0]
+            text = f"{unit.kind} (Player {unit.owner})"
+        else:
+            city = state.city_at(coord)
+            if city is not None:
+                total_food = 0
+                total_prod = 0
+                for c in city.claimed:
+                    food, prod = rules.tile_yield(state, c)
+                    total_food += food
+                    total_prod += prod
+                text = f"City (Player {city.owner}) F:{total_food} P:{total_prod}"
+            else:
+                tile = state.tile_at(coord)
+                food, prod = rules.tile_yield(state, coord)
+                text = f"{tile.kind} F:{food} P:{prod}"
+        if state is self._watched:
+            self._tooltips[coord] = text
+        return text
+
+    def update_hover(self, state: State) -> None:
+        """Refresh the hover info once per frame from the latest mouse motion.
+
+        Nothing is recomputed unless the hovered tile changed or a state
+        change touched it.
+        """
+        if self._hover_pos is not None:
+            pos, self._hover_pos = self._hover_pos, None
+            coord = self.camera.screen_to_tile(pos)
+            # Ignore motion over the HUD (including the expanded buy-unit
+            # dropdown) so hover info does not interfere with HUD use.
+            if coord is not None and self.hud.contains_point(pos):
+                coord = None
+            if coord == self._hover_coord and not self._hover_stale:
+                return
+            self._hover_coord = coord
+        elif not self._hover_stale:
+            return
+        self._hover_stale = False
+        if self._hover_coord is None:
+            self.hud.clear_hover_info()
+        else:
+            self.hud.set_hover_info(self.tooltip(state, self._hover_coord))
+
+    def handle_view_event(self, event: pygame.event.Event) -> bool:
+        """Pan or zoom the camera for ``event``; return ``True`` if it was used.
+
+        This is all the input accepted while the AI is playing.
+        """
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 2:
+            self.dragging = True
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 2:
+            self.dragging = False
+        elif event.type == pygame.MOUSEWHEEL:
+            pos = pygame.mouse.get_pos()
+            if not self.hud.contains_point(pos):
+                self.camera.zoom(event.y, pos)
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            dx, dy = event.rel
+            self.camera.pan(-dx, -dy)
+        elif (
+            event.type == pygame.MOUSEBUTTONDOWN
+            and event.button == 1
+            and self.minimap is not None
+            and self.minimap.tile_at(event.pos) is not None
+        ):
+            self.camera.center_on(self.minimap.tile_at(event.pos))
+        else:
+            return False
+        return True
 
     def handle_event(
         self, event: pygame.event.Event, state: State, rng: Random
@@ -39,46 +177,16 @@ class InputHandler:
             self.selected_city = None
             self.hud.buy_unit.disable()
             self.hud.focus.disable()
+        if self.handle_view_event(event):
+            return
         if event.type == pygame.MOUSEMOTION:
-            x, y = event.pos
-            # Ignore motion outside the map area or over the HUD (including the
-            # expanded buy-unit dropdown) to prevent hover info from
-            # interfering with HUD interactions.
-            map_rect = pygame.Rect(
-                0, 0, state.width * config.TILE_SIZE, state.height * config.TILE_SIZE
-            )
-            if not map_rect.collidepoint(x, y) or self.hud.contains_point((x, y)):
-                self.hud.clear_hover_info()
-                return
-            coord = (x // config.TILE_SIZE, y // config.TILE_SIZE)
-            units = state.units_at(coord)
-            if units:
-                unit = units[0]
-                text = f"{unit.kind} (Player {unit.owner})"
-            else:
-                city = state.city_at(coord)
-                if city is not None:
-                    total_food = 0
-                    total_prod = 0
-                    for c in city.claimed:
-                        food, prod = rules.tile_yield(state, c)
-                        total_food += food
-                        total_prod += prod
-                    text = f"City (Player {city.owner}) F:{total_food} P:{total_prod}"
-                else:
-                    tile = state.tile_at(coord)
-                    food, prod = rules.tile_yield(state, coord)
-                    text = f"{tile.kind} F:{food} P:{prod}"
-            self.hud.set_hover_info(text)
+            # Only the last motion of a frame matters; see update_hover.
+            self._hover_pos = event.pos
         elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            x, y = event.pos
-            map_rect = pygame.Rect(
-                0, 0, state.width * config.TILE_SIZE, state.height * config.TILE_SIZE
-            )
-            if self.hud.contains_point((x, y)) or not map_rect.collidepoint(x, y):
+            tile = self.camera.screen_to_tile(event.pos)
+            if self.hud.contains_point(event.pos) or tile is None:
                 # Clicking HUD or outside the map should not affect selection.
                 return
-            tile = (x // config.TILE_SIZE, y // config.TILE_SIZE)
             if (
                 pygame.key.get_mods() & pygame.KMOD_SHIFT
                 and self.selected is not None
@@ -145,14 +253,10 @@ class InputHandler:
             else:
                 self.hud.hide_build_options()
         elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
-            x, y = event.pos
-            map_rect = pygame.Rect(
-                0, 0, state.width * config.TILE_SIZE, state.height * config.TILE_SIZE
-            )
-            if self.hud.contains_point((x, y)) or not map_rect.collidepoint(x, y):
+            dest = self.camera.screen_to_tile(event.pos)
+            if self.hud.contains_point(event.pos) or dest is None:
                 return
             if self.selected is not None and self.selected in state.units:
-                dest = (x // config.TILE_SIZE, y // config.TILE_SIZE)
                 try:
                     rules.move_unit(state, self.selected, dest)
                     self.hud.hide_message()
@@ -301,6 +405,7 @@ class InputHandler:
                 ):
                     city = state.cities[self.selected_city]
                     city.focus = "prod" if city.focus == "food" else "food"
+                    state.mark_city(city.id)
                     self.hud.set_focus_option(
                         "Food" if city.focus == "food" else "Production"
                     )
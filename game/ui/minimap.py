@@ -0,0 +1,175 @@
+"""Minimap of the whole world drawn in the HUD."""
+
+from __future__ import annotations
+
+import pygame
+
+from .. import config
+from ..core.models import Coord, State
+from ..core.spatial import SpatialIndex
+from .camera import Camera
+from .renderer import COLORS, FOG_KEY, PLAYER_COLORS, fog_image, terrain_image
+
+VIEW_COLOR = (255, 255, 255)
+FRAME_COLOR = (90, 90, 90)
+
+
+def _tint(color: tuple[int, int, int], owner: int) -> tuple[int, int, int]:
+    r, g, b = PLAYER_COLORS[owner % len(PLAYER_COLORS)]
+    return ((color[0] + r) // 2, (color[1] + g) // 2, (color[2] + b) // 2)
+
+
+class Minimap:
+    """Whole-world overview scaled into ``box`` at one pixel per tile or less.
+
+    Each player's view is a one-pixel-per-tile image of terrain, fog and
+    territory.  It is built once and then patched from the state's change
+    tracking: changed tiles are recoloured and a changed city recolours its
+    claims.  The view is scaled into the box once per player and size, and
+    changed tiles are patched into the scaled copy too.  Cities and units
+    are drawn on a copy of that which is rebuilt only when the state
+    changed, and the camera rectangle is drawn over it on every
+    :meth:`draw`, so scrolling costs one small blit.  Territory and entity
+    positions come from ``index``, which must be updated before
+    :meth:`update` is called.  The minimap shows what ``player``, by default
+    the human player, has seen.
+    """
+
+    def __init__(
+        self,
+        state: State,
+        index: SpatialIndex,
+        camera: Camera,
+        box: pygame.Rect,
+        player: int = config.HUMAN_PLAYER,
+    ) -> None:
+        self.state = state
+        self.index = index
+        self.camera = camera
+        self.player = player
+        self.changes = state.track()
+        self._images: dict[int, pygame.Surface] = {}
+        self._player: int | None = None
+        self._scaled: pygame.Surface | None = None
+        self._frame: pygame.Surface | None = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.resize(box)
+
+    def resize(self, box: pygame.Rect) -> None:
+        """Fit the minimap into ``box``, keeping the map's aspect ratio."""
+        scale = min(1.0, box.width / self.state.width, box.height / self.state.height)
+        w = max(1, int(self.state.width * scale))
+        h = max(1, int(self.state.height * scale))
+        self.rect = pygame.Rect(0, 0, w, h)
+        self.rect.center = box.center
+        self._scaled = None
+        self._frame = None
+
+    def close(self) -> None:
+        self.state.untrack(self.changes)
+
+    def _color(self, coord: Coord, player: int) -> tuple[int, int, int]:
+        tile = self.state.tile_at(coord)
+        if not tile.is_revealed(player):
+            return COLORS["fog"]
+        cid = self.index.claims.get(coord)
+        if cid is None:
+            return COLORS[tile.kind]
+        return _tint(COLORS[tile.kind], self.state.cities[cid].owner)
+
+    def _point(self, coord: Coord) -> tuple[int, int]:
+        """Return the minimap pixel, relative to :attr:`rect`, of ``coord``."""
+        w, h = self.rect.size
+        return (
+            min(w - 1, coord[0] * w // self.state.width),
+            min(h - 1, coord[1] * h // self.state.height),
+        )
+
+    def image(self, player: int) -> pygame.Surface:
+        """Return ``player``'s one-pixel-per-tile view, building it once."""
+        image = self._images.get(player)
+        if image is None:
+            # Terrain and fog come from the packed grids; only claimed tiles
+            # are looked at one by one.
+            state = self.state
+            image = pygame.Surface((state.width, state.height))
+            image.blit(terrain_image(state), (0, 0))
+            fog = fog_image(state, player)
+            fog.set_colorkey(FOG_KEY)
+            image.blit(fog, (0, 0))
+            for coord in self.index.claims:
+                image.set_at(coord, self._color(coord, player))
+            self._images[player] = image
+        return image
+
+    def update(self) -> None:
+        """Apply pending state changes to the cached views."""
+        changes = self.changes
+        coords = set(changes.tiles)
+        for cid in changes.cities:
+            city = self.state.cities.get(cid)
+            if city is not None:
+                coords |= city.claimed
+        for player, image in self._images.items():
+            for coord in coords:
+                image.set_at(coord, self._color(coord, player))
+        player = self.player
+        if player != self._player:
+            self._player = player
+            self._scaled = None
+        elif self._scaled is not None and coords:
+            # Several tiles share a pixel when scaled down; the one that
+            # changed last colours it until the next full rescale.
+            image = self._images[player]
+            for coord in coords:
+                self._scaled.set_at(self._point(coord), image.get_at(coord))
+        if changes or self._scaled is None:
+            self._frame = None
+        changes.clear()
+
+    def _render(self) -> pygame.Surface:
+        state = self.state
+        player = self.player
+        if self._scaled is None:
+            self._player = player
+            self._scaled = pygame.transform.scale(self.image(player), self.rect.size)
+        frame = self._scaled.copy()
+        for coord, uids in self.index.units.items():
+            if state.tile_at(coord).is_revealed(player):
+                owner = state.units[uids[0]].owner
+                frame.set_at(
+                    self._point(coord), PLAYER_COLORS[owner % len(PLAYER_COLORS)]
+                )
+        for coord in self.index.cities:
+            if state.tile_at(coord).is_revealed(player):
+                x, y = self._point(coord)
+                frame.fill(COLORS["city"], (x - 1, y - 1, 3, 3))
+        return frame
+
+    def view_rect(self) -> pygame.Rect:
+        """Return the camera's view in screen coordinates on the minimap."""
+        area = self.camera.visible_tiles()
+        sx = self.rect.width / self.state.width
+        sy = self.rect.height / self.state.height
+        return pygame.Rect(
+            self.rect.x + int(area.x * sx),
+            self.rect.y + int(area.y * sy),
+            max(2, round(area.width * sx)),
+            max(2, round(area.height * sy)),
+        ).clip(self.rect)
+
+    def draw(self, surface: pygame.Surface) -> pygame.Rect:
+        if self._frame is None:
+            self._frame = self._render()
+        surface.blit(self._frame, self.rect)
+        pygame.draw.rect(surface, VIEW_COLOR, self.view_rect(), 1)
+        pygame.draw.rect(surface, FRAME_COLOR, self.rect.inflate(2, 2), 1)
+        return self.rect.inflate(2, 2)
+
+    def tile_at(self, pos: tuple[int, int]) -> Coord | None:
+        """Return the map tile under the screen position ``pos``, if any."""
+        if not self.rect.collidepoint(pos):
+            return None
+        x = (pos[0] - self.rect.x) * self.state.width // self.rect.width
+        y = (pos[1] - self.rect.y) * self.state.height // self.rect.height
+        return (x, y)
@@ -0,0 +1,134 @@
+"""Frame timing and the F3 performance overlay."""
+
+from __future__ import annotations
+
+from collections import deque
+from time import perf_counter
+from typing import Mapping, Sequence
+
+import pygame
+
+from .. import config
+
+SECTION_COLORS = [
+    (66, 135, 245),
+    (245, 66, 66),
+    (66, 245, 120),
+    (245, 200, 66),
+    (200, 66, 245),
+    (66, 230, 245),
+    (160, 160, 160),
+]
+OVERLAY_BG = (16, 16, 16)
+TARGET_COLOR = (90, 90, 90)
+GRAPH_H = 80
+# Frame time at the top of the graph, in milliseconds.
+GRAPH_MS = 33.3
+
+
+def hit_rate(hits: int, misses: int) -> str:
+    total = hits + misses
+    return f"{100 * hits / total:.0f}% of {total}" if total else "-"
+
+
+class FrameTimer:
+    """Time named sections of the frame loop and keep the last frames.
+
+    Call :meth:`start` at the top of a frame, :meth:`lap` after each
+    section (the time since the previous lap is charged to it) and
+    :meth:`end` to push the frame into a ring buffer of ``history`` frames.
+    """
+
+    def __init__(
+        self, sections: Sequence[str], history: int = config.PERF_HISTORY
+    ) -> None:
+        self.sections = tuple(sections)
+        self.frames: deque[tuple[float, ...]] = deque(maxlen=history)
+        self._current = dict.fromkeys(self.sections, 0.0)
+        self._last = perf_counter()
+
+    def start(self) -> None:
+        for name in self._current:
+            self._current[name] = 0.0
+        self._last = perf_counter()
+
+    def lap(self, section: str) -> None:
+        now = perf_counter()
+        self._current[section] += now - self._last
+        self._last = now
+
+    def end(self) -> None:
+        self.frames.append(tuple(self._current[s] for s in self.sections))
+
+    def averages(self) -> dict[str, float]:
+        """Mean seconds per section over the kept frames."""
+        if not self.frames:
+            return dict.fromkeys(self.sections, 0.0)
+        n = len(self.frames)
+        return {
+            name: sum(frame[i] for frame in self.frames) / n
+            for i, name in enumerate(self.sections)
+        }
+
+    def worst(self) -> float:
+        """Longest total frame time among the kept frames, in seconds."""
+        return max((sum(frame) for frame in self.frames), default=0.0)
+
+
+class PerfOverlay:
+    """Stacked frame-time graph with per-section averages and counters."""
+
+    def __init__(self, topleft: tuple[int, int] = (8, 8), width: int = 300) -> None:
+        self.visible = False
+        self.rect = pygame.Rect(topleft, (width, GRAPH_H))
+        self._font: pygame.font.Font | None = None
+
+    def toggle(self) -> None:
+        self.visible = not self.visible
+
+    def draw(
+        self,
+        surface: pygame.Surface,
+        timer: FrameTimer,
+        counters: Mapping[str, str],
+    ) -> pygame.Rect:
+        """Draw the overlay and return the area it covers."""
+        if self._font is None:
+            self._font = pygame.font.Font(None, 16)
+        font = self._font
+        averages = timer.averages()
+        lines = [f"{name:<10} {avg * 1000:6.2f} ms" for name, avg in averages.items()]
+        total = sum(averages.values())
+        lines.append(
+            f"frame avg {total * 1000:.2f} ms  worst {timer.worst() * 1000:.2f} ms"
+        )
+        lines += [f"{key}: {value}" for key, value in counters.items()]
+        line_h = font.get_linesize()
+        height = GRAPH_H + 8 + line_h * len(lines)
+        self.rect.height = height
+        panel = pygame.Surface(self.rect.size)
+        panel.fill(OVERLAY_BG)
+        width = self.rect.width
+        bar = max(1, width // (timer.frames.maxlen or 1))
+        scale = GRAPH_H / (GRAPH_MS / 1000)
+        for x, frame in enumerate(timer.frames):
+            y = GRAPH_H
+            for i, seconds in enumerate(frame):
+                h = min(y, round(seconds * scale))
+                if h:
+                    color = SECTION_COLORS[i % len(SECTION_COLORS)]
+                    panel.fill(color, (x * bar, y - h, bar, h))
+                    y -= h
+        target = round(GRAPH_H - (1000 / config.ACTIVE_FPS) / GRAPH_MS * GRAPH_H)
+        panel.fill(TARGET_COLOR, (0, target, width, 1))
+        y = GRAPH_H + 4
+        for i, line in enumerate(lines):
+            color = (
+                SECTION_COLORS[i % len(SECTION_COLORS)]
+                if i < len(timer.sections)
+                else (255, 255, 255)
+            )
+            panel.blit(font.render(line, True, color), (4, y))
+            y += line_h
+        surface.blit(panel, self.rect)
+        return self.rect.copy()
@@ -2,10 +2,18 @@
 
 from __future__ import annotations
 
+from collections import OrderedDict
+from typing import Collection
+
 import pygame
 
 from .. import config
-from ..core.models import State
+from ..core.events import ImprovementBuilt
+from ..core.models import City, Coord, State
+from ..core.saveio import TERRAIN_KINDS, reveal_grid, terrain_grid
+from ..core.spatial import SpatialIndex
+from .camera import Camera
+from .sprites import SpriteAtlas
 
 COLORS = {
     "plains": (200, 200, 150),
@@ -18,7 +26,27 @@ COLORS = {
     "soldier": (255, 0, 0),
     "settler": (0, 255, 255),
 }
+PLAYER_COLORS = [
+    (30, 144, 255),
+    (220, 20, 60),
+    (50, 205, 50),
+    (255, 140, 0),
+    (148, 0, 211),
+    (0, 206, 209),
+    (255, 105, 180),
+    (240, 230, 140),
+    (139, 69, 19),
+    (112, 128, 144),
+    (0, 128, 128),
+    (128, 0, 0),
+    (0, 0, 128),
+    (128, 128, 0),
+    (255, 255, 255),
+    (64, 64, 64),
+]
 CLAIM_COLOR = (255, 255, 0)
+# Transparent colour key of the fog masks; never used for drawing.
+FOG_KEY = (1, 2, 3)
 SELECT_COLOR = (255, 0, 255)
 INFRA_COLORS = {
     "farm": (144, 238, 144),
@@ -28,54 +56,223 @@ INFRA_COLORS = {
 }
 FONT: pygame.font.Font | None = None
 FONT_SIZE = 0
+# Above this share of the map a partial redraw costs more than a full one.
+FULL_REDRAW_RATIO = 0.5
+# Number of rendered label surfaces kept by ``TEXT_CACHE``.
+TEXT_CACHE_SIZE = 256
+# Side length, in tiles, of the cached terrain layer chunks.
+CHUNK_TILES = 32
 
 
-def draw(
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (text, colour, font size).
+
+    Map labels repeat the same few strings (city sizes, ``#n`` stack counts),
+    so after the first frame drawing them costs only a blit.
+    """
+
+    def __init__(self, max_entries: int = TEXT_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+
+    def render(
+        self,
+        font: pygame.font.Font,
+        font_px: int,
+        text: str,
+        color: tuple[int, int, int],
+    ) -> pygame.Surface:
+        key = (text, color, font_px)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+
+TEXT_CACHE = TextCache()
+ATLAS = SpriteAtlas(COLORS, INFRA_COLORS)
+
+
+def _font() -> pygame.font.Font:
+    global FONT, FONT_SIZE
+    font_px = max(12, config.TILE_SIZE // 2)
+    if FONT is None or FONT_SIZE != font_px:
+        FONT = pygame.font.Font(None, font_px)
+        FONT_SIZE = font_px
+        TEXT_CACHE.clear()
+    return FONT
+
+
+def reset_font() -> None:
+    """Drop the map font and its labels, e.g. before ``pygame.quit``."""
+    global FONT, FONT_SIZE
+    FONT = None
+    FONT_SIZE = 0
+    TEXT_CACHE.clear()
+
+
+def render_text(text: str, color: tuple[int, int, int] = (0, 0, 0)) -> pygame.Surface:
+    """Return ``text`` rendered in the map font, reusing cached surfaces."""
+    font = _font()
+    return TEXT_CACHE.render(font, FONT_SIZE, text, color)
+
+
+def draw_tiles(
+    state: State,
+    surface: pygame.Surface,
+    only: Collection[Coord] | None = None,
+    player: int | None = None,
+    offset: tuple[int, int] = (0, 0),
+    fog: bool = True,
+) -> None:
+    """Draw terrain, fog and improvements, restricted to ``only`` if given.
+
+    Fog is computed for ``player`` (default: the current player) unless
+    ``fog`` is false, and tiles are drawn ``offset`` pixels up and to the
+    left of their map position.
+    """
+
+    ts = config.TILE_SIZE
+    sprites = ATLAS.sprites(ts)
+    if player is None:
+        player = state.current_player
+    ox, oy = offset
+    tiles = state.tiles if only is None else [state.tile_at(c) for c in only]
+    jobs = []
+    for tile in tiles:
+        dest = (tile.x * ts - ox, tile.y * ts - oy)
+        if fog and not tile.is_revealed(player):
+            jobs.append((sprites["fog"], dest))
+            continue
+        jobs.append((sprites[tile.kind], dest))
+        if "road" in tile.improvements:
+            jobs.append((sprites["road"], dest))
+        for imp in tile.improvements:
+            if imp != "road":
+                jobs.append((sprites[imp], dest))
+    surface.blits(jobs, doreturn=False)
+
+
+EDGE_N, EDGE_E, EDGE_S, EDGE_W = 1, 2, 4, 8
+BORDER_PX = 2
+BORDER_SIDES = [
+    (EDGE_N, lambda r: pygame.Rect(r.x, r.y, r.width, BORDER_PX)),
+    (EDGE_E, lambda r: pygame.Rect(r.right - BORDER_PX, r.y, BORDER_PX, r.height)),
+    (EDGE_S, lambda r: pygame.Rect(r.x, r.bottom - BORDER_PX, r.width, BORDER_PX)),
+    (EDGE_W, lambda r: pygame.Rect(r.x, r.y, BORDER_PX, r.height)),
+]
+
+
+def border_edges(claimed: Collection[Coord]) -> dict[Coord, int]:
+    """Return the outer edges of the territory ``claimed``.
+
+    Each claimed tile on the border maps to a bitmask of the ``EDGE_*``
+    sides whose neighbour is not part of the territory; interior tiles are
+    left out.
+    """
+
+    edges = {}
+    for x, y in claimed:
+        mask = 0
+        if (x, y - 1) not in claimed:
+            mask |= EDGE_N
+        if (x + 1, y) not in claimed:
+            mask |= EDGE_E
+        if (x, y + 1) not in claimed:
+            mask |= EDGE_S
+        if (x - 1, y) not in claimed:
+            mask |= EDGE_W
+        if mask:
+            edges[(x, y)] = mask
+    return edges
+
+
+class BorderCache:
+    """Per-city territory outlines, recomputed only when a claim set changes."""
+
+    def __init__(self) -> None:
+        self._edges: dict[int, dict[Coord, int]] = {}
+
+    def edges(self, city: City) -> dict[Coord, int]:
+        edges = self._edges.get(city.id)
+        if edges is None:
+            edges = self._edges[city.id] = border_edges(city.claimed)
+        return edges
+
+    def invalidate(self, city_id: int) -> None:
+        self._edges.pop(city_id, None)
+
+
+def draw_entities(
     state: State,
     surface: pygame.Surface,
     selected_unit_id: int | None = None,
     selected_city_id: int | None = None,
     selected_tile: tuple[int, int] | None = None,
+    only: Collection[Coord] | None = None,
+    offset: tuple[int, int] = (0, 0),
+    index: SpatialIndex | None = None,
+    borders: BorderCache | None = None,
+    player: int | None = None,
 ) -> None:
-    global FONT, FONT_SIZE
+    """Draw cities, units, move bars, territory borders and selections.
+
+    When ``only`` is given, anything outside those tiles is skipped; with an
+    ``index`` the entities on those tiles are looked up instead of scanning
+    every unit and city.  ``borders`` supplies cached territory outlines,
+    drawn where ``player`` (default: the current player) has looked.
+    """
+
     ts = config.TILE_SIZE
-    font_px = max(12, ts // 2)
-    if FONT is None or FONT_SIZE != font_px:
-        FONT = pygame.font.Font(None, font_px)
-        FONT_SIZE = font_px
+    ox, oy = offset
+    if player is None:
+        player = state.current_player
+
+    def visible(coord: Coord) -> bool:
+        return only is None or coord in only
+
+    def tile_rect(coord: Coord) -> pygame.Rect:
+        return pygame.Rect(coord[0] * ts - ox, coord[1] * ts - oy, ts, ts)
+
+    if only is not None and index is not None:
+        cities = index.cities_in(only)
+        units = index.units_in(only)
+        claims = [(c, state.cities[index.claims[c]]) for c in index.claims_in(only)]
+    else:
+        cities = [c for c in state.cities.values() if visible(c.pos)]
+        units = [u for u in state.units.values() if visible(u.pos)]
+        claims = [
+            (coord, city)
+            for city in state.cities.values()
+            for coord in getattr(city, "claimed", {city.pos})
+            if visible(coord)
+        ]
+    sprites = ATLAS.sprites(ts)
+    jobs = []
+    for city in cities:
+        rect = tile_rect(city.pos)
+        jobs.append((sprites["city"], rect))
+        text = render_text(str(city.size))
+        jobs.append((text, text.get_rect(center=rect.center)))
     move_points: dict[tuple[int, int], tuple[int, int]] = {}
-    for tile in state.tiles:
-        rect = pygame.Rect(tile.x * ts, tile.y * ts, ts, ts)
-        color = COLORS[tile.kind]
-        surface.fill(color, rect)
-        if state.current_player in tile.revealed_by:
-            if "road" in tile.improvements:
-                pygame.draw.line(
-                    surface, INFRA_COLORS["road"], rect.midleft, rect.midright, 2
-                )
-                pygame.draw.line(
-                    surface, INFRA_COLORS["road"], rect.midtop, rect.midbottom, 2
-                )
-            for imp in tile.improvements:
-                if imp == "road":
-                    continue
-                inner = pygame.Rect(
-                    rect.x + ts // 4, rect.y + ts // 4, ts // 2, ts // 2
-                )
-                surface.fill(INFRA_COLORS[imp], inner)
-        else:
-            surface.fill(COLORS["fog"], rect)
-    for city in state.cities.values():
-        rect = pygame.Rect(city.pos[0] * ts, city.pos[1] * ts, ts, ts)
-        surface.fill(COLORS["city"], rect)
-        if FONT:
-            text = FONT.render(str(city.size), True, (0, 0, 0))
-            text_rect = text.get_rect(center=rect.center)
-            surface.blit(text, text_rect)
     soldier_counts: dict[tuple[int, int], int] = {}
-    for unit in state.units.values():
-        rect = pygame.Rect(unit.pos[0] * ts + 8, unit.pos[1] * ts + 8, ts - 16, ts - 16)
-        surface.fill(COLORS[unit.kind], rect)
+    for unit in units:
+        jobs.append((sprites[unit.kind], tile_rect(unit.pos)))
         if unit.moves_left > 0:
             max_moves = config.UNIT_STATS[unit.kind]["moves"]
             prev = move_points.get(unit.pos, (0, max_moves))
@@ -83,36 +280,543 @@ def draw(
         if unit.kind == "soldier":
             soldier_counts[unit.pos] = soldier_counts.get(unit.pos, 0) + 1
     for coord, count in soldier_counts.items():
-        rect = pygame.Rect(coord[0] * ts, coord[1] * ts, ts, ts)
-        if FONT:
-            text = FONT.render(f"#{count}", True, (0, 0, 0))
-            text_rect = text.get_rect(center=rect.center)
-            surface.blit(text, text_rect)
+        text = render_text(f"#{count}")
+        jobs.append((text, text.get_rect(center=tile_rect(coord).center)))
+    surface.blits(jobs, doreturn=False)
+    bar_h = max(2, ts // 8)
     for coord, (moves, max_moves) in move_points.items():
         seg_w = max(1, ts // max_moves)
+        rect = tile_rect(coord)
         for i in range(moves):
-            seg_rect = pygame.Rect(
-                coord[0] * ts + i * seg_w,
-                coord[1] * ts,
-                seg_w - 1,
-                4,
-            )
-            pygame.draw.rect(surface, (0, 255, 0), seg_rect)
-    for city in state.cities.values():
-        claimed = getattr(city, "claimed", {city.pos})
-        for coord in claimed:
-            tile = state.tile_at(coord)
-            if state.current_player in tile.revealed_by:
-                rect = pygame.Rect(coord[0] * ts, coord[1] * ts, ts, ts)
-                pygame.draw.rect(surface, CLAIM_COLOR, rect, 2)
+            seg_rect = pygame.Rect(rect.x + i * seg_w, rect.y, seg_w - 1, bar_h)
+            surface.fill((0, 255, 0), seg_rect)
+    if borders is None:
+        borders = BorderCache()
+    for coord, city in claims:
+        mask = borders.edges(city).get(coord, 0)
+        if mask and state.tile_at(coord).is_revealed(player):
+            rect = tile_rect(coord)
+            for edge, side in BORDER_SIDES:
+                if mask & edge:
+                    surface.fill(CLAIM_COLOR, side(rect))
+    outlined = []
     if selected_tile is not None:
-        rect = pygame.Rect(selected_tile[0] * ts, selected_tile[1] * ts, ts, ts)
-        pygame.draw.rect(surface, SELECT_COLOR, rect, 3)
+        outlined.append(selected_tile)
     if selected_unit_id is not None and selected_unit_id in state.units:
-        unit = state.units[selected_unit_id]
-        rect = pygame.Rect(unit.pos[0] * ts, unit.pos[1] * ts, ts, ts)
-        pygame.draw.rect(surface, SELECT_COLOR, rect, 3)
+        outlined.append(state.units[selected_unit_id].pos)
     if selected_city_id is not None and selected_city_id in state.cities:
-        city = state.cities[selected_city_id]
-        rect = pygame.Rect(city.pos[0] * ts, city.pos[1] * ts, ts, ts)
-        pygame.draw.rect(surface, SELECT_COLOR, rect, 3)
+        outlined.append(state.cities[selected_city_id].pos)
+    for coord in outlined:
+        if visible(coord):
+            pygame.draw.rect(surface, SELECT_COLOR, tile_rect(coord), 3)
+
+
+def draw(
+    state: State,
+    surface: pygame.Surface,
+    selected_unit_id: int | None = None,
+    selected_city_id: int | None = None,
+    selected_tile: tuple[int, int] | None = None,
+    player: int | None = None,
+) -> None:
+    """Repaint the whole map as ``player`` (default: the current one) sees it."""
+    draw_tiles(state, surface, player=player)
+    draw_entities(
+        state,
+        surface,
+        selected_unit_id,
+        selected_city_id,
+        selected_tile,
+        player=player,
+    )
+
+
+def surface_bytes(surface: pygame.Surface) -> int:
+    """Return the size of the pixel data of ``surface``."""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+class TerrainLayer:
+    """Pre-rendered terrain and improvements, shared by all players.
+
+    Fog is not part of the layer; :class:`FogMask` is drawn on top.
+
+    The map is split into square chunks of ``CHUNK_TILES`` tiles that are
+    rendered on first use and patched when a tile's terrain or improvements
+    change.  Chunks are keyed by tile size as well as position, so zooming
+    or resizing back to a size seen recently reuses its chunks.  The pixel
+    memory of the chunks kept over all sizes is bounded by ``max_bytes``,
+    least recently used first out; the chunk in use is always kept.
+    """
+
+    def __init__(
+        self,
+        state: State,
+        max_bytes: int = config.LAYER_CACHE_BYTES,
+    ) -> None:
+        self.state = state
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._chunks: OrderedDict[tuple[int, int, int], pygame.Surface] = OrderedDict()
+
+    def _chunk(self, key: Coord) -> pygame.Surface:
+        ts = config.TILE_SIZE
+        sized = (ts, key[0], key[1])
+        chunk = self._chunks.get(sized)
+        if chunk is not None:
+            self.hits += 1
+            self._chunks.move_to_end(sized)
+            return chunk
+        self.misses += 1
+        n = CHUNK_TILES
+        chunk = pygame.Surface((n * ts, n * ts))
+        x0, y0 = key[0] * n, key[1] * n
+        coords = [
+            (x, y)
+            for y in range(y0, min(y0 + n, self.state.height))
+            for x in range(x0, min(x0 + n, self.state.width))
+        ]
+        draw_tiles(self.state, chunk, coords, offset=(x0 * ts, y0 * ts), fog=False)
+        self._chunks[sized] = chunk
+        self.bytes += surface_bytes(chunk)
+        while self.bytes > self.max_bytes and len(self._chunks) > 1:
+            _, old = self._chunks.popitem(last=False)
+            self.bytes -= surface_bytes(old)
+        return chunk
+
+    def patch(self, coords: Collection[Coord]) -> None:
+        """Re-render ``coords``, whose terrain or improvements changed.
+
+        Cached chunks of other tile sizes that contain ``coords`` are dropped
+        and rendered again when that size is next used.
+        """
+        ts = config.TILE_SIZE
+        n = CHUNK_TILES
+        keys = {(x // n, y // n) for x, y in coords}
+        for size, cx, cy in [k for k in self._chunks if k[0] != ts]:
+            if (cx, cy) in keys:
+                self.bytes -= surface_bytes(self._chunks.pop((size, cx, cy)))
+        for x, y in coords:
+            chunk = self._chunks.get((ts, x // n, y // n))
+            if chunk is not None:
+                offset = ((x // n) * n * ts, (y // n) * n * ts)
+                draw_tiles(self.state, chunk, [(x, y)], offset=offset, fog=False)
+
+    def blit(
+        self,
+        surface: pygame.Surface,
+        area: pygame.Rect,
+        offset: tuple[int, int] = (0, 0),
+    ) -> None:
+        """Blit the tiles inside ``area`` (in tile units) onto ``surface``."""
+        ts = config.TILE_SIZE
+        n = CHUNK_TILES
+        ox, oy = offset
+        area = area.clip(pygame.Rect(0, 0, self.state.width, self.state.height))
+        jobs = []
+        for cy in range(area.top // n, (area.bottom - 1) // n + 1):
+            for cx in range(area.left // n, (area.right - 1) // n + 1):
+                part = area.clip(pygame.Rect(cx * n, cy * n, n, n))
+                if part.width <= 0 or part.height <= 0:
+                    continue
+                src = pygame.Rect(
+                    (part.x - cx * n) * ts,
+                    (part.y - cy * n) * ts,
+                    part.width * ts,
+                    part.height * ts,
+                )
+                dest = (part.x * ts - ox, part.y * ts - oy)
+                jobs.append((self._chunk((cx, cy)), dest, src))
+        surface.blits(jobs, doreturn=False)
+
+    def blit_tiles(
+        self,
+        surface: pygame.Surface,
+        coords: Collection[Coord],
+        offset: tuple[int, int] = (0, 0),
+    ) -> None:
+        ts = config.TILE_SIZE
+        n = CHUNK_TILES
+        ox, oy = offset
+        jobs = []
+        for x, y in coords:
+            chunk = self._chunk((x // n, y // n))
+            src = pygame.Rect((x % n) * ts, (y % n) * ts, ts, ts)
+            jobs.append((chunk, (x * ts - ox, y * ts - oy), src))
+        surface.blits(jobs, doreturn=False)
+
+
+def grid_surface(
+    grid: bytes | bytearray,
+    size: tuple[int, int],
+    palette: list[tuple[int, int, int]],
+) -> pygame.Surface:
+    """Return an 8-bit surface showing one byte per pixel through ``palette``."""
+    surface = pygame.image.frombytes(bytes(grid), size, "P")
+    surface.set_palette(palette)
+    return surface
+
+
+def terrain_image(state: State) -> pygame.Surface:
+    """Return the terrain of ``state`` at one pixel per tile."""
+    palette = [COLORS[kind] for kind in TERRAIN_KINDS]
+    return grid_surface(terrain_grid(state), (state.width, state.height), palette)
+
+
+def fog_image(state: State, player: int) -> pygame.Surface:
+    """Return ``player``'s fog at one pixel per tile, revealed as ``FOG_KEY``."""
+    palette = [COLORS["fog"], FOG_KEY]
+    size = (state.width, state.height)
+    return grid_surface(reveal_grid(state, player), size, palette)
+
+
+def scale_area(
+    image: pygame.Surface, area: pygame.Rect, tile_size: int
+) -> pygame.Surface:
+    """Scale the one-pixel-per-tile ``area`` of ``image`` to ``tile_size``."""
+    return pygame.transform.scale(
+        image.subsurface(area), (area.width * tile_size, area.height * tile_size)
+    )
+
+
+class OverviewLayer:
+    """One pixel per tile terrain image for zoomed-out drawing.
+
+    The visible part is scaled up to the current tile size when drawn, so
+    the cost depends on the window size and not on the zoom level or the
+    size of the map.  The image is built from the packed terrain grid, so a
+    memory-mapped save does not materialize its tiles.
+    """
+
+    def __init__(self, state: State) -> None:
+        self.state = state
+        self._image: pygame.Surface | None = None
+
+    def image(self) -> pygame.Surface:
+        if self._image is None:
+            self._image = terrain_image(self.state)
+        return self._image
+
+    def patch(self, coords: Collection[Coord]) -> None:
+        if self._image is not None:
+            for coord in coords:
+                self._image.set_at(coord, COLORS[self.state.tile_at(coord).kind])
+
+    def blit(
+        self,
+        surface: pygame.Surface,
+        area: pygame.Rect,
+        offset: tuple[int, int] = (0, 0),
+    ) -> None:
+        if area.width <= 0 or area.height <= 0:
+            return
+        ts = config.TILE_SIZE
+        scaled = scale_area(self.image(), area, ts)
+        surface.blit(scaled, (area.x * ts - offset[0], area.y * ts - offset[1]))
+
+
+class FogMask:
+    """One player's fog of war at one pixel per tile.
+
+    Unrevealed tiles are opaque fog and revealed ones use the transparent
+    colour key.  The mask is built once, patched only for tiles that changed
+    and drawn over the terrain with a single scaled blit; each player has
+    their own mask, so switching players just picks another one.  Like
+    :class:`OverviewLayer` it is built from the packed reveal grid.
+    """
+
+    def __init__(self, state: State, player: int) -> None:
+        self.state = state
+        self.player = player
+        self._mask: pygame.Surface | None = None
+        self._scaled: tuple[tuple, pygame.Surface] | None = None
+
+    def _color(self, coord: Coord) -> tuple[int, int, int]:
+        if self.state.tile_at(coord).is_revealed(self.player):
+            return FOG_KEY
+        return COLORS["fog"]
+
+    def mask(self) -> pygame.Surface:
+        if self._mask is None:
+            self._mask = fog_image(self.state, self.player)
+        return self._mask
+
+    def patch(self, coords: Collection[Coord]) -> None:
+        if self._mask is not None and coords:
+            for coord in coords:
+                self._mask.set_at(coord, self._color(coord))
+            self._scaled = None
+
+    def blit(
+        self,
+        surface: pygame.Surface,
+        area: pygame.Rect,
+        offset: tuple[int, int] = (0, 0),
+    ) -> None:
+        if area.width <= 0 or area.height <= 0:
+            return
+        ts = config.TILE_SIZE
+        key = (tuple(area), ts)
+        if self._scaled is None or self._scaled[0] != key:
+            scaled = scale_area(self.mask(), area, ts)
+            scaled.set_colorkey(FOG_KEY)
+            self._scaled = (key, scaled)
+        surface.blit(
+            self._scaled[1], (area.x * ts - offset[0], area.y * ts - offset[1])
+        )
+
+    def fill_tiles(
+        self,
+        surface: pygame.Surface,
+        coords: Collection[Coord],
+        offset: tuple[int, int] = (0, 0),
+    ) -> None:
+        """Cover the unrevealed tiles among ``coords``."""
+        ts = config.TILE_SIZE
+        ox, oy = offset
+        for x, y in coords:
+            if not self.state.tile_at((x, y)).is_revealed(self.player):
+                surface.fill(COLORS["fog"], (x * ts - ox, y * ts - oy, ts, ts))
+
+
+def draw_markers(
+    state: State,
+    surface: pygame.Surface,
+    index: SpatialIndex,
+    area: pygame.Rect,
+    offset: tuple[int, int] = (0, 0),
+) -> None:
+    """Draw cities and aggregated unit markers for the zoomed-out overview.
+
+    Units are grouped into cells roughly ``LOD_MARKER_PX`` pixels wide and
+    each cell gets one marker in the colour of the player with most units
+    there.
+    """
+
+    ts = config.TILE_SIZE
+    ox, oy = offset
+    cell = max(1, -(-config.LOD_MARKER_PX // ts))
+    for coord, cid in index.cities.items():
+        if area.collidepoint(coord):
+            owner = state.cities[cid].owner
+            size = max(ts, config.LOD_MARKER_PX)
+            rect = pygame.Rect(0, 0, size, size)
+            rect.center = (coord[0] * ts - ox + ts // 2, coord[1] * ts - oy + ts // 2)
+            surface.fill(COLORS["city"], rect)
+            pygame.draw.rect(
+                surface, PLAYER_COLORS[owner % len(PLAYER_COLORS)], rect, 1
+            )
+    cells: dict[Coord, dict[int, int]] = {}
+    for coord, ids in index.units.items():
+        if not area.collidepoint(coord):
+            continue
+        counts = cells.setdefault((coord[0] // cell, coord[1] // cell), {})
+        for uid in ids:
+            owner = state.units[uid].owner
+            counts[owner] = counts.get(owner, 0) + 1
+    marker = max(2, config.LOD_MARKER_PX - 2)
+    for (cx, cy), counts in cells.items():
+        owner = max(counts, key=lambda p: (counts[p], -p))
+        rect = pygame.Rect(0, 0, marker, marker)
+        half = cell * ts // 2
+        rect.center = (cx * cell * ts - ox + half, cy * cell * ts - oy + half)
+        surface.fill(PLAYER_COLORS[owner % len(PLAYER_COLORS)], rect)
+
+
+class MapRenderer:
+    """Redraw only the parts of the map that changed since the last frame.
+
+    Dirty tiles come from the state's change tracking (tiles, units and
+    cities touched by rules mutations) and from selection changes, and only
+    tiles inside the camera view are drawn.  The terrain layers are patched
+    only for :class:`~game.core.events.ImprovementBuilt` events, since
+    nothing else changes what they show.  :meth:`render` returns the
+    screen rectangles it repainted so the caller can push just those with
+    ``pygame.display.update``.
+
+    The map is shown as ``player`` sees it, by default the human player; it
+    does not follow the turn order.
+    """
+
+    def __init__(
+        self, state: State, camera: Camera, player: int = config.HUMAN_PLAYER
+    ) -> None:
+        self.state = state
+        self.camera = camera
+        self.player = player
+        self.changes = state.track()
+        self.index = SpatialIndex(state)
+        self._selection: list[Coord] = []
+        self._view: tuple | None = None
+        self._extra: set[Coord] = set()
+        self.terrain = TerrainLayer(state)
+        self.overview = OverviewLayer(state)
+        self.fog: dict[int, FogMask] = {}
+        self.borders = BorderCache()
+        self._built: set[Coord] = set()
+        state.bus.subscribe(ImprovementBuilt, self._on_improvement)
+
+    def _on_improvement(self, event: ImprovementBuilt) -> None:
+        self._built.add(event.coord)
+
+    def invalidate(self) -> None:
+        """Force a full repaint on the next frame."""
+        self._view = None
+
+    def invalidate_rect(self, rect: pygame.Rect) -> None:
+        """Repaint the tiles under the screen-space ``rect`` next frame."""
+        ts = config.TILE_SIZE
+        ox, oy = self.camera.offset
+        x0, y0 = max(0, (rect.left + ox) // ts), max(0, (rect.top + oy) // ts)
+        x1 = min(self.state.width, -(-(rect.right + ox) // ts))
+        y1 = min(self.state.height, -(-(rect.bottom + oy) // ts))
+        self._extra.update((x, y) for x in range(x0, x1) for y in range(y0, y1))
+
+    def close(self) -> None:
+        self.state.untrack(self.changes)
+        self.state.bus.unsubscribe(ImprovementBuilt, self._on_improvement)
+
+    def _selection_coords(
+        self,
+        selected_unit_id: int | None,
+        selected_city_id: int | None,
+        selected_tile: Coord | None,
+    ) -> list[Coord]:
+        coords = []
+        if selected_tile is not None:
+            coords.append(selected_tile)
+        if selected_unit_id is not None and selected_unit_id in self.state.units:
+            coords.append(self.state.units[selected_unit_id].pos)
+        if selected_city_id is not None and selected_city_id in self.state.cities:
+            coords.append(self.state.cities[selected_city_id].pos)
+        return coords
+
+    def _dirty_tiles(self, selection: list[Coord]) -> set[Coord]:
+        state = self.state
+        dirty = set(self.changes.tiles)
+        dirty |= self._extra
+        for uid in self.changes.units:
+            old = self.index.unit_pos(uid)
+            if old is not None:
+                dirty.add(old)
+            unit = state.units.get(uid)
+            if unit is not None:
+                dirty.add(unit.pos)
+        for cid in self.changes.cities:
+            city = state.cities.get(cid)
+            if city is not None:
+                dirty.add(city.pos)
+                dirty |= city.claimed
+        if selection != self._selection:
+            dirty.update(self._selection)
+            dirty.update(selection)
+        return dirty
+
+    def fog_mask(self) -> FogMask:
+        """Return the fog mask of the player the map is shown to."""
+        player = self.player
+        if player not in self.fog:
+            self.fog[player] = FogMask(self.state, player)
+        return self.fog[player]
+
+    def render(
+        self,
+        surface: pygame.Surface,
+        selected_unit_id: int | None = None,
+        selected_city_id: int | None = None,
+        selected_tile: Coord | None = None,
+    ) -> list[pygame.Rect]:
+        state = self.state
+        camera = self.camera
+        ts = config.TILE_SIZE
+        area = camera.visible_tiles()
+        selection = self._selection_coords(
+            selected_unit_id, selected_city_id, selected_tile
+        )
+        view = (
+            ts,
+            self.player,
+            surface,
+            camera.x,
+            camera.y,
+            tuple(camera.view),
+        )
+        full = self._view != view
+        lod = ts < config.LOD_TILE_SIZE
+        dirty: set[Coord] = set()
+        if lod and not full:
+            # The overview is cheap to redraw as a whole and its markers span
+            # several tiles, so any change repaints the view.
+            full = bool(self.changes or self._extra) or selection != self._selection
+        elif not full:
+            dirty = {c for c in self._dirty_tiles(selection) if area.collidepoint(c)}
+            full = len(dirty) > FULL_REDRAW_RATIO * area.width * area.height
+        self.index.update(self.changes)
+        for cid in self.changes.cities:
+            self.borders.invalidate(cid)
+        if self._built:
+            self.terrain.patch(self._built)
+            self.overview.patch(self._built)
+            self._built.clear()
+        for mask in self.fog.values():
+            mask.patch(self.changes.tiles)
+        self.changes.clear()
+        self._extra.clear()
+        self._view = view
+        self._selection = selection
+        if not full and not dirty:
+            return []
+        if lod:
+            self._render_overview(surface, area, selection)
+            return [camera.view.copy()]
+        if full:
+            dirty = {
+                (x, y)
+                for x in range(area.left, area.right)
+                for y in range(area.top, area.bottom)
+            }
+        offset = camera.offset
+        clip = surface.get_clip()
+        surface.set_clip(camera.view)
+        if full:
+            surface.fill(COLORS["fog"], camera.view)
+            self.terrain.blit(surface, area, offset)
+            self.fog_mask().blit(surface, area, offset)
+        else:
+            self.terrain.blit_tiles(surface, dirty, offset)
+            self.fog_mask().fill_tiles(surface, dirty, offset)
+        draw_entities(
+            state,
+            surface,
+            selected_unit_id,
+            selected_city_id,
+            selected_tile,
+            only=dirty,
+            offset=offset,
+            index=self.index,
+            borders=self.borders,
+            player=self.player,
+        )
+        surface.set_clip(clip)
+        if full:
+            return [camera.view.copy()]
+        return [camera.tile_rect(c).clip(camera.view) for c in dirty]
+
+    def _render_overview(
+        self, surface: pygame.Surface, area: pygame.Rect, selection: list[Coord]
+    ) -> None:
+        state = self.state
+        camera = self.camera
+        offset = camera.offset
+        clip = surface.get_clip()
+        surface.set_clip(camera.view)
+        surface.fill(COLORS["fog"], camera.view)
+        self.overview.blit(surface, area, offset)
+        self.fog_mask().blit(surface, area, offset)
+        draw_markers(state, surface, self.index, area, offset)
+        for coord in selection:
+            rect = camera.tile_rect(coord).inflate(4, 4)
+            pygame.draw.rect(surface, SELECT_COLOR, rect, 2)
+        surface.set_clip(clip)
@@ -0,0 +1,161 @@
+"""Sprite atlas for map tiles, improvements, units and cities."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Mapping
+
+import pygame
+
+from .. import config
+
+Color = tuple[int, int, int]
+
+# Side length of the source sprites; they are scaled down per tile size.
+SPRITE_BASE = 64
+# Number of tile sizes whose scaled sprites are kept.
+SPRITE_CACHE_SIZES = 8
+OUTLINE = (20, 20, 20)
+
+
+def _shade(color: Color, amount: int) -> Color:
+    return tuple(max(0, min(255, c + amount)) for c in color)  # type: ignore
+
+
+def _terrain(kind: str, color: Color) -> pygame.Surface:
+    b = SPRITE_BASE
+    image = pygame.Surface((b, b))
+    image.fill(color)
+    dark = _shade(color, -40)
+    if kind == "forest":
+        for cx, cy in ((16, 20), (44, 16), (28, 44), (52, 46)):
+            pygame.draw.circle(image, dark, (cx, cy), 9)
+    elif kind == "hill":
+        pygame.draw.polygon(image, dark, [(8, 52), (30, 16), (52, 52)])
+        pygame.draw.polygon(image, _shade(color, 25), [(30, 16), (38, 30), (30, 30)])
+    elif kind == "water":
+        light = _shade(color, 40)
+        for y in (18, 42):
+            pygame.draw.arc(image, light, (10, y - 6, 20, 12), 0, 3.1, 3)
+            pygame.draw.arc(image, light, (34, y - 6, 20, 12), 0, 3.1, 3)
+    elif kind == "plains":
+        for cx, cy in ((14, 14), (46, 22), (22, 46), (50, 52)):
+            pygame.draw.line(image, dark, (cx, cy), (cx + 2, cy - 6), 2)
+    return image
+
+
+def _improvement(kind: str, color: Color) -> pygame.Surface:
+    b = SPRITE_BASE
+    image = pygame.Surface((b, b), pygame.SRCALPHA)
+    if kind == "road":
+        w = b // 16
+        image.fill(color, (0, (b - w) // 2, b, w))
+        image.fill(color, ((b - w) // 2, 0, w, b))
+    else:
+        inner = pygame.Rect(b // 4, b // 4, b // 2, b // 2)
+        image.fill(color, inner)
+        pygame.draw.rect(image, _shade(color, -50), inner, 2)
+    return image
+
+
+def _unit(kind: str, color: Color) -> pygame.Surface:
+    b = SPRITE_BASE
+    image = pygame.Surface((b, b), pygame.SRCALPHA)
+    box = pygame.Rect(b // 4, b // 4, b // 2, b // 2)
+    if kind == "scout":
+        pygame.draw.ellipse(image, color, box)
+        pygame.draw.ellipse(image, OUTLINE, box, 3)
+    elif kind == "settler":
+        points = [box.midtop, box.bottomright, box.bottomleft]
+        pygame.draw.polygon(image, color, points)
+        pygame.draw.polygon(image, OUTLINE, points, 3)
+    else:
+        image.fill(color, box)
+        pygame.draw.rect(image, OUTLINE, box, 3)
+    return image
+
+
+def _city(color: Color) -> pygame.Surface:
+    b = SPRITE_BASE
+    image = pygame.Surface((b, b))
+    image.fill(color)
+    pygame.draw.rect(image, _shade(color, -70), image.get_rect(), 4)
+    for x in range(8, b - 8, 16):
+        image.fill(_shade(color, -35), (x, 6, 8, 6))
+    return image
+
+
+def _flat(color: Color) -> pygame.Surface:
+    image = pygame.Surface((SPRITE_BASE, SPRITE_BASE))
+    image.fill(color)
+    return image
+
+
+class SpriteAtlas:
+    """Source sprites plus copies pre-scaled to each tile size in use.
+
+    A sprite is loaded from ``<sprite_dir>/<name>.png`` when that file exists
+    and generated from the palette otherwise.  Sources are built once; the
+    scaled sets for the ``SPRITE_CACHE_SIZES`` most recent tile sizes are
+    kept, so drawing is a plain blit with no per-frame scaling.
+    """
+
+    def __init__(
+        self,
+        colors: Mapping[str, Color],
+        infra_colors: Mapping[str, Color],
+        sprite_dir: str | Path = config.SPRITE_DIR,
+        max_sizes: int = SPRITE_CACHE_SIZES,
+    ) -> None:
+        self.sprite_dir = Path(sprite_dir)
+        self.max_sizes = max_sizes
+        self._makers: dict[str, Callable[[], pygame.Surface]] = {}
+        for kind in config.MOVE_COST:
+            self._makers[kind] = lambda k=kind: _terrain(k, colors[k])
+        for kind in config.INFRASTRUCTURE:
+            self._makers[kind] = lambda k=kind: _improvement(k, infra_colors[k])
+        for kind in config.UNIT_STATS:
+            self._makers[kind] = lambda k=kind: _unit(k, colors[k])
+        self._makers["city"] = lambda: _city(colors["city"])
+        self._makers["fog"] = lambda: _flat(colors["fog"])
+        self._sources: dict[str, pygame.Surface] = {}
+        self._scaled: OrderedDict[int, dict[str, pygame.Surface]] = OrderedDict()
+
+    def source(self, name: str) -> pygame.Surface:
+        image = self._sources.get(name)
+        if image is None:
+            path = self.sprite_dir / f"{name}.png"
+            if path.is_file():
+                image = pygame.image.load(path)
+            else:
+                image = self._makers[name]()
+            if pygame.display.get_surface() is not None:
+                if image.get_flags() & pygame.SRCALPHA:
+                    image = image.convert_alpha()
+                else:
+                    image = image.convert()
+            self._sources[name] = image
+        return image
+
+    def sprites(self, tile_size: int | None = None) -> dict[str, pygame.Surface]:
+        """Return every sprite scaled to ``tile_size`` (default: current)."""
+        ts = config.TILE_SIZE if tile_size is None else tile_size
+        scaled = self._scaled.get(ts)
+        if scaled is not None:
+            self._scaled.move_to_end(ts)
+            return scaled
+        scaled = {}
+        for name in self._makers:
+            image = self.source(name)
+            if image.get_size() != (ts, ts):
+                image = pygame.transform.smoothscale(image, (ts, ts))
+            scaled[name] = image
+        self._scaled[ts] = scaled
+        if len(self._scaled) > self.max_sizes:
+            self._scaled.popitem(last=False)
+        return scaled
+
+    def clear(self) -> None:
+        self._sources.clear()
+        self._scaled.clear()
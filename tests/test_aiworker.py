@@ -0,0 +1,64 @@
+import threading
+import time
+from random import Random
+
+from game.core import ai, mapgen, saveio
+from game.core.aiworker import AIWorker
+from game.core.models import Player, State
+
+
+def make_state() -> State:
+    tiles, spawns = mapgen.generate_map(8, 8, seed=2)
+    units = {u.id: u for u in mapgen.initial_units(spawns)}
+    players = {0: Player(0), 1: Player(1)}
+    state = State(8, 8, tiles, units, {}, players)
+    state.next_unit_id = max(units) + 1
+    state.current_player = 1
+    return state
+
+
+def test_ai_worker_plans_on_a_copy_and_returns_commands():
+    state = make_state()
+    before = {u.id: u.pos for u in state.units.values()}
+    worker = AIWorker()
+    assert worker.start(state, seed=0)
+    assert not worker.start(state, seed=0)
+    commands = None
+    while commands is None:
+        time.sleep(0.001)
+        commands = worker.poll()
+    worker.close()
+    assert worker.last_error is None
+    assert commands[-1] == ai.END_TURN
+    assert worker.progress == 1.0
+    assert {u.id: u.pos for u in state.units.values()} == before
+
+    rng = Random(0)
+    for command in commands:
+        ai.apply_command(state, command, rng)
+    assert state.current_player == 0
+    assert {u.id: u.pos for u in state.units.values()} != before
+
+
+def test_ai_worker_cancel_abandons_the_turn():
+    state = make_state()
+    worker = AIWorker()
+    release = threading.Event()
+    # Hold the worker so the planning job is still queued when cancelled.
+    worker._executor.submit(release.wait)
+    worker.start(state, seed=0)
+    worker.cancel()
+    release.set()
+    assert not worker.busy
+    assert worker.poll() is None
+    worker.close()
+
+
+def test_replaying_a_plan_reproduces_it_whatever_the_rng():
+    state = make_state()
+    planned = state.clone()
+    commands = ai.plan_turn(planned, Random(0))
+    assert any(c.kind == "found_city" for c in commands)
+    rng = Random(99)
+    assert all(ai.apply_command(state, c, rng) for c in commands)
+    assert saveio.state_to_dict(state) == saveio.state_to_dict(planned)
@@ -0,0 +1,87 @@
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from game import config
+from game.core import mapgen, rules, saveio
+from game.core.autosave import AutosaveService
+from game.core.models import Player, State
+
+
+def make_state() -> State:
+    tiles, spawns = mapgen.generate_map(5, 5, seed=3)
+    units = {u.id: u for u in mapgen.initial_units(spawns)}
+    players = {0: Player(0), 1: Player(1)}
+    state = State(5, 5, tiles, units, {}, players)
+    state.next_unit_id = max(units) + 1
+    return state
+
+
+def test_autosave_runs_on_worker_with_one_job_in_flight():
+    state = make_state()
+    release = threading.Event()
+    with tempfile.TemporaryDirectory() as td:
+        path = f"{td}/auto.json.gz"
+        saver = saveio.DeltaAutosaver(path)
+        service = AutosaveService(saver)
+        # Hold the worker so the second request has to wait for it.
+        service._executor.submit(release.wait)
+        assert service.request(state)
+        assert service.busy
+        rules.end_turn(state)
+        assert not service.request(state)
+        assert service.pending
+        release.set()
+        while service.busy:
+            time.sleep(0.001)
+        assert service.poll(state)
+        service.close()
+        assert service.last_error is None
+        with open(path, "rb") as fh:
+            assert fh.read(2) == saveio.GZIP_MAGIC
+        loaded = saveio.load_game(path)
+    assert saveio.state_to_dict(loaded) == saveio.state_to_dict(state)
+
+
+def test_failed_autosave_is_retried_as_full_save():
+    state = make_state()
+    with tempfile.TemporaryDirectory() as td:
+        blocker = Path(td) / "saves"
+        blocker.write_text("not a directory")
+        path = blocker / "auto.json"
+        service = AutosaveService(saveio.DeltaAutosaver(path), retry_delay=0)
+        assert service.request(state)
+        while service.busy:
+            time.sleep(0.001)
+        blocker.unlink()
+        rules.end_turn(state)
+        # Collecting the failure starts the retry without a new request.
+        assert service.poll(state)
+        assert isinstance(service.last_error, OSError)
+        service.close()
+        assert service.last_error is None
+        assert service.saver.deltas_written == 0
+        assert saveio.load_game(path).turn == state.turn
+
+
+def test_autosaving_a_mapped_game_keeps_its_tiles_lazy():
+    state = make_state()
+    with tempfile.TemporaryDirectory() as td:
+        saveio.save_game(state, f"{td}/game.sav")
+        loaded = saveio.load_game(f"{td}/game.sav")
+        path = Path(td) / config.AUTOSAVE_NAME
+        service = AutosaveService(saveio.DeltaAutosaver(path, compact_every=1))
+        # A base, a delta, then a compaction.
+        for turn in range(3):
+            if turn:
+                rules.end_turn(loaded)
+            assert service.request(loaded)
+            while service.busy:
+                time.sleep(0.001)
+        service.close()
+        assert service.last_error is None
+        assert service.saver.deltas_written == 0
+        assert loaded.tiles.materialized == 0
+        autosaved = saveio.load_game(path)
+        assert saveio.state_to_dict(autosaved) == saveio.state_to_dict(loaded)
@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from game import bench, config
+
+
+def test_bench_reports_layers_and_dumps_frames(tmp_path: Path) -> None:
+    old_tile_size = config.TILE_SIZE
+    out = tmp_path / "report.txt"
+    bench.main(
+        [
+            "--map",
+            "40x30",
+            "--window",
+            "640x480",
+            "--units",
+            "20",
+            "--cities",
+            "3",
+            "--frames",
+            "4",
+            "--png",
+            str(tmp_path / "frames"),
+            "--png-every",
+            "2",
+            "--output",
+            str(out),
+        ]
+    )
+    config.set_tile_size(old_tile_size)
+    lines = out.read_text().splitlines()
+    assert lines[0].startswith("map 40x30  units 20  cities 3")
+    assert [line.split()[0] for line in lines[2:]] == list(bench.LAYERS)
+    assert sorted(p.name for p in (tmp_path / "frames").iterdir()) == [
+        "frame_00000.png",
+        "frame_00002.png",
+    ]
+
+
+def test_synthetic_state_places_entities_on_land() -> None:
+    state = bench.synthetic_state(30, 20, units=15, cities=4, players=3, seed=2)
+    assert len(state.units) == 15 and len(state.cities) == 4
+    assert {u.owner for u in state.units.values()} == {0, 1, 2}
+    for unit in state.units.values():
+        assert state.tile_at(unit.pos).kind != "water"
+
+
+def test_search_bench_reports_depth_per_position(tmp_path: Path) -> None:
+    out = tmp_path / "search.txt"
+    bench.main(["--ai-budget", "20", "--ai-positions", "2", "--output", str(out)])
+    lines = out.read_text().splitlines()
+    assert lines[0] == "search budget 20 ms  positions 2"
+    assert [line.split()[0] for line in lines[2:]] == ["1", "2"]
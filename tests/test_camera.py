@@ -0,0 +1,37 @@
+import pygame
+
+from game import config
+from game.ui.camera import Camera
+
+
+def test_camera_transforms_and_clamps() -> None:
+    old_tile_size = config.TILE_SIZE
+    config.set_tile_size(10)
+    camera = Camera((100, 50), pygame.Rect(0, 0, 200, 100))
+    assert camera.screen_to_tile((15, 25)) == (1, 2)
+
+    assert camera.pan(55, 5)
+    assert camera.screen_to_tile((15, 25)) == (7, 3)
+    assert camera.tile_rect((7, 3)) == pygame.Rect(15, 25, 10, 10)
+    assert camera.visible_tiles() == pygame.Rect(5, 0, 21, 11)
+
+    camera.pan(10_000, 10_000)
+    assert (camera.x, camera.y) == (800, 400)
+    assert camera.screen_to_tile((250, 10)) is None
+    config.set_tile_size(old_tile_size)
+
+
+def test_zoom_keeps_anchor_tile_under_cursor() -> None:
+    old_tile_size = config.TILE_SIZE
+    config.set_tile_size(16)
+    camera = Camera((100, 100), pygame.Rect(0, 0, 200, 100))
+    camera.pan(320, 160)
+    anchor = (50, 40)
+    before = camera.screen_to_tile(anchor)
+    assert camera.zoom(1, anchor)
+    assert config.TILE_SIZE == 24
+    assert camera.screen_to_tile(anchor) == before
+    assert camera.zoom(-2, anchor)
+    assert config.TILE_SIZE == 12
+    assert camera.screen_to_tile(anchor) == before
+    config.set_tile_size(old_tile_size)
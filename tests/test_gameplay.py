@@ -0,0 +1,39 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from game import config
+from game.core import mapgen, rules
+from game.core.models import Player, State
+from game.scenes.gameplay import Gameplay
+
+
+def make_state() -> State:
+    tiles, spawns = mapgen.generate_map(12, 12, seed=4, players=3)
+    units = {u.id: u for u in mapgen.initial_units(spawns)}
+    players = {pid: Player(pid) for pid in range(3)}
+    state = State(12, 12, tiles, units, {}, players)
+    state.next_unit_id = max(units) + 1
+    return state
+
+
+def test_game_stops_when_the_human_is_eliminated() -> None:
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    state = make_state()
+    game = Gameplay(state)
+    game._check_outcome()
+    assert game.outcome is None and game._playing
+    for unit in list(state.units.values()):
+        if unit.owner == config.HUMAN_PLAYER:
+            rules.remove_unit(state, unit.id)
+    # Two AI players are left, so nobody has won yet.
+    assert rules.check_win(state) is None
+    game._check_outcome()
+    assert game.outcome == "You lost"
+    assert not game._playing and game.hud.message.visible
+    game.ai.close()
+    game.autosave.close()
+    pygame.quit()
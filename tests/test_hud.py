@@ -4,6 +4,7 @@ os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
 
 import pygame
 
+from game.core import rules
 from game.core.models import Player, State, Tile
 from game.ui.hud import HUD
 
@@ -30,3 +31,39 @@ def test_hud_switches_resource_display_with_current_player() -> None:
     hud.update(0.0, state)
     assert "F:1 P:2" in hud.info.text
     pygame.quit()
+
+
+def test_watched_hud_refreshes_info_only_on_events() -> None:
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    hud = HUD(pygame.Rect(0, 0, 640, 480))
+    state = make_state()
+    hud.watch(state)
+    assert hud.update(0.0, state)
+    assert "Turn 1 Player 0 F:10 P:5" in hud.info.text
+
+    state.players[0].food = 99
+    assert not hud.update(0.0, state)
+    assert "F:10" in hud.info.text
+
+    rules.end_turn(state)
+    assert hud.update(0.0, state)
+    assert "Turn 2 Player 1 F:1 P:2" in hud.info.text
+    hud.unwatch()
+    pygame.quit()
+
+
+def test_hud_resize_moves_widgets_only_when_size_changes() -> None:
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    hud = HUD(pygame.Rect(0, 440, 640, 40))
+    hud.update(0.0, make_state())
+    hud.resize((640, 480))
+    assert not hud._dirty
+
+    hud.resize((800, 600))
+    assert hud.rect == pygame.Rect(0, 560, 800, 40)
+    assert hud.info.relative_rect.topleft == (800 - 310, 5)
+    assert hud.minimap_box.bottom <= hud.rect.bottom
+    assert hud.update(0.0, make_state())
+    pygame.quit()
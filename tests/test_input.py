@@ -0,0 +1,79 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from random import Random
+
+import pygame
+
+from game import config
+from game.core import mapgen, rules
+from game.core.models import Player, State
+from game.ui.camera import Camera
+from game.ui.hud import HUD
+from game.ui.input import InputHandler
+
+
+def make_state() -> State:
+    tiles, spawns = mapgen.generate_map(8, 6, seed=1)
+    units = {u.id: u for u in mapgen.initial_units(spawns)}
+    players = {0: Player(0), 1: Player(1)}
+    state = State(8, 6, tiles, units, {}, players)
+    state.next_unit_id = max(units) + 1
+    return state
+
+
+def motion(pos: tuple[int, int]) -> pygame.event.Event:
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0,) * 3)
+
+
+def test_hover_is_coalesced_and_memoized_per_tile() -> None:
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    old_tile_size = config.TILE_SIZE
+    config.set_tile_size(32)
+    state = make_state()
+    hud = HUD(pygame.Rect(0, 416, 640, 64))
+    handler = InputHandler(hud, Camera((8, 6), pygame.Rect(0, 0, 640, 416)))
+    handler.watch(state)
+    calls = []
+    original = state.units_at
+    state.units_at = lambda coord: calls.append(coord) or original(coord)
+
+    rng = Random(0)
+    for x in range(0, 100, 5):
+        handler.handle_event(motion((x, 40)), state, rng)
+    handler.update_hover(state)
+    assert calls == [(2, 1)]
+    assert hud.hover_info.visible
+
+    handler.handle_event(motion((40, 40)), state, rng)
+    handler.update_hover(state)
+    handler.handle_event(motion((100, 40)), state, rng)
+    handler.update_hover(state)
+    assert calls == [(2, 1), (1, 1), (3, 1)]
+
+    unit = next(u for u in state.units.values() if u.owner == 0)
+    unit.moves_left = 5
+    dest = next(
+        (unit.pos[0] + dx, unit.pos[1] + dy)
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+        if rules.in_bounds(state, (unit.pos[0] + dx, unit.pos[1] + dy))
+        and state.tile_at((unit.pos[0] + dx, unit.pos[1] + dy)).kind != "water"
+        and not state.units_at((unit.pos[0] + dx, unit.pos[1] + dy))
+    )
+    target = (dest[0] * 32 + 1, dest[1] * 32 + 1)
+    handler.handle_event(motion(target), state, rng)
+    handler.update_hover(state)
+    before = hud.hover_info.text
+    rules.move_unit(state, unit.id, dest)
+    handler.update_hover(state)
+    assert hud.hover_info.text != before
+    assert hud.hover_info.text == f"{unit.kind} (Player 0)"
+
+    handler.handle_event(motion((10, 450)), state, rng)
+    handler.update_hover(state)
+    assert not hud.hover_info.visible
+    handler.unwatch()
+    config.set_tile_size(old_tile_size)
+    pygame.quit()
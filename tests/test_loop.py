@@ -0,0 +1,26 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from game.scenes.loop import FramePacer
+
+
+def test_frame_pacer_blocks_until_event_or_timeout() -> None:
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    pygame.event.clear()
+    pacer = FramePacer(fps=60, idle_ms=20)
+    time_delta, events = pacer.next(busy=False)
+    assert events == []
+    assert time_delta >= 0.015
+
+    pygame.event.post(pygame.event.Event(pygame.USEREVENT, code=1))
+    _, events = pacer.next(busy=False)
+    assert [e.type for e in events] == [pygame.USEREVENT]
+
+    pygame.event.post(pygame.event.Event(pygame.USEREVENT, code=2))
+    _, events = pacer.next(busy=True)
+    assert [e.code for e in events] == [2]
+    pygame.quit()
@@ -0,0 +1,36 @@
+import tempfile
+
+from game.core import mapcache, mapgen, rules
+
+
+def test_cached_map_matches_generator():
+    with tempfile.TemporaryDirectory() as td:
+        tiles, spawns = mapcache.load_or_generate(7, 5, 4, td)
+        assert mapcache.cache_path(td, 7, 5, 4).exists()
+        cached_tiles, cached_spawns = mapcache.load_or_generate(7, 5, 4, td)
+    expected_tiles, expected_spawns = mapgen.generate_map(7, 5, seed=4)
+    assert tiles == cached_tiles == expected_tiles
+    assert spawns == cached_spawns == expected_spawns
+
+
+def test_map_pool_prewarms_next_seeds():
+    with tempfile.TemporaryDirectory() as td:
+        pool = mapcache.MapPool((6, 4), td, first_seed=10, ahead=2)
+        seed, tiles, _ = pool.take()
+        assert seed == 10 and len(tiles) == 24
+        assert sorted(pool._warming) == [11, 12]
+        for future in pool._warming.values():
+            future.result()
+        pool.close()
+        assert mapcache.cache_path(td, 6, 4, 11).exists()
+        assert mapcache.cache_path(td, 6, 4, 12).exists()
+
+
+def test_spawns_spread_out_per_player_count():
+    with tempfile.TemporaryDirectory() as td:
+        _, spawns = mapcache.load_or_generate(20, 12, 1, td, players=6)
+        assert mapcache.cache_path(td, 20, 12, 1, players=6).exists()
+        assert not mapcache.cache_path(td, 20, 12, 1).exists()
+    assert len(set(spawns)) == 6
+    assert spawns[:2] == [(1, 1), (18, 10)]
+    assert min(rules.distance(a, b) for a in spawns for b in spawns if a != b) >= 6
@@ -0,0 +1,83 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from game.core import mapgen, rules
+from game.core.models import Player, State
+from game.core.spatial import SpatialIndex
+from game.ui.camera import Camera
+from game.ui.minimap import VIEW_COLOR, Minimap
+
+
+def make_state() -> State:
+    tiles, spawns = mapgen.generate_map(40, 20, seed=3)
+    units = {u.id: u for u in mapgen.initial_units(spawns)}
+    players = {0: Player(0), 1: Player(1)}
+    state = State(40, 20, tiles, units, {}, players)
+    state.next_unit_id = max(units) + 1
+    for unit in units.values():
+        rules.reveal(state, unit)
+    return state
+
+
+def test_minimap_patches_views_from_changes() -> None:
+    pygame.init()
+    state = make_state()
+    index = SpatialIndex(state)
+    camera = Camera((40, 20), pygame.Rect(0, 0, 320, 160))
+    minimap = Minimap(state, index, camera, pygame.Rect(0, 0, 20, 20))
+    assert minimap.rect.size == (20, 10)
+    image = minimap.image(0)
+
+    unit = next(u for u in state.units.values() if u.owner == 0)
+    unit.pos = (20, 10)
+    state.mark_unit(unit.id)
+    rules.reveal(state, unit)
+    index.rebuild()
+    minimap.update()
+    assert minimap.image(0) is image
+
+    fresh = Minimap(state, index, camera, pygame.Rect(0, 0, 20, 20))
+    expected = pygame.image.tobytes(fresh.image(0), "RGB")
+    assert pygame.image.tobytes(image, "RGB") == expected
+    surface = pygame.Surface((40, 40))
+    assert minimap.draw(surface) == minimap.rect.inflate(2, 2)
+    assert minimap.tile_at(minimap.rect.topleft) == (0, 0)
+    assert minimap.tile_at((minimap.rect.right - 1, minimap.rect.bottom - 1)) == (
+        38,
+        18,
+    )
+    minimap.close()
+    fresh.close()
+    pygame.quit()
+
+
+def test_minimap_scrolling_only_moves_the_view_rectangle() -> None:
+    pygame.init()
+    state = make_state()
+    index = SpatialIndex(state)
+    camera = Camera((40, 20), pygame.Rect(0, 0, 80, 80))
+    minimap = Minimap(state, index, camera, pygame.Rect(0, 0, 40, 20))
+    surface = pygame.Surface((40, 20))
+    minimap.update()
+    minimap.draw(surface)
+    scaled, frame = minimap._scaled, minimap._frame
+    view = minimap.view_rect()
+
+    camera.center_on((30, 10))
+    minimap.update()
+    minimap.draw(surface)
+    assert (minimap._scaled, minimap._frame) == (scaled, frame)
+    assert minimap.view_rect() != view
+    assert surface.get_at(minimap.view_rect().topleft)[:3] == VIEW_COLOR
+
+    assert state.tile_for_update((39, 19)).reveal(0)
+    state.mark_tile((39, 19))
+    minimap.update()
+    minimap.draw(surface)
+    assert minimap._scaled is scaled and minimap._frame is not frame
+    assert scaled.get_at((39, 19)) == minimap.image(0).get_at((39, 19))
+    minimap.close()
+    pygame.quit()
@@ -0,0 +1,39 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import time
+
+import pygame
+
+from game.ui.perf import FrameTimer, PerfOverlay, hit_rate
+
+
+def test_frame_timer_keeps_a_ring_buffer_of_section_laps() -> None:
+    timer = FrameTimer(("events", "render"), history=3)
+    for _ in range(5):
+        timer.start()
+        timer.lap("events")
+        time.sleep(0.002)
+        timer.lap("render")
+        timer.end()
+    assert len(timer.frames) == 3
+    averages = timer.averages()
+    assert averages["render"] >= 0.002 > averages["events"]
+    assert timer.worst() >= averages["render"]
+
+
+def test_perf_overlay_draws_graph_and_counters() -> None:
+    pygame.init()
+    timer = FrameTimer(("events", "render"))
+    timer.start()
+    timer.lap("events")
+    timer.end()
+    overlay = PerfOverlay((4, 4), width=200)
+    surface = pygame.Surface((400, 400))
+    rect = overlay.draw(surface, timer, {"text cache": hit_rate(3, 1)})
+    assert rect.topleft == (4, 4) and rect.width == 200
+    assert surface.get_at((5, 5))[:3] != (0, 0, 0)
+    assert hit_rate(3, 1) == "75% of 4"
+    assert hit_rate(0, 0) == "-"
+    pygame.quit()
@@ -0,0 +1,257 @@
+import os
+import tempfile
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from game import config
+from game.core import mapgen, rules, saveio
+from game.core.events import ImprovementBuilt
+from game.core.models import Player, State
+from game.ui.camera import Camera
+from game.ui.minimap import Minimap
+from game.ui.renderer import (
+    CHUNK_TILES,
+    COLORS,
+    EDGE_E,
+    EDGE_N,
+    EDGE_S,
+    EDGE_W,
+    INFRA_COLORS,
+    TEXT_CACHE,
+    MapRenderer,
+    TerrainLayer,
+    border_edges,
+    draw,
+    render_text,
+    surface_bytes,
+)
+from game.ui.sprites import SpriteAtlas
+
+
+def make_state() -> State:
+    tiles, spawns = mapgen.generate_map(8, 6, seed=1)
+    units = {u.id: u for u in mapgen.initial_units(spawns)}
+    players = {0: Player(0), 1: Player(1)}
+    state = State(8, 6, tiles, units, {}, players)
+    state.next_unit_id = max(units) + 1
+    for unit in units.values():
+        rules.reveal(state, unit)
+    return state
+
+
+def test_map_renderer_redraws_only_changed_tiles() -> None:
+    pygame.init()
+    old_tile_size = config.TILE_SIZE
+    config.set_tile_size(16)
+    state = make_state()
+    surface = pygame.Surface((8 * 16, 6 * 16))
+    renderer = MapRenderer(state, Camera((8, 6), surface.get_rect()))
+    assert renderer.render(surface) == [pygame.Rect(0, 0, 128, 96)]
+    assert renderer.render(surface) == []
+
+    chunk = renderer.terrain._chunks[(16, 0, 0)]
+    uid = next(u.id for u in state.units.values() if u.kind == "scout")
+    rules.move_unit(state, uid, (2, 1))
+    rects = renderer.render(surface)
+    assert renderer.terrain._chunks[(16, 0, 0)] is chunk
+    assert pygame.Rect(16, 16, 16, 16) in rects
+    assert pygame.Rect(32, 16, 16, 16) in rects
+    assert len(rects) < 8 * 6
+
+    expected = pygame.Surface(surface.get_size())
+    draw(state, expected)
+    assert pygame.image.tobytes(surface, "RGB") == pygame.image.tobytes(expected, "RGB")
+    config.set_tile_size(old_tile_size)
+    pygame.quit()
+
+
+def test_map_renderer_draws_only_the_camera_view() -> None:
+    pygame.init()
+    old_tile_size = config.TILE_SIZE
+    config.set_tile_size(16)
+    state = make_state()
+    surface = pygame.Surface((64, 48))
+    camera = Camera((8, 6), surface.get_rect())
+    camera.pan(64, 40)
+    renderer = MapRenderer(state, camera)
+    assert renderer.render(surface) == [pygame.Rect(0, 0, 64, 48)]
+
+    expected = pygame.Surface((128, 96))
+    draw(state, expected)
+    view = expected.subsurface(pygame.Rect(64, 40, 64, 48))
+    assert pygame.image.tobytes(surface, "RGB") == pygame.image.tobytes(view, "RGB")
+    config.set_tile_size(old_tile_size)
+    pygame.quit()
+
+
+def test_zoomed_out_view_uses_overview() -> None:
+    pygame.init()
+    old_tile_size = config.TILE_SIZE
+    config.set_tile_size(2)
+    state = make_state()
+    state.units.clear()
+    surface = pygame.Surface((16, 12))
+    renderer = MapRenderer(state, Camera((8, 6), surface.get_rect()))
+    renderer.render(surface)
+    assert 0 in renderer.fog and not renderer.terrain._chunks
+    for tile in state.tiles:
+        expected = COLORS[tile.kind] if tile.is_revealed(0) else COLORS["fog"]
+        assert surface.get_at((tile.x * 2 + 1, tile.y * 2 + 1))[:3] == expected
+    assert renderer.render(surface) == []
+    config.set_tile_size(old_tile_size)
+    pygame.quit()
+
+
+def test_terrain_chunks_are_kept_per_tile_size() -> None:
+    pygame.init()
+    old_tile_size = config.TILE_SIZE
+    config.set_tile_size(16)
+    state = make_state()
+    surface = pygame.Surface((128, 96))
+    renderer = MapRenderer(state, Camera((8, 6), surface.get_rect()))
+    renderer.render(surface)
+    chunk = renderer.terrain._chunks[(16, 0, 0)]
+
+    config.set_tile_size(24)
+    renderer.invalidate()
+    renderer.render(surface)
+    config.set_tile_size(16)
+    renderer.invalidate()
+    misses = renderer.terrain.misses
+    renderer.render(surface)
+    assert renderer.terrain.misses == misses
+    assert renderer.terrain._chunks[(16, 0, 0)] is chunk
+
+    # Revealing a tile does not change the terrain underneath the fog.
+    state.tile_for_update((7, 5)).reveal(1)
+    state.mark_tile((7, 5))
+    renderer.render(surface)
+    assert (24, 0, 0) in renderer.terrain._chunks
+    state.tile_for_update((0, 0)).improvements.add("road")
+    state.mark_tile((0, 0))
+    state.bus.publish(ImprovementBuilt((0, 0), "road"))
+    renderer.render(surface)
+    assert (24, 0, 0) not in renderer.terrain._chunks
+    config.set_tile_size(old_tile_size)
+    pygame.quit()
+
+
+def test_terrain_chunks_are_bounded_by_bytes() -> None:
+    pygame.init()
+    old_tile_size = config.TILE_SIZE
+    state = make_state()
+    one = surface_bytes(pygame.Surface((CHUNK_TILES * 16, CHUNK_TILES * 16)))
+    layer = TerrainLayer(state, max_bytes=one + one // 8)
+    for ts in (16, 8, 4, 2):
+        config.set_tile_size(ts)
+        layer.blit(pygame.Surface((8 * ts, 6 * ts)), pygame.Rect(0, 0, 8, 6))
+    # The 16 pixel chunk had to go to make room for the 8 pixel one.
+    assert [k[0] for k in layer._chunks] == [8, 4, 2]
+    assert layer.bytes == sum(surface_bytes(c) for c in layer._chunks.values())
+    assert layer.bytes <= layer.max_bytes
+    config.set_tile_size(64)
+    layer.blit(pygame.Surface((8, 8)), pygame.Rect(0, 0, 1, 1))
+    # A chunk larger than the budget is still kept while it is in use.
+    assert list(layer._chunks) == [(64, 0, 0)]
+    config.set_tile_size(old_tile_size)
+    pygame.quit()
+
+
+def test_rendering_a_mapped_save_materializes_only_the_view() -> None:
+    pygame.init()
+    old_tile_size = config.TILE_SIZE
+    config.set_tile_size(16)
+    tiles, spawns = mapgen.generate_map(128, 128, seed=1)
+    units = {u.id: u for u in mapgen.initial_units(spawns)}
+    state = State(128, 128, tiles, units, {}, {0: Player(0), 1: Player(1)})
+    for unit in units.values():
+        rules.reveal(state, unit)
+    with tempfile.TemporaryDirectory() as td:
+        saveio.save_game(state, f"{td}/big.sav")
+        loaded = saveio.load_game(f"{td}/big.sav")
+    surface = pygame.Surface((128, 96))
+    camera = Camera((128, 128), surface.get_rect())
+    renderer = MapRenderer(loaded, camera)
+    minimap = Minimap(loaded, renderer.index, camera, pygame.Rect(0, 0, 64, 64))
+    renderer.render(surface)
+    minimap.update()
+    minimap.draw(surface)
+    config.set_tile_size(2)
+    renderer.render(surface)
+    # The one terrain chunk in view plus the tiles units stand on.
+    assert loaded.tiles.materialized <= CHUNK_TILES**2 + len(units)
+    overview = renderer.overview.image()
+    fog = renderer.fog[0].mask()
+    for tile in state.tiles[::97]:
+        assert overview.get_at((tile.x, tile.y))[:3] == COLORS[tile.kind]
+        expected = minimap.image(0).get_at((tile.x, tile.y))[:3]
+        if tile.is_revealed(0):
+            assert expected == COLORS[tile.kind]
+        else:
+            assert fog.get_at((tile.x, tile.y))[:3] == expected == COLORS["fog"]
+    config.set_tile_size(old_tile_size)
+    pygame.quit()
+
+
+def test_text_cache_reuses_surfaces_until_font_size_changes() -> None:
+    pygame.init()
+    old_tile_size = config.TILE_SIZE
+    config.set_tile_size(32)
+    first = render_text("#3")
+    assert render_text("#3") is first
+    config.set_tile_size(48)
+    assert render_text("#3") is not first
+    assert len(TEXT_CACHE) == 1
+    config.set_tile_size(old_tile_size)
+    pygame.quit()
+
+
+def test_fog_follows_the_viewer_not_the_turn() -> None:
+    pygame.init()
+    old_tile_size = config.TILE_SIZE
+    config.set_tile_size(16)
+    state = make_state()
+    surface = pygame.Surface((8 * 16, 6 * 16))
+    renderer = MapRenderer(state, Camera((8, 6), surface.get_rect()))
+    renderer.render(surface)
+    mask = renderer.fog[0]
+    rules.end_turn(state)
+    rects = renderer.render(surface)
+    assert list(renderer.fog) == [0]
+    assert pygame.Rect(0, 0, 128, 96) not in rects
+    expected = pygame.Surface(surface.get_size())
+    draw(state, expected, player=0)
+    assert pygame.image.tobytes(surface, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+    renderer.player = 1
+    renderer.render(surface)
+    renderer.player = 0
+    renderer.render(surface)
+    assert renderer.fog[0] is mask and 1 in renderer.fog
+    config.set_tile_size(old_tile_size)
+    pygame.quit()
+
+
+def test_border_edges_skip_interior_sides() -> None:
+    claimed = {(0, 0), (1, 0), (0, 1), (1, 1), (2, 1)}
+    edges = border_edges(claimed)
+    assert edges[(0, 0)] == EDGE_N | EDGE_W
+    assert edges[(1, 0)] == EDGE_N | EDGE_E
+    assert edges[(1, 1)] == EDGE_S
+    assert edges[(2, 1)] == EDGE_N | EDGE_E | EDGE_S
+
+
+def test_sprite_atlas_scales_once_per_tile_size() -> None:
+    pygame.init()
+    atlas = SpriteAtlas(COLORS, INFRA_COLORS, sprite_dir="missing", max_sizes=2)
+    small = atlas.sprites(8)
+    assert small["soldier"].get_size() == (8, 8)
+    assert small["soldier"].get_at((0, 0)).a == 0
+    assert small["soldier"].get_at((4, 4))[:3] == COLORS["soldier"]
+    assert atlas.sprites(8) is small
+    atlas.sprites(16)
+    atlas.sprites(32)
+    assert atlas.sprites(8) is not small
+    pygame.quit()
@@ -3,8 +3,8 @@ from random import Random
 import pytest
 
 from game import config
-from game.core import mapgen, rules
-from game.core.models import Player, State
+from game.core import events, mapgen, rules
+from game.core.models import Census, Player, State, Unit
 
 
 def make_state() -> State:
@@ -23,7 +23,7 @@ def test_movement_cost_and_fog():
     rules.move_unit(state, uid, dest)
     assert state.units[uid].moves_left < config.UNIT_STATS["settler"]["moves"]
     tile = state.tile_at(dest)
-    assert state.current_player in tile.revealed_by
+    assert tile.is_revealed(state.current_player)
 
 
 def test_move_diagonally_and_block_teleport():
@@ -284,3 +284,80 @@ def test_city_focus_production():
     rules.end_turn(state, rng)
     player = state.players[0]
     assert (player.food, player.prod) == (0, 4)
+
+
+def test_rules_publish_typed_events():
+    state = make_state()
+    seen = []
+    for event_type in (
+        events.UnitMoved,
+        events.UnitRemoved,
+        events.UnitCreated,
+        events.TilesRevealed,
+        events.CityFounded,
+        events.ImprovementBuilt,
+        events.ResourcesChanged,
+        events.TurnEnded,
+    ):
+        state.bus.subscribe(event_type, seen.append)
+    uid = next(uid for uid, u in state.units.items() if u.kind == "settler")
+    state.units[uid].pos = (2, 2)
+    state.tile_at((2, 2)).kind = "plains"
+    rules.move_unit(state, uid, (2, 1))
+    assert seen[0] == events.UnitMoved(uid, 0, (2, 2), (2, 1))
+    city = rules.found_city(state, uid, Random(0))
+    assert events.UnitRemoved(uid, 0, (2, 1)) in seen
+    assert seen[-1] == events.CityFounded(city.id, 0, (2, 1))
+    state.players[0].prod = 10
+    unit = rules.buy_unit(state, city.id, "soldier")
+    assert events.UnitCreated(unit.id, 0, "soldier", (2, 1)) in seen
+    assert events.ResourcesChanged(0, 0, 6) in seen
+    del seen[:]
+    rules.end_turn(state, Random(0))
+    assert isinstance(seen[0], events.ResourcesChanged)
+    assert seen[-1] == events.TurnEnded(0, 1, 2)
+
+
+def test_turn_order_skips_eliminated_players_and_last_one_wins():
+    tiles, spawns = mapgen.generate_map(12, 12, seed=1, players=4)
+    units = {u.id: u for u in mapgen.initial_units(spawns)}
+    state = State(12, 12, tiles, units, {}, {p: Player(p) for p in range(4)})
+    assert len(set(spawns)) == 4
+    for _ in range(4):
+        rules.end_turn(state)
+    assert state.current_player == 0 and state.turn == 5
+
+    for unit in list(state.units.values()):
+        if unit.owner in (1, 2) and unit.kind == "settler":
+            rules.remove_unit(state, unit.id)
+    rules.end_turn(state)
+    assert state.current_player == 3
+    assert rules.check_win(state) is None
+    for unit in list(state.units.values()):
+        if unit.owner == 3 and unit.kind == "settler":
+            rules.remove_unit(state, unit.id)
+    assert rules.check_win(state) == 0
+
+
+def test_census_follows_founding_buying_and_capture():
+    state = make_state()
+    assert state.census()[0] == Census(cities=0, units=2, settlers=1)
+    uid = next(
+        uid for uid, u in state.units.items() if u.kind == "settler" and u.owner == 0
+    )
+    state.units[uid].pos = (2, 2)
+    city = rules.found_city(state, uid, Random(0))
+    state.players[0].prod = 10
+    rules.buy_unit(state, city.id, "soldier")
+    assert state.census()[0] == Census(cities=1, units=2, settlers=0)
+
+    soldier = Unit(state.next_unit_id, 1, "soldier", (2, 3), 3)
+    state.units[soldier.id] = soldier
+    state.recount()
+    state.current_player = 1
+    rules.move_unit(state, soldier.id, (2, 2))
+    census = dict(state.census())
+    state.recount()
+    assert census == state.census()
+    assert census[0] == Census(cities=0, units=1, settlers=0)
+    assert census[1].cities == 1
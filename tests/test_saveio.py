@@ -1,6 +1,9 @@
+import json
 import tempfile
 
-from game.core import mapgen, saveio
+import pytest
+
+from game.core import mapgen, rules, saveindex, saveio
 from game.core.models import City, Player, State
 
 
@@ -31,3 +34,186 @@ def test_round_trip():
         saveio.save_game(state, path)
         loaded = saveio.load_game(path)
     assert saveio.state_to_dict(state) == saveio.state_to_dict(loaded)
+
+
+def encoded_saves(improvements):
+    state = make_state()
+    state.tiles[0].improvements = improvements
+    changes = state.track()
+    state.mark_tile((0, 0))
+    outputs = [
+        saveio.state_to_dict(state),
+        saveio.snapshot_to_dict(saveio.snapshot_state(state)),
+        saveio.changes_to_dict(state, changes),
+    ]
+    return [json.dumps(o) for o in outputs]
+
+
+def test_saves_do_not_depend_on_set_order():
+    kinds = ["farm", "road", "mine"]
+    assert encoded_saves(set(kinds)) == encoded_saves(set(reversed(kinds)))
+
+
+def test_tiles_store_reveal_as_bitmask():
+    state = make_state()
+    state.tiles[3].reveal(15)
+    data = saveio.state_to_dict(state)
+    assert data["tiles"][3]["revealed"] >> 15 & 1
+    # Older saves list the players that revealed each tile.
+    legacy = dict(data["tiles"][3], revealed_by=[0, 15])
+    del legacy["revealed"]
+    tile = saveio.dict_to_tile(legacy)
+    assert tile.revealed == 1 | 1 << 15
+    assert tile.is_revealed(15) and not tile.is_revealed(1)
+    assert not tile.reveal(0)
+
+
+def test_delta_autosave_round_trip():
+    state = make_state()
+    with tempfile.TemporaryDirectory() as td:
+        path = f"{td}/auto.json"
+        saver = saveio.DeltaAutosaver(path, compact_every=3)
+        saver.save(state)
+        assert not saveio.delta_path(path).exists()
+
+        state.players[0].prod = 10
+        rules.build_infrastructure(state, (2, 3), "road")
+        uid = next(iter(state.units))
+        del state.units[uid]
+        state.mark_unit(uid)
+        rules.end_turn(state)
+        saver.save(state)
+        delta = json.loads(saveio.delta_path(path).read_text())
+        assert [(t["x"], t["y"]) for t in delta["tiles"]] == [(2, 3)]
+        assert delta["units"][str(uid)] is None
+        loaded = saveio.load_game(path)
+        assert saveio.state_to_dict(loaded) == saveio.state_to_dict(state)
+
+        for _ in range(3):
+            rules.end_turn(state)
+            saver.save(state)
+        assert saver.deltas_written == 0
+        assert not saveio.delta_path(path).exists()
+        loaded = saveio.load_game(path)
+    assert saveio.state_to_dict(loaded) == saveio.state_to_dict(state)
+
+
+def test_binary_save_maps_tiles_lazily():
+    state = make_state()
+    state.tiles[7].revealed = 0b11
+    with tempfile.TemporaryDirectory() as td:
+        path = f"{td}/save.sav"
+        saveio.save_game(state, path)
+        loaded = saveio.load_game(path)
+        assert isinstance(loaded.tiles, saveio.MappedTiles)
+        assert loaded.reveal_counts() == state.reveal_counts()
+        assert loaded.tiles.materialized == 0
+        tile = loaded.tile_at((2, 1))
+        assert tile == state.tile_at((2, 1))
+        assert loaded.tiles.materialized == 1
+        loaded.tile_at((0, 0)).improvements.add("mine")
+        state.tile_at((0, 0)).improvements.add("mine")
+        saveio.save_game(loaded, f"{td}/again.sav")
+        # Packing the grids and summarizing the save read the mapped bytes.
+        assert loaded.tiles.materialized == 2
+        again = saveio.load_game(f"{td}/again.sav")
+        assert saveio.state_to_dict(again) == saveio.state_to_dict(state)
+
+
+def test_saving_over_a_mapped_save_unmaps_it_first():
+    state = make_state()
+    with tempfile.TemporaryDirectory() as td:
+        path = f"{td}/save.sav"
+        saveio.save_game(state, path)
+        loaded = saveio.load_game(path)
+        other = saveio.load_game(path)
+        loaded.tile_at((1, 1)).improvements.add("farm")
+        state.tile_at((1, 1)).improvements.add("farm")
+        saveio.save_game(loaded, path)
+        assert loaded.tiles.closed and other.tiles.closed
+        assert loaded.tiles.materialized == 1
+        # The grids were copied into memory, so the old game still reads.
+        assert saveio.state_to_dict(loaded) == saveio.state_to_dict(state)
+        again = saveio.load_game(path)
+        assert not again.tiles.closed
+        saveio.close_state(again)
+        assert again.tiles.closed
+        assert saveio.state_to_dict(again) == saveio.state_to_dict(state)
+
+
+def test_save_updates_index_with_summary():
+    state = make_state()
+    with tempfile.TemporaryDirectory() as td:
+        saveio.save_game(state, f"{td}/a.json")
+        saveio.save_game(state, f"{td}/b.sav")
+        saves = saveindex.list_saves(td)
+        assert sorted(s["name"] for s in saves) == ["a.json", "b.sav"]
+        entry = saves[0]
+        assert (entry["width"], entry["height"], entry["turn"]) == (5, 5, 1)
+        assert entry["cities"] == {"0": 1, "1": 0}
+        assert entry["minimap"][2][2] == "0"
+
+
+def test_summary_counts_follow_the_census():
+    state = make_state()
+    before = saveindex.summarize(state)
+    unit = next(iter(state.units.values()))
+    rules.remove_unit(state, unit.id)
+    summary = saveindex.summarize(state)
+    census = state.census()
+    assert summary["cities"] == {str(p): c.cities for p, c in census.items()}
+    assert summary["units"] == {str(p): c.units for p, c in census.items()}
+    owner = str(unit.owner)
+    assert summary["units"][owner] == before["units"][owner] - 1
+
+
+def test_delta_log_skips_stale_and_torn_lines():
+    state = make_state()
+    with tempfile.TemporaryDirectory() as td:
+        path = f"{td}/auto.json"
+        log = saveio.delta_path(path)
+        saver = saveio.DeltaAutosaver(path)
+        saver.save(state)
+        state.players[0].prod = 10
+        state.mark_player(0)
+        saver.save(state)
+        stale = log.read_text()
+        state.players[0].prod = 20
+        state.mark_player(0)
+        saver.compact(state)
+        # A crash after writing the new base left the old log behind.
+        log.write_text(stale)
+        assert saveio.load_game(path).players[0].prod == 20
+
+        state.players[0].food = 5
+        state.mark_player(0)
+        saver.save(state)
+        state.players[0].food = 6
+        state.mark_player(0)
+        saver.save(state)
+        # The last append was torn by a crash.
+        log.write_text(log.read_text()[:-20])
+        loaded = saveio.load_game(path)
+        assert (loaded.players[0].prod, loaded.players[0].food) == (20, 5)
+
+
+def test_failed_delta_write_forces_full_save(monkeypatch):
+    state = make_state()
+    with tempfile.TemporaryDirectory() as td:
+        path = f"{td}/auto.sav"
+        saver = saveio.DeltaAutosaver(path)
+        saver.save(state)
+        state.players[0].prod = 10
+        state.mark_player(0)
+        job = saver.prepare(state)
+        monkeypatch.setattr(saveio.saveindex, "record_save", None)
+        with pytest.raises(TypeError):
+            job()
+        monkeypatch.undo()
+        state.players[1].food = 3
+        state.mark_player(1)
+        saver.save(state)
+        assert saver.deltas_written == 0
+        assert not saveio.delta_path(path).exists()
+        loaded = saveio.load_game(path)
+    assert saveio.state_to_dict(loaded) == saveio.state_to_dict(state)
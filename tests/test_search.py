@@ -0,0 +1,116 @@
+import tracemalloc
+from random import Random
+from threading import Event
+
+from game.core import ai, mapgen, rules, search, zobrist
+from game.core.models import Player, State, TileOverlay
+
+
+def make_state(seed: int = 2) -> State:
+    tiles, spawns = mapgen.generate_map(16, 12, seed=seed)
+    units = {u.id: u for u in mapgen.initial_units(spawns)}
+    state = State(16, 12, tiles, units, {}, {0: Player(0), 1: Player(1)})
+    state.next_unit_id = max(units) + 1
+    for unit in units.values():
+        rules.reveal(state, unit)
+    return state
+
+
+def test_table_replaces_oldest_entries_and_keeps_deeper_ones() -> None:
+    table = search.TranspositionTable(max_bytes=2 * search.ENTRY_BYTES)
+    assert table.capacity == 2
+    table.new_search()
+    table.store(1, 3, 1.0, None)
+    table.store(2, 1, 2.0, None)
+    table.store(3, 2, 3.0, None)
+    assert table.rejected == 1 and table.probe(3) is None
+
+    table.new_search()
+    assert table.probe(1).score == 1.0
+    table.store(3, 0, 3.0, None)
+    assert table.evictions == 1
+    assert table.probe(2) is None and table.probe(1) is not None
+    table.store(1, 0, 9.0, None)
+    assert table.probe(1).score == 1.0
+    assert table.stats()["hits"] == 3 and table.stats()["misses"] == 2
+
+
+def test_entry_bytes_matches_traced_memory() -> None:
+    table = search.TranspositionTable(max_bytes=1 << 40)
+    count = 20000
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(count):
+            action = ai.Command("move", i % 50, (i % 16, i % 12))
+            table.store((1 << 63) + i * 7919, 1, i * 0.5, action)
+        used = (tracemalloc.get_traced_memory()[0] - before) / count
+    finally:
+        tracemalloc.stop()
+    assert 0.8 * used < search.ENTRY_BYTES < 1.2 * used
+
+
+def test_table_reaches_deeper_on_the_same_node_budget() -> None:
+    plain = search.Searcher(None).search(make_state(), 60, max_nodes=3000)
+    table = search.TranspositionTable()
+    cached = search.Searcher(table).search(make_state(), 60, max_nodes=3000)
+    assert cached.depth > plain.depth
+    assert table.hits > table.misses
+
+
+def test_clone_shares_tiles_until_changed() -> None:
+    state = make_state()
+    clone = state.clone()
+    assert clone.tiles[0] is state.tiles[0]
+    scout = next(u for u in clone.units.values() if u.owner == 0 and u.kind == "scout")
+    rules.move_unit(clone, scout.id, (2, 2))
+    assert state.units[scout.id].pos != (2, 2)
+    changed = [i for i, t in enumerate(clone.tiles) if t is not state.tiles[i]]
+    assert changed
+    assert all(not state.tiles[i].is_revealed(0) for i in changed)
+    assert all(clone.tiles[i].is_revealed(0) for i in changed)
+
+
+def test_search_plan_replays_on_the_real_state() -> None:
+    state = make_state()
+    copy = state.clone()
+    commands = search.plan_turn(copy, Random(1), budget=0.01)
+    assert commands[-1] == ai.END_TURN
+    rng = Random(1)
+    assert all(ai.apply_command(state, c, rng) for c in commands)
+    assert state.current_player == 1
+
+
+def test_reveal_counts_are_kept_and_hashed() -> None:
+    state = make_state()
+    state.zobrist()
+    before = dict(state.reveal_counts())
+    scout = next(u for u in state.units.values() if u.owner == 0 and u.kind == "scout")
+    rules.move_unit(state, scout.id, (scout.pos[0] + 1, scout.pos[1]))
+    counts = state.reveal_counts()
+    assert counts[0] > before[0]
+    assert state.zobrist() == zobrist.full_hash(state)
+    state.recount()
+    assert state.reveal_counts() == counts
+
+
+def test_overlay_clones_copy_only_changed_tiles() -> None:
+    state = make_state()
+    root = state.clone(overlay=True)
+    child = root.clone()
+    assert isinstance(child.tiles, TileOverlay) and not child.tiles._changed
+    scout = next(u for u in child.units.values() if u.owner == 0 and u.kind == "scout")
+    rules.move_unit(child, scout.id, (scout.pos[0] + 1, scout.pos[1]))
+    changed = dict(child.tiles._changed)
+    assert changed and not root.tiles._changed
+    assert child.clone().tiles._changed == changed
+    assert list(child.tiles) == [changed.get(i, t) for i, t in enumerate(state.tiles)]
+    assert search.evaluate(child, 0) > search.evaluate(root, 0)
+
+
+def test_cancel_stops_the_search() -> None:
+    cancel = Event()
+    cancel.set()
+    searcher = search.Searcher(cancel=cancel)
+    searcher.search(make_state(), 60)
+    assert searcher.nodes == search.CLOCK_EVERY
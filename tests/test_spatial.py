@@ -0,0 +1,29 @@
+from random import Random
+
+from game.core import mapgen, rules
+from game.core.models import Player, State
+from game.core.spatial import SpatialIndex
+
+
+def make_state() -> State:
+    tiles, spawns = mapgen.generate_map(5, 5, seed=1)
+    units = {u.id: u for u in mapgen.initial_units(spawns)}
+    players = {0: Player(0), 1: Player(1)}
+    state = State(5, 5, tiles, units, {}, players)
+    state.next_unit_id = max(units) + 1
+    return state
+
+
+def test_spatial_index_follows_changes():
+    state = make_state()
+    changes = state.track()
+    index = SpatialIndex(state)
+    uid = next(uid for uid, u in state.units.items() if u.kind == "settler")
+    state.units[uid].pos = (2, 2)
+    state.tile_at((2, 2)).kind = "plains"
+    index.rebuild()
+    city = rules.found_city(state, uid, Random(0))
+    index.update(changes)
+    assert index.units_in([(2, 2)]) == []
+    assert index.cities_in([(2, 2), (0, 0)]) == [city]
+    assert sorted(index.claims_in(city.claimed | {(0, 0)})) == sorted(city.claimed)